@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# bench_e2e.py - Benchmark ujung ke ujung: IED simulasi -> gateway_v9.0.py -> master IEC 104.
+# 1. Menjalankan sejumlah SimulatedIED (sim_ied.py) di 127.0.0.1 dengan model dari file IID.
+# 2. Menulis konfigurasi gateway sementara (semua titik simulasi dipetakan ke IOA, time_tagged=true)
+#    dan menjalankan gateway sebagai proses terpisah.
+# 3. Master IEC 104 (libiec60870client.IEC60870_5_104_client) menghitung ASDU spontan dan
+#    mengukur latensi = waktu terima - timestamp CP56Time2a (waktu pembaruan di IED simulasi).
+# 4. Setelah periode pengukuran, satu GI dikirim selagi beban masih berjalan untuk mengukur waktu penyelesaiannya.
+# Hasil: event/detik, latensi p50/p99, CPU gateway per 1000 titik, dan durasi GI di bawah beban.
+#
+# Pemakaian: python3 bench_e2e.py [jumlah_ied] [update_per_detik_per_ied] [durasi_detik] [file_iid] [buftm_ms]
+
+import configparser
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import sim_ied
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(HERE)) # libiec60870client.py ada di root repo
+import libiec60870client
+
+BASE_PORT = 10102
+HTTP_PORT = 18000
+WARMUP = 10.0 # detik setelah GI sebelum pengukuran dimulai
+
+
+def write_gateway_config(ieds, scl_file, path):
+    config = configparser.ConfigParser()
+    config.optionxform = str
+    config['gateway'] = {'pipeline': 'direct', 'http_port': str(HTTP_PORT), 'log_level': 'WARNING'}
+    config['iec104'] = {'time_tagged': 'true'}
+    config['iec61850'] = {'scl_files': ','.join(f"127.0.0.1:{ied.port}={scl_file}" for ied in ieds)}
+    sections = {sim_ied.KIND_FLOAT: 'measuredvaluefloat', sim_ied.KIND_SPS: 'singlepointinformation',
+                sim_ied.KIND_DPS: 'doublepointinformation'}
+    for section in sections.values():
+        config[section] = {}
+    ioa = 1000
+    for ied in ieds:
+        for point in ied.points:
+            config[sections[point['kind']]][str(ioa)] = f"iec61850://127.0.0.1:{ied.port}/{point['value_ref']}"
+            ioa += 1
+    with open(path, 'w') as f:
+        config.write(f)
+    return ioa - 1000
+
+
+def process_cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def main():
+    n_ieds = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 200.0
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 30.0
+    scl_file = os.path.abspath(sys.argv[4] if len(sys.argv) > 4 else os.path.join(HERE, '..', 'TRAFO5_2.iid'))
+    buf_time = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+
+    logging.basicConfig(format='%(asctime)s [%(levelname)s] %(message)s', level=logging.INFO)
+    ieds = [sim_ied.SimulatedIED(scl_file, BASE_PORT + i, rate, buf_time) for i in range(n_ieds)]
+    for ied in ieds:
+        ied.build_model()
+    config_file = tempfile.NamedTemporaryFile('w', suffix='.ini', delete=False).name
+    n_points = write_gateway_config(ieds, scl_file, config_file)
+    for ied in ieds:
+        ied.start()
+
+    gateway = subprocess.Popen([sys.executable, os.path.join(HERE, 'gateway_v9.0.py'), config_file], cwd=HERE)
+    client = None
+    try:
+        client = libiec60870client.IEC60870_5_104_client("127.0.0.1", verbose=False)
+        client.recording = False
+        for _ in range(30):
+            if client.connect():
+                break
+            time.sleep(1)
+        else:
+            raise RuntimeError("Could not connect to the gateway IEC 104 server")
+        client.interrogate()
+        time.sleep(WARMUP)
+
+        updates_start = sum(ied.updates for ied in ieds)
+        cpu_start, wall_start = process_cpu_seconds(gateway.pid), time.perf_counter()
+        own_start = time.process_time()
+        client.reset_stats()
+        client.recording = True
+        time.sleep(duration)
+        client.recording = False
+        elapsed = time.perf_counter() - wall_start
+        gateway_cpu = (process_cpu_seconds(gateway.pid) - cpu_start) / elapsed * 100.0
+        harness_cpu = (time.process_time() - own_start) / elapsed * 100.0
+        generated = sum(ied.updates for ied in ieds) - updates_start
+        summary = client.summary()
+        gi = client.interrogate()
+
+        latency = summary['latency_ms']
+        events = summary['spontaneous_objects']
+        print(f"IEDs: {n_ieds}, points: {n_points}, generated: {generated / elapsed:.0f} updates/s, duration: {elapsed:.1f}s, "
+              f"BufTm: {buf_time} ms")
+        print(f"Received: {events / elapsed:.0f} events/s in {summary['spontaneous_asdus'] / elapsed:.0f} ASDUs/s "
+              f"({events / max(generated, 1) * 100:.1f}% of generated updates)")
+        if latency['samples']:
+            print(f"Latency (IED t -> 104 master): p50 {latency['p50']:.1f} ms, p99 {latency['p99']:.1f} ms, "
+                  f"max {latency['max']:.1f} ms ({latency['samples']} samples)")
+        print(f"Gateway CPU: {gateway_cpu:.1f}% ({gateway_cpu / (n_points / 1000.0):.1f}% per 1k points), "
+              f"harness CPU: {harness_cpu:.1f}%")
+        print(f"GI under load: ACT_CON {gi['act_con_ms']} ms, complete {gi['duration_ms']} ms, {gi['objects']} objects")
+    finally:
+        if client:
+            client.close()
+        gateway.terminate()
+        gateway.wait()
+        for ied in ieds:
+            ied.stop()
+        os.unlink(config_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# bench_mms_index.py - Micro-benchmark pencarian IOA di process_data_update.
+# Membandingkan scan linear lama (startswith atas seluruh mms_to_ioa_map)
+# dengan MmsReferenceIndex yang dibangun saat parsing konfigurasi.
+#
+# Pemakaian: python3 bench_mms_index.py [jumlah_ied] [titik_per_ied] [jumlah_lookup]
+
+import random
+import sys
+import time
+
+from mms_index import MmsReferenceIndex
+
+DO_TEMPLATES = [
+    ("MEASUREMENT1", "powMMXU{n}.TotW", "mag.f"),
+    ("MEASUREMENT1", "powMMXU{n}.TotVAr", "mag.f"),
+    ("MEASUREMENT1", "rmsMMXU{n}.A.phsA.cVal", "mag.f"),
+    ("MEASUREMENT1", "rmsMMXU{n}.A.phsB.cVal", "mag.f"),
+    ("MEASUREMENT1", "rmsMMXU{n}.A.phsC.cVal", "mag.f"),
+    ("MEASUREMENT1", "rmsMMXU{n}.Hz", "mag.f"),
+    ("CONTROL1", "CSWI{n}.Pos", "stVal"),
+    ("CONTROL1", "GGIO{n}.Ind{n}", "stVal"),
+]
+
+
+def build_config(n_ieds, points_per_ied):
+    """Membuat daftar (ied_id, mms_path, ioa) sintetis yang menyerupai config.local.ini."""
+    points = []
+    ioa = 1000
+    for i in range(n_ieds):
+        ied_id = f"10.0.{i // 250}.{i % 250 + 1}:102"
+        for j in range(points_per_ied):
+            ld, do_ref, da = DO_TEMPLATES[j % len(DO_TEMPLATES)]
+            do_ref = do_ref.format(n=j // len(DO_TEMPLATES) + 1)
+            points.append((ied_id, f"BAY{i}{ld}/{do_ref}.{da}", ioa))
+            ioa += 1
+    return points
+
+
+def legacy_lookup(ied_id, reported_path, ied_to_ioas_map, mms_to_ioa_map):
+    valid_ioas_for_ied = set(ied_to_ioas_map.get(ied_id, []))
+    if not valid_ioas_for_ied:
+        return None
+    for config_path, ioa in mms_to_ioa_map.items():
+        if ioa in valid_ioas_for_ied and config_path.startswith(reported_path):
+            return ioa
+    return None
+
+
+def main():
+    n_ieds = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    points_per_ied = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    n_lookups = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+    points = build_config(n_ieds, points_per_ied)
+
+    ied_to_ioas_map, mms_to_ioa_map = {}, {}
+    index = MmsReferenceIndex()
+    for ied_id, mms_path, ioa in points:
+        ied_to_ioas_map.setdefault(ied_id, []).append(ioa)
+        mms_to_ioa_map[mms_path] = ioa
+        index.add(ied_id, mms_path, ioa, None)
+
+    # Report dataset biasanya berisi referensi tingkat DO (tanpa DA)
+    rng = random.Random(61850)
+    samples = []
+    for _ in range(n_lookups):
+        ied_id, mms_path, ioa = rng.choice(points)
+        samples.append((ied_id, mms_path.rsplit('.', 1)[0], ioa))
+
+    for ied_id, reported, ioa in samples[:50]:
+        assert legacy_lookup(ied_id, reported, ied_to_ioas_map, mms_to_ioa_map) == ioa
+        assert index.lookup(ied_id, reported)[0][0] == ioa
+
+    t0 = time.perf_counter()
+    for ied_id, reported, _ in samples:
+        legacy_lookup(ied_id, reported, ied_to_ioas_map, mms_to_ioa_map)
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for ied_id, reported, _ in samples:
+        index.lookup(ied_id, reported)
+    index_s = time.perf_counter() - t0
+
+    print(f"Configured points : {len(points)} ({n_ieds} IEDs x {points_per_ied})")
+    print(f"Index prefixes    : {len(index)}")
+    print(f"Lookups           : {n_lookups}")
+    print(f"Legacy scan       : {legacy_s / n_lookups * 1e6:10.2f} us/lookup")
+    print(f"Prefix index      : {index_s / n_lookups * 1e6:10.2f} us/lookup")
+    print(f"Speed-up          : {legacy_s / index_s:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
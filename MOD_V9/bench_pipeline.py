@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# bench_pipeline.py - Benchmark latensi dari kedatangan report sampai CS104_Slave_enqueueASDU.
+# Memuat gateway_v9.0.py apa adanya, membuat server IEC 104 (port terpisah) dengan titik
+# measuredvaluefloat sintetis, lalu sebuah thread meniru thread callback libiec61850 yang
+# memanggil ied_data_callback. Setiap sampel mengubah nilai sehingga selalu menghasilkan satu
+# ASDU; CS104_Slave_enqueueASDU dibungkus untuk mencatat waktu enqueue.
+# Kedua mode pipeline ('queue' dan 'direct') diukur berurutan.
+#
+# Pemakaian: python3 bench_pipeline.py [jumlah_titik] [jumlah_sampel] [rate_per_detik (0 = burst)] [port]
+
+import asyncio
+import importlib.util
+import logging
+import os
+import sys
+import threading
+import time
+
+import libiec60870server
+from channels import BoundedChannel
+from lib60870 import MeasuredValueShort, CS104_Slave_setLocalPort
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+IED_ID = "127.0.0.1:102"
+
+
+def load_gateway():
+    spec = importlib.util.spec_from_file_location("gateway_v9", os.path.join(HERE, "gateway_v9.0.py"))
+    gateway = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gateway)
+    return gateway
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100.0))]
+
+
+async def run_mode(gateway, server, keys, mode, n_samples, rate):
+    arrivals, enqueued = [], []
+    real_enqueue = libiec60870server.CS104_Slave_enqueueASDU
+
+    def timed_enqueue(slave, asdu):
+        result = real_enqueue(slave, asdu)
+        enqueued.append(time.perf_counter())
+        return result
+
+    gateway.PIPELINE_MODE = mode
+    gateway.main_loop = asyncio.get_running_loop()
+    gateway.process_channel = BoundedChannel('process', gateway.main_loop, gateway.PROCESS_QUEUE_SIZE, 'block')
+    gateway.ui_channel = BoundedChannel('ui', gateway.main_loop, gateway.UI_QUEUE_SIZE, 'coalesce', key=lambda update: update['ioa'])
+    gateway.shutdown_event = asyncio.Event()
+    processor = asyncio.ensure_future(gateway.data_processor())
+    libiec60870server.CS104_Slave_enqueueASDU = timed_enqueue
+
+    def report_thread():
+        interval = 1.0 / rate if rate > 0 else 0.0
+        base = len(keys) * 1000.0 * (1 if mode == 'queue' else 2)
+        next_time = time.perf_counter()
+        for i in range(n_samples):
+            key = keys[i % len(keys)]
+            arrivals.append(time.perf_counter())
+            gateway.ied_data_callback(key, {'value': base + i, 'value_path': None}, IED_ID)
+            if interval:
+                next_time += interval
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    t0 = time.perf_counter()
+    producer = threading.Thread(target=report_thread)
+    producer.start()
+    while producer.is_alive() or len(enqueued) < n_samples:
+        await asyncio.sleep(0.01)
+        if time.perf_counter() - t0 > 60 + n_samples / max(rate, 1):
+            break
+    elapsed = time.perf_counter() - t0
+    producer.join()
+
+    gateway.shutdown_event.set()
+    processor.cancel()
+    libiec60870server.CS104_Slave_enqueueASDU = real_enqueue
+
+    latencies = sorted((e - a) * 1e6 for a, e in zip(arrivals, enqueued))
+    print(f"{mode:>6}: {len(enqueued)}/{n_samples} ASDUs, {len(enqueued) / elapsed:10.0f} updates/s, "
+          f"latency p50 {percentile(latencies, 50):8.1f} us, p99 {percentile(latencies, 99):8.1f} us, "
+          f"max {latencies[-1] if latencies else float('nan'):8.1f} us")
+
+
+async def main():
+    n_points = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n_samples = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0
+    port = int(sys.argv[4]) if len(sys.argv) > 4 else 12404
+
+    logging.basicConfig(format='%(asctime)s [%(levelname)s] %(message)s', level=logging.WARNING)
+    gateway = load_gateway()
+
+    server = libiec60870server.IEC60870_5_104_server()
+    CS104_Slave_setLocalPort(server.slave, port)
+    keys = []
+    for i in range(n_points):
+        ioa = 10000 + i
+        key = f"BENCHMEASUREMENT1/MMXU{i + 1}.TotW.mag.f"
+        server.add_ioa(ioa, MeasuredValueShort, 0, None, True)
+        gateway.mms_index.add(IED_ID, key, ioa, None)
+        keys.append(key)
+    gateway.iec104_server = server
+    server.start()
+
+    print(f"Points: {n_points}, samples: {n_samples}, rate: {'burst' if rate <= 0 else f'{rate:.0f}/s'}")
+    try:
+        for mode in ('queue', 'direct'):
+            await run_mode(gateway, server, keys, mode, n_samples, rate)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# channels.py - Antrian berbatas antara thread IED dan event loop asyncio gateway.
+# Produsen (thread callback libiec61850, executor, atau event loop) memanggil put() tanpa
+# menyentuh asyncio secara langsung; konsumen di event loop menunggu dengan get_batch().
+# Setiap channel memiliki kebijakan overflow sendiri:
+#   block       - produsen thread menunggu sampai ada ruang (backpressure, untuk update 104)
+#   drop_oldest - item tertua dibuang (untuk UI)
+#   coalesce    - satu item terbaru per kunci (mis. IOA); ukuran dibatasi jumlah kunci (untuk UI)
+
+import asyncio
+import collections
+import threading
+
+POLICIES = ('block', 'drop_oldest', 'coalesce')
+
+
+class BoundedChannel:
+    """Channel berbatas thread-safe dengan counter depth, high-water mark, drop dan coalesce."""
+
+    def __init__(self, name, loop, maxsize = 10000, policy = 'block', key = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy '{policy}' for channel {name}")
+        if policy == 'coalesce' and key is None:
+            raise ValueError(f"Channel {name} with policy 'coalesce' needs a key function")
+        self.name = name
+        self.loop = loop
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.key = key
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._items = collections.OrderedDict() if policy == 'coalesce' else collections.deque()
+        self._ready = asyncio.Event()
+        self._notified = False
+        try:
+            self._loop_thread = threading.get_ident() if asyncio.get_running_loop() is loop else None
+        except RuntimeError:
+            self._loop_thread = None
+        # counter
+        self.put_count = 0
+        self.get_count = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.blocked = 0
+        self.high_water = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def _on_loop_thread(self):
+        if self._loop_thread is None:
+            return False
+        return threading.get_ident() == self._loop_thread
+
+    def put(self, item, force = False):
+        """Memasukkan item dari thread mana pun. force=True mengabaikan batas (untuk item kontrol yang jarang)."""
+        with self._lock:
+            self.put_count += 1
+            items = self._items
+            if self.policy == 'coalesce':
+                k = self.key(item)
+                if k in items:
+                    self.coalesced += 1
+                    items[k] = item
+                    items.move_to_end(k)
+                    return True
+                if len(items) >= self.maxsize and not force:
+                    items.popitem(last=False)
+                    self.dropped += 1
+                items[k] = item
+            else:
+                if len(items) >= self.maxsize and not force:
+                    if self.policy == 'drop_oldest':
+                        items.popleft()
+                        self.dropped += 1
+                    elif self._on_loop_thread():
+                        # event loop tidak boleh menunggu dirinya sendiri
+                        self.dropped += 1
+                        return False
+                    else:
+                        self.blocked += 1
+                        while len(items) >= self.maxsize:
+                            self._not_full.wait()
+                items.append(item)
+            if len(items) > self.high_water:
+                self.high_water = len(items)
+            notify = not self._notified
+            self._notified = True
+        if notify:
+            if self._on_loop_thread():
+                self._ready.set()
+            else:
+                self.loop.call_soon_threadsafe(self._ready.set)
+        return True
+
+    async def get_batch(self, max_items = 0):
+        """Menunggu lalu mengambil hingga max_items item (0 = semua) dalam urutan masuk."""
+        if self._loop_thread is None:
+            self._loop_thread = threading.get_ident()
+        while True:
+            await self._ready.wait()
+            with self._lock:
+                items = self._items
+                if not items:
+                    self._ready.clear()
+                    self._notified = False
+                    continue
+                count = len(items) if max_items <= 0 else min(max_items, len(items))
+                if self.policy == 'coalesce':
+                    batch = [items.popitem(last=False)[1] for _ in range(count)]
+                else:
+                    batch = [items.popleft() for _ in range(count)]
+                if not items:
+                    self._ready.clear()
+                    self._notified = False
+                self.get_count += len(batch)
+                self._not_full.notify_all()
+            return batch
+
+    def stats(self):
+        return {'name': self.name, 'policy': self.policy, 'maxsize': self.maxsize, 'depth': len(self._items),
+                'high_water': self.high_water, 'put': self.put_count, 'get': self.get_count,
+                'dropped': self.dropped, 'coalesced': self.coalesced, 'blocked': self.blocked}
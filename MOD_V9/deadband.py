@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# deadband.py - Filter deadband/hysteresis untuk measured value sebelum dikirim sebagai event IEC 104.
+# Parameter dan state setiap IOA disimpan berbentuk kolom (array 'd'), satu baris per IOA,
+# sehingga semua perubahan yang tertunda dievaluasi dalam satu pass per flush.
+#
+# Sebuah nilai dikirim jika:
+#   - selisih terhadap nilai terakhir yang dikirim melebihi max(absolut, persen * |nilai terkirim|), atau
+#   - integral selisih terhadap waktu (deadband terintegrasi) melewati batasnya, sehingga drift
+#     lambat yang tidak pernah melewati deadband tetap dilaporkan,
+# dan sudah melewati interval minimum sejak event terakhir. Jika interval belum lewat, nilai ditahan.
+#
+# Keputusan HOLD berarti IOA harus dievaluasi ulang pada flush berikutnya walaupun tidak ada sampel baru:
+# nilai yang menunggu interval minimum, atau drift di bawah deadband yang integralnya masih bertambah.
+# SKIP berarti nilai terkirim sudah cukup dekat dan tidak perlu dievaluasi lagi sampai nilainya berubah.
+
+import math
+import time
+from array import array
+
+SEND, SKIP, HOLD = 0, 1, 2
+
+
+class DeadbandTable:
+    """Tabel kolom parameter dan state deadband per IOA."""
+
+    def __init__(self):
+        self.rows = {}
+        # parameter
+        self.absolute = array('d')
+        self.percent = array('d')
+        self.min_interval = array('d')
+        self.integrated = array('d')
+        # state
+        self.sent_value = array('d')
+        self.sent_time = array('d')
+        self.last_value = array('d')
+        self.last_time = array('d')
+        self.integral = array('d')
+
+    def __contains__(self, ioa):
+        return ioa in self.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def configure(self, ioa, absolute = 0.0, percent = 0.0, min_interval = 0.0, integrated = 0.0):
+        """Mengatur deadband IOA: absolute (satuan nilai), percent (% nilai terkirim), min_interval (detik),
+        integrated (satuan nilai x detik). Semua 0 berarti setiap perubahan dikirim."""
+        row = self.rows.get(ioa)
+        if row is None:
+            row = self.rows[ioa] = len(self.absolute)
+            for column in (self.absolute, self.percent, self.min_interval, self.integrated,
+                           self.last_time, self.integral):
+                column.append(0.0)
+            self.sent_time.append(-math.inf)
+            self.sent_value.append(math.nan)
+            self.last_value.append(math.nan)
+        self.absolute[row] = float(absolute)
+        self.percent[row] = float(percent) / 100.0
+        self.min_interval[row] = float(min_interval)
+        self.integrated[row] = float(integrated)
+
+    def mark_sent(self, ioa, value, now = None):
+        """Mencatat bahwa value dikirim di luar filter (mis. karena perubahan quality atau GI)."""
+        row = self.rows.get(ioa)
+        if row is None:
+            return
+        now = time.monotonic() if now is None else now
+        self.sent_value[row] = self.last_value[row] = float(value)
+        self.sent_time[row] = self.last_time[row] = now
+        self.integral[row] = 0.0
+
+    def evaluate(self, ioas, values, now = None):
+        """Mengevaluasi sekumpulan (ioa, value) dalam satu pass; mengembalikan keputusan SEND/SKIP/HOLD per IOA.
+
+        IOA tanpa konfigurasi deadband selalu SEND.
+        """
+        now = time.monotonic() if now is None else now
+        rows = self.rows
+        absolute, percent, min_interval, integrated = self.absolute, self.percent, self.min_interval, self.integrated
+        sent_value, sent_time = self.sent_value, self.sent_time
+        last_value, last_time, integral = self.last_value, self.last_time, self.integral
+
+        decisions = []
+        for ioa, value in zip(ioas, values):
+            row = rows.get(ioa)
+            if row is None:
+                decisions.append(SEND)
+                continue
+            reference = sent_value[row]
+            # luas selisih sampel sebelumnya selama ia berlaku (deadband terintegrasi)
+            previous = last_value[row]
+            if previous == previous and reference == reference:
+                integral[row] += abs(previous - reference) * (now - last_time[row])
+            last_value[row] = value
+            last_time[row] = now
+
+            drifting = False
+            if reference != reference:
+                exceeded = True # belum pernah dikirim
+            else:
+                deviation = abs(value - reference)
+                limit = max(absolute[row], percent[row] * abs(reference))
+                exceeded = deviation > limit if limit > 0.0 else deviation != 0.0
+                if not exceeded and integrated[row] > 0.0 and deviation != 0.0:
+                    exceeded = integral[row] >= integrated[row]
+                    drifting = True
+
+            if not exceeded:
+                decisions.append(HOLD if drifting else SKIP)
+            elif now - sent_time[row] < min_interval[row]:
+                decisions.append(HOLD)
+            else:
+                sent_value[row] = value
+                sent_time[row] = now
+                integral[row] = 0.0
+                decisions.append(SEND)
+        return decisions
@@ -138,7 +138,7 @@ def process_data_update(ied_id, key, data):
                 continue # Lanjut ke iterasi berikutnya
 
             try:
-                ioa_type_class = iec104_server.IOA_list.get(ioa, {}).get('type')
+                ioa_type_class = iec104_server.points.type_of(ioa)
                 ioa_type = str(ioa_type_class)
                 value_to_send = float(final_value)
                 if "DoublePointInformation" in ioa_type:
@@ -163,27 +163,9 @@ def do_invalidation(ied_id):
     if ied_id in ied_to_ioas_map:
         ioas_to_invalidate = ied_to_ioas_map[ied_id]
         logging.warning(f"Invalidating {len(ioas_to_invalidate)} data points for {ied_id}.")
-        al_params = iec104_server.alParams
         quality_flags = 48
-        for ioa in ioas_to_invalidate:
-            ioa_config = iec104_server.IOA_list.get(ioa)
-            if ioa_config:
-                io_type = ioa_config.get('type')
-                creator_func = None
-                if io_type == MeasuredValueScaled: creator_func = MeasuredValueScaled_create
-                elif io_type == MeasuredValueShort: creator_func = MeasuredValueShort_create
-                elif io_type == SinglePointInformation: creator_func = SinglePointInformation_create
-                elif io_type == DoublePointInformation: creator_func = DoublePointInformation_create
-                if creator_func:
-                    new_asdu = CS101_ASDU_create(al_params, False, CS101_COT_SPONTANEOUS, 0, 1, False, False)
-                    io = cast(creator_func(None, ioa, 0, quality_flags), InformationObject)
-                    CS101_ASDU_addInformationObject(new_asdu, io)
-                    InformationObject_destroy(io)
-                    CS104_Slave_enqueueASDU(iec104_server.slave, new_asdu)
-                    CS101_ASDU_destroy(new_asdu)
-        for ioa in ioas_to_invalidate:
-            if ioa in iec104_server.IOA_list:
-                iec104_server.IOA_list[ioa]['data'] = float('nan')
+        # quality ditulis ke tabel titik dan dikirim per tipe dalam ASDU multi-objek
+        iec104_server.invalidate(ioas_to_invalidate, quality_flags)
 
 def ied_data_callback(key, data, ied_id):
     if main_loop and update_queue:
@@ -3,6 +3,7 @@
 # Deskripsi: Gateway IEC 61850 ke IEC 60870-5-104.
 # Fitur v9.0: Menambahkan HTTP server dengan WebSocket untuk monitoring data realtime via browser.
 #             Mewarisi fitur v8.1 (path spesifik dan polling adaptif).
+#             UI, WebSocket (/ws) dan REST API (/api/...) dilayani satu server asyncio di satu port.
 
 import asyncio
 import json
@@ -12,13 +13,21 @@ import threading
 import sys
 import os
 import time
-from urllib.parse import urlparse
-import http.server
-import socketserver
+import re
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlparse, parse_qs
 import websockets
 
 import libiec61850client_cached as libiec61850client
 import libiec60870server
+from mms_index import MmsReferenceIndex
+from quality_map import iec104_quality, CONNECTION_LOST_QUALITY, QDS_INVALID
+from point_table import FLAG_EVENT, FLAG_INVERT
+from channels import BoundedChannel
+from ui_protocol import BinaryFrameEncoder, FRAME_BATCH, entry_value
+from log_utils import LogSampler, setup_queue_logging
+from metrics import Registry, Counter, Histogram, CallbackMetric, InstrumentedExecutor, CONTENT_TYPE, DURATION_BUCKETS
 from lib60870 import *
 from lib61850 import IedConnection_getState
 
@@ -27,76 +36,240 @@ CON_STATE_NOT_CONNECTED, CON_STATE_CONNECTING, CON_STATE_CONNECTED, CON_STATE_CL
 FALLBACK_POLLING_INTERVAL = 10  # Interval jika ada yg perlu di-poll (detik)
 HEARTBEAT_POLLING_INTERVAL = 60 # Interval jika semua via Report (detik)
 RECONNECT_DELAY = 15
-HTTP_PORT = 8000 # Port untuk server web
-WEBSOCKET_PORT = 8001 # Port untuk WebSocket
+HTTP_PORT = 8000 # Port untuk UI, WebSocket (/ws) dan REST API (/api/...)
+INDEX_FILE = 'index.html'
+# Penanda versi halaman UI; naikkan setiap kali isi index.html di bawah berubah agar instalasi lama diperbarui
+INDEX_MARKER = '<!-- gateway-ui 9.0.2 -->'
+API_PAGE_LIMIT = 1000 # jumlah titik maksimum per halaman /api/points
+DISCOVERY_WORKERS = 0 # >0: discovery paralel per LN dengan sejumlah koneksi ini
+DISCOVERY_READ_VALUES = True # False: discovery hanya struktur, tanpa membaca nilai leaf
+DISCOVERY_SCOPED = False # True: discovery hanya untuk referensi yang dikonfigurasi
+DISCOVERY_REPORT_LNS = [] # LN tambahan ('LD/LN') yang DataSet/RCB-nya ikut dibaca saat discovery terbatas
+SCL_FILES = {} # ied_id -> file SCL/IID/CID; fingerprint-nya membatalkan cache model jika file berubah
+PIPELINE_MODE = 'queue' # 'direct': thread callback IED langsung memetakan dan mengirim update ke server 104
+PROCESS_QUEUE_SIZE = 10000 # batas antrian update 104 (produsen menunggu jika penuh)
+UI_QUEUE_SIZE = 10000 # batas antrian update UI
+UI_QUEUE_POLICY = 'coalesce' # 'coalesce' (nilai terbaru per IOA) atau 'drop_oldest'
+CHANNEL_STATS_INTERVAL = 60 # interval log statistik antrian (detik)
+UI_FRAME_RATE = 5.0 # jumlah frame update UI per detik (0 = kirim segera)
+DATA_TYPES = {'measuredvaluescaled': MeasuredValueScaled, 'measuredvaluefloat': MeasuredValueShort,
+              'singlepointinformation': SinglePointInformation, 'doublepointinformation': DoublePointInformation}
+COMMAND_TYPES = {'singlepointcommand': SingleCommand, 'doublepointcommand': DoubleCommand}
+TYPE_NAMES = {mms_type: section for section, mms_type in list(DATA_TYPES.items()) + list(COMMAND_TYPES.items())}
+# Opsi deadband per titik di baris konfigurasi (:nama=nilai) -> argumen IEC60870_5_104_server.set_deadband
+DEADBAND_OPTIONS = {'deadband': 'absolute', 'deadband_pct': 'percent', 'min_interval': 'min_interval', 'integrated_deadband': 'integrated'}
 
 # --- Variabel & Objek Global ---
 clients_dict_lock = threading.Lock()
 ied_locks = {}
 ied_clients = {}
-ied_to_ioas_map, mms_to_ioa_map, ioa_inversion_map, ioa_to_mms_config, mms_to_value_path_map = {}, {}, {}, {}, {}
-update_queue = None
+ied_to_ioas_map, ioa_to_mms_config = {}, {}
+ied_status = {} # ied_id -> status koneksi untuk /api/ieds (hanya ditulis dari event loop)
+mms_index = MmsReferenceIndex()
+process_channel = None # update 104 dan invalidasi
+ui_channel = None # update untuk klien WebSocket
 shutdown_event = None
 iec104_server = None
 main_loop = None
-websocket_clients = set()
+websocket_clients = set() # klien protokol JSON
+binary_clients = {} # klien protokol biner (?protocol=binary): {websocket: BinaryFrameEncoder milik klien}
+# klien yang sedang menerima snapshot: {websocket: [update]} yang di-broadcast selama snapshot dibuat dan dikirim
+pending_clients = {}
+executor = None # executor default event loop (InstrumentedExecutor)
+
+# --- Metrik (/metrics) ---
+metrics_registry = Registry()
+update_latency = metrics_registry.register(Histogram('gateway_update_latency_seconds', 'Time from IED report/poll callback to hand-off to the IEC 104 server'))
+updates_total = metrics_registry.register(Counter('gateway_updates_total', 'Values mapped to IEC 104 points', ('ied',)))
+poll_duration = metrics_registry.register(Histogram('gateway_poll_duration_seconds', 'Duration of one IED poll cycle', ('ied',), DURATION_BUCKETS))
+reconnects_total = metrics_registry.register(Counter('gateway_ied_reconnects_total', 'IED connection losses followed by a reconnect attempt', ('ied',)))
+ied_update_counters = {} # ied_id -> seri updates_total, dialokasikan saat konfigurasi
+
+# Log per nilai (jalur panas) dibatasi per IED; interval/burst dapat diatur di [gateway]
+value_log = LogSampler(logging.getLogger(), interval=10.0, burst=5)
 
 # --- Fungsi-fungsi untuk Server Web ---
-def start_http_server():
-    """Menjalankan server HTTP sederhana di thread terpisah untuk menyajikan index.html."""
-    Handler = http.server.SimpleHTTPRequestHandler
-    with socketserver.TCPServer(("", HTTP_PORT), Handler) as httpd:
-        logging.info(f"HTTP server serving at port {HTTP_PORT}")
-        httpd.serve_forever()
+def http_response(status, body, content_type = 'application/json'):
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+    headers = [('Content-Type', content_type), ('Content-Length', str(len(body))), ('Cache-Control', 'no-store')]
+    return status, headers, body
+
+def api_point(row):
+    ioa, io_type, value, quality, timestamp, _ = iec104_server.points.read(row)
+    return {'ioa': ioa, 'type': TYPE_NAMES.get(io_type), 'value': value, 'quality': quality, 'timestamp': timestamp or None}
+
+def api_snapshot():
+    """Nilai terakhir semua titik monitoring dalam bentuk kolom."""
+    points = iec104_server.points
+    rows = [[ioa, value, quality, timestamp or None] for row, (ioa, value, quality, timestamp) in enumerate(points.snapshot())
+            if points.flags[row] & FLAG_EVENT]
+    return {'timestamp': int(time.time() * 1000), 'columns': ['ioa', 'value', 'quality', 'timestamp'], 'rows': rows}
+
+def api_points(query):
+    """Halaman titik: ?offset=&limit=&ied=&type= (type = nama section konfigurasi)."""
+    points = iec104_server.points
+    offset = max(0, int(query.get('offset', ['0'])[0]))
+    limit = min(max(1, int(query.get('limit', [str(API_PAGE_LIMIT)])[0])), API_PAGE_LIMIT)
+    if 'ied' in query:
+        rows = [points.rows[ioa] for ioa in ied_to_ioas_map.get(query['ied'][0], []) if ioa in points]
+    else:
+        rows = range(len(points))
+    if 'type' in query:
+        # lookup read-only: tipe yang belum punya titik tidak boleh ditambahkan ke tabel dari handler REST
+        wanted = {points.find_type_code(mms_type) for mms_type, name in TYPE_NAMES.items() if name == query['type'][0]}
+        wanted.discard(None)
+        rows = [row for row in rows if points.type_code[row] in wanted]
+    return {'total': len(rows), 'offset': offset, 'limit': limit, 'points': [api_point(row) for row in rows[offset:offset + limit]]}
+
+def api_ied(ied_id):
+    points = iec104_server.points
+    ioas = ied_to_ioas_map.get(ied_id, [])
+    invalid = sum(1 for ioa in ioas if ioa in points and points.quality[points.rows[ioa]] & QDS_INVALID)
+    return dict(ied_status.get(ied_id, {'state': 'unknown'}), points=len(ioas), invalid_points=invalid)
+
+def handle_api(path, query):
+    """Routing REST API; dijalankan di executor. Mengembalikan (status, body)."""
+    parts = [part for part in path.split('/') if part][1:]
+    if iec104_server is None:
+        return HTTPStatus.SERVICE_UNAVAILABLE, {'error': 'IEC 104 server not ready'}
+    try:
+        if parts == ['snapshot']:
+            return HTTPStatus.OK, api_snapshot()
+        if parts == ['points']:
+            return HTTPStatus.OK, api_points(query)
+        if len(parts) == 2 and parts[0] == 'points':
+            row = iec104_server.points.rows.get(int(parts[1]))
+            if row is None:
+                return HTTPStatus.NOT_FOUND, {'error': f'IOA {parts[1]} not found'}
+            return HTTPStatus.OK, api_point(row)
+        if parts == ['ieds']:
+            return HTTPStatus.OK, {ied_id: api_ied(ied_id) for ied_id in ied_to_ioas_map}
+        if len(parts) == 2 and parts[0] == 'ieds':
+            if parts[1] not in ied_to_ioas_map:
+                return HTTPStatus.NOT_FOUND, {'error': f'IED {parts[1]} not found'}
+            return HTTPStatus.OK, api_ied(parts[1])
+    except ValueError as e:
+        return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+    return HTTPStatus.NOT_FOUND, {'error': f'Unknown endpoint {path}'}
+
+async def http_request(path, request_headers):
+    """Hook process_request server WebSocket: permintaan HTTP biasa dilayani di sini, upgrade diteruskan ke /ws."""
+    url = urlparse(path)
+    if url.path == '/ws':
+        return None
+    if url.path in ('/', '/' + INDEX_FILE):
+        try:
+            with open(INDEX_FILE, 'rb') as f:
+                return http_response(HTTPStatus.OK, f.read(), 'text/html; charset=utf-8')
+        except OSError:
+            return http_response(HTTPStatus.NOT_FOUND, {'error': f'{INDEX_FILE} not found'})
+    if url.path == '/metrics':
+        body = await asyncio.get_running_loop().run_in_executor(None, metrics_registry.expose)
+        return http_response(HTTPStatus.OK, body.encode(), CONTENT_TYPE)
+    if url.path.startswith('/api/'):
+        status, body = await asyncio.get_running_loop().run_in_executor(None, handle_api, url.path, parse_qs(url.query))
+        return http_response(status, body)
+    return http_response(HTTPStatus.NOT_FOUND, {'error': f'Not found: {url.path}'})
+
+def ui_frame(frame_type, updates):
+    return json.dumps({'type': frame_type, 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'), 'updates': updates})
+
+def ui_snapshot(encoder = None):
+    """Frame berisi nilai terakhir semua titik monitoring dari tabel titik server 104 (biner jika encoder diberikan)."""
+    points = iec104_server.points if iec104_server else None
+    rows = points.snapshot() if points is not None else []
+    flags = points.flags if points is not None else None
+    monitored = [entry for row, entry in enumerate(rows) if flags[row] & FLAG_EVENT]
+    if encoder is not None:
+        return encoder.snapshot(monitored, int(time.time() * 1000))
+    updates = [{'type': 'data_update', 'ioa': ioa, 'value': value, 'quality': quality, 't': timestamp}
+               for ioa, value, quality, timestamp in monitored]
+    return ui_frame('snapshot', updates)
+
+async def send_to_clients(clients, message):
+    # Buat salinan set untuk menghindari masalah saat iterasi jika set berubah
+    clients_to_send = list(clients)
+    if hasattr(websockets, 'broadcast'):
+        websockets.broadcast(clients_to_send, message) # tanpa menunggu klien yang lambat
+    else:
+        await asyncio.gather(*[client.send(message) for client in clients_to_send], return_exceptions=True)
+
+def binary_entries(updates):
+    return [(update['ioa'], entry_value(update['value']), update['quality'], update['t']) for update in updates]
+
+def ui_replay(updates, encoder = None):
+    """Frame berisi update yang tertahan selama snapshot klien baru dibuat; None jika tidak ada delta."""
+    if encoder is not None:
+        return encoder.encode(FRAME_BATCH, binary_entries(updates), int(time.time() * 1000))
+    return ui_frame('batch', updates)
 
 async def websocket_handler(websocket, path):
-    """Menangani koneksi WebSocket baru."""
-    websocket_clients.add(websocket)
-    logging.info(f"WebSocket client connected: {websocket.remote_address}")
+    """Menangani koneksi WebSocket baru: kirim snapshot lengkap, lalu klien menerima frame batch.
+
+    Klien didaftarkan di pending_clients sebelum snapshot dibaca, sehingga batch yang di-broadcast selama
+    snapshot dibuat dan dikirim ditampung lalu dikirim ulang setelah snapshot; klien baru masuk ke stream
+    broadcast setelah tampungannya kosong.
+    """
+    binary = parse_qs(urlparse(path or '').query).get('protocol', ['json'])[0] == 'binary'
+    # state delta biner milik klien ini saja: klien baru tidak memaksa frame lengkap ke klien lain
+    encoder = BinaryFrameEncoder() if binary else None
+    pending_clients[websocket] = []
+    logging.info(f"WebSocket client connected: {websocket.remote_address} ({'binary' if binary else 'json'})")
     try:
+        snapshot = await asyncio.get_running_loop().run_in_executor(None, ui_snapshot, encoder)
+        await websocket.send(snapshot)
+        while pending_clients[websocket]:
+            updates, pending_clients[websocket] = pending_clients[websocket], []
+            frame = ui_replay(updates, encoder)
+            if frame:
+                await websocket.send(frame)
+        # tanpa await di antara pemeriksaan tampungan dan pendaftaran: tidak ada batch yang terlewat
+        del pending_clients[websocket]
+        if binary:
+            binary_clients[websocket] = encoder
+        else:
+            websocket_clients.add(websocket)
         await websocket.wait_closed()
     finally:
         logging.info(f"WebSocket client disconnected: {websocket.remote_address}")
-        websocket_clients.remove(websocket)
+        pending_clients.pop(websocket, None)
+        websocket_clients.discard(websocket)
+        binary_clients.pop(websocket, None)
 
-async def broadcast_updates(queue):
-    """Mengambil pembaruan dari antrian dan mengirimkannya ke semua klien WebSocket."""
+async def broadcast_updates(channel):
+    """Mengirim isi channel UI (nilai terbaru per IOA) ke semua klien WebSocket sebagai satu frame batch,
+    paling banyak UI_FRAME_RATE kali per detik."""
     while True:
-        update = await queue.get()
+        updates = await channel.get_batch()
+        for backlog in pending_clients.values():
+            backlog.extend(updates)
+        # tanpa browser, update UI cukup dibuang
         if websocket_clients:
-            message = json.dumps(update)
-            # Buat salinan set untuk menghindari masalah saat iterasi jika set berubah
-            clients_to_send = list(websocket_clients)
-            tasks = [client.send(message) for client in clients_to_send]
-            await asyncio.gather(*tasks, return_exceptions=True)
-        queue.task_done()
+            await send_to_clients(websocket_clients, ui_frame('batch', updates))
+        if binary_clients:
+            # delta per klien; klien dengan frame yang sama dikirimi dalam satu broadcast
+            entries, now_ms = binary_entries(updates), int(time.time() * 1000)
+            frames = {}
+            for client, encoder in list(binary_clients.items()):
+                frame = encoder.encode(FRAME_BATCH, entries, now_ms)
+                if frame:
+                    frames.setdefault(frame, []).append(client)
+            for frame, clients in frames.items():
+                await send_to_clients(clients, frame)
+        if UI_FRAME_RATE > 0:
+            await asyncio.sleep(1.0 / UI_FRAME_RATE)
+
+async def channel_monitor(channels):
+    """Mencatat depth, high-water mark dan counter drop/coalesce/block setiap channel secara berkala."""
+    while not (shutdown_event and shutdown_event.is_set()):
+        await asyncio.sleep(CHANNEL_STATS_INTERVAL)
+        for channel in channels:
+            stats = channel.stats()
+            logging.info("Channel %(name)s (%(policy)s): depth %(depth)d/%(maxsize)d, high water %(high_water)d, "
+                         "put %(put)d, dropped %(dropped)d, coalesced %(coalesced)d, blocked %(blocked)d" % stats)
 
 # --- Fungsi-fungsi utilitas & callback ---
-def find_first_float(data):
-    if isinstance(data, float): return data
-    if isinstance(data, int): return float(data)
-    if isinstance(data, dict):
-        for key in data:
-            result = find_first_float(data[key])
-            if result is not None: return result
-    if isinstance(data, list):
-        for item in data:
-            result = find_first_float(item)
-            if result is not None: return result
-    return None
-
-def get_value_by_path(data_dict, path_str):
-    keys = path_str.split('.')
-    current_level = data_dict
-    try:
-        for key in keys:
-            current_level = current_level[key]
-        if isinstance(current_level, (int, float)):
-            return float(current_level)
-        return None
-    except (KeyError, TypeError):
-        return None
-
 def command_60870_callback(ioa, ioa_data, srv, select_value):
     config_line = ioa_to_mms_config.get(ioa)
     if not config_line: return -1
@@ -121,7 +294,7 @@ def command_60870_callback(ioa, ioa_data, srv, select_value):
         else:
             return client.operate(str(uri_part), val_str)
 
-def process_data_update(ied_id, key, data):
+def process_data_update(ied_id, key, data, received = None):
     if not isinstance(data, dict) or 'value' not in data: return
     reported_key, value_to_update = key, data['value']
 
@@ -131,110 +304,145 @@ def process_data_update(ied_id, key, data):
             parsed_uri = urlparse(reported_key)
             mms_path_from_key = parsed_uri.path.lstrip('/')
         except Exception:
-            logging.warning(f"Could not parse URI key: {reported_key}")
+            value_log.log(ied_id, logging.WARNING, "Could not parse URI key: %s", reported_key)
             return
 
-    valid_ioas_for_ied = set(ied_to_ioas_map.get(ied_id, []))
-    if not valid_ioas_for_ied: return
-
-    found_match = False
-    for config_path, ioa in mms_to_ioa_map.items():
-        if ioa in valid_ioas_for_ied and config_path.startswith(mms_path_from_key):
-            value_path = mms_to_value_path_map.get(config_path)
-            final_value = None
-
-            if value_path:
-                final_value = get_value_by_path(value_to_update, value_path)
-                if final_value is None:
-                    logging.warning(f"[{ied_id}] Path '{value_path}' for IOA {ioa} not found in received data for key {reported_key}.")
-            else:
-                final_value = find_first_float(value_to_update)
+    # Nilai yang sudah diekstrak oleh jalur cepat ReportHandler_cb membawa value_path-nya sendiri
+    matches = mms_index.resolve(ied_id, mms_path_from_key, value_to_update, 'value_path' in data, data.get('value_path'))
+    if not matches:
+        logging.debug("[%s] No matching config for key: %s", ied_id, reported_key)
+        return
 
-            if final_value is None:
-                logging.debug(f"[{ied_id}] Could not extract a numeric value for key {reported_key} for IOA {ioa}.")
-                continue
+    quality = iec104_quality(data.get('q'))
 
-            try:
-                ioa_type_class = iec104_server.IOA_list.get(ioa, {}).get('type')
-                ioa_type = str(ioa_type_class)
-                value_to_send = float(final_value)
-                if "DoublePointInformation" in ioa_type:
-                    val_map = {1.0: 1, 2.0: 2}; value_to_send = val_map.get(value_to_send, 0)
-                elif "SinglePointInformation" in ioa_type:
-                    value_to_send = 1 if int(value_to_send) != 0 else 0
-                if ioa_inversion_map.get(ioa, False):
-                    if value_to_send == 1: value_to_send = 2
-                    elif value_to_send == 2: value_to_send = 1
-                
-                # Masukkan ke antrian untuk broadcast via WebSocket
-                update_payload = {
-                    'type': 'data_update',
-                    'ioa': ioa,
-                    'value': value_to_send,
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                main_loop.call_soon_threadsafe(update_queue.put_nowait, update_payload)
+    for ioa, value_path, final_value in matches:
+        if final_value is None and value_path:
+            value_log.log(ied_id, logging.WARNING, "[%s] Path '%s' for IOA %d not found in received data for key %s.",
+                          ied_id, value_path, ioa, reported_key)
+        if final_value is None:
+            logging.debug("[%s] Could not extract a numeric value for key %s for IOA %d.", ied_id, reported_key, ioa)
+            continue
 
-                iec104_server.update_ioa(ioa, value_to_send)
-                logging.info(f"[{ied_id}] Matched '{reported_key}' to IOA {ioa}, updated with: {value_to_send}")
-                found_match = True
-            except Exception as e:
-                logging.error(f"Error processing update for IOA {ioa}: {e}", exc_info=True)
-            break
+        try:
+            ioa_type = iec104_server.points.type_of(ioa)
+            value_to_send = float(final_value)
+            if ioa_type == DoublePointInformation:
+                val_map = {1.0: 1, 2.0: 2}; value_to_send = val_map.get(value_to_send, 0)
+            elif ioa_type == SinglePointInformation:
+                value_to_send = 1 if int(value_to_send) != 0 else 0
+            if iec104_server.points.has_flag(ioa, FLAG_INVERT):
+                if value_to_send == 1: value_to_send = 2
+                elif value_to_send == 2: value_to_send = 1
 
-    if not found_match:
-        logging.debug(f"[{ied_id}] No matching config for key: {reported_key}")
+            # Masukkan ke antrian untuk broadcast via WebSocket
+            update_payload = {
+                'type': 'data_update',
+                'ioa': ioa,
+                'value': value_to_send,
+                'quality': quality,
+                't': data.get('t') or int(time.time() * 1000)
+            }
+            ui_channel.put(update_payload)
+
+            iec104_server.update_ioa(ioa, value_to_send, data.get('t'), quality)
+            if received is not None:
+                update_latency.observe(time.perf_counter() - received)
+            counter = ied_update_counters.get(ied_id)
+            if counter is not None:
+                counter.inc()
+            value_log.log(ied_id, logging.DEBUG, "[%s] Matched '%s' to IOA %d, updated with: %s", ied_id, reported_key, ioa, value_to_send)
+        except Exception as e:
+            logging.error(f"Error processing update for IOA {ioa}: {e}", exc_info=True)
 
 
 def do_invalidation(ied_id):
     if ied_id in ied_to_ioas_map:
         ioas_to_invalidate = ied_to_ioas_map[ied_id]
-        logging.warning(f"Invalidating {len(ioas_to_invalidate)} data points for {ied_id}.")
-        al_params = iec104_server.alParams
-        quality_flags = 48
-        for ioa in ioas_to_invalidate:
+        # Flip quality massal ke IV|NT; hanya titik yang quality-nya berubah yang dikirim (ASDU multi-objek)
+        changed_ioas = iec104_server.invalidate(ioas_to_invalidate)
+        logging.warning(f"Invalidating {len(changed_ioas)} of {len(ioas_to_invalidate)} data points for {ied_id}.")
+        now_ms = int(time.time() * 1000)
+        for ioa in changed_ioas:
             # Masukkan ke antrian untuk broadcast via WebSocket
             update_payload = {
                 'type': 'invalidation',
                 'ioa': ioa,
                 'value': 'INVALID',
-                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+                'quality': CONNECTION_LOST_QUALITY,
+                't': now_ms
             }
-            main_loop.call_soon_threadsafe(update_queue.put_nowait, update_payload)
-            
-            ioa_config = iec104_server.IOA_list.get(ioa)
-            if ioa_config:
-                io_type = ioa_config.get('type')
-                creator_func = None
-                if io_type == MeasuredValueScaled: creator_func = MeasuredValueScaled_create
-                elif io_type == MeasuredValueShort: creator_func = MeasuredValueShort_create
-                elif io_type == SinglePointInformation: creator_func = SinglePointInformation_create
-                elif io_type == DoublePointInformation: creator_func = DoublePointInformation_create
-                if creator_func:
-                    new_asdu = CS101_ASDU_create(al_params, False, CS101_COT_SPONTANEOUS, 0, 1, False, False)
-                    io = cast(creator_func(None, ioa, 0, quality_flags), InformationObject)
-                    CS101_ASDU_addInformationObject(new_asdu, io)
-                    InformationObject_destroy(io)
-                    CS104_Slave_enqueueASDU(iec104_server.slave, new_asdu)
-                    CS101_ASDU_destroy(new_asdu)
-        for ioa in ioas_to_invalidate:
-            if ioa in iec104_server.IOA_list:
-                iec104_server.IOA_list[ioa]['data'] = float('nan')
+            ui_channel.put(update_payload)
 
 def ied_data_callback(key, data, ied_id):
-    if main_loop and update_queue:
-        update_item = {'type': 'process_data', 'ied_id': ied_id, 'key': key, 'data': data}
-        main_loop.call_soon_threadsafe(update_queue.put_nowait, update_item)
+    received = time.perf_counter()
+    if PIPELINE_MODE == 'direct':
+        # Tanpa perpindahan thread: update ditulis ke tabel titik dan ASDU di-enqueue dari thread callback ini
+        try:
+            process_data_update(ied_id, key, data, received)
+        except Exception as e:
+            value_log.log(ied_id, logging.ERROR, "[%s] Error processing update for %s: %s", ied_id, key, e, exc_info=True)
+        return
+    if process_channel:
+        # kebijakan 'block': thread IED menunggu jika antrian penuh sehingga memori tetap terbatas
+        process_channel.put({'type': 'process_data', 'ied_id': ied_id, 'key': key, 'data': data, 'received': received})
     else:
-        logging.warning(f"[{ied_id}] Main loop/queue not available, data point dropped.")
+        value_log.log(ied_id, logging.WARNING, "[%s] Main loop/queue not available, data point dropped.", ied_id)
 
 def invalidate_ied_points(ied_id):
-    if main_loop and update_queue:
-        update_item = {'type': 'invalidate', 'ied_id': ied_id}
-        main_loop.call_soon_threadsafe(update_queue.put_nowait, update_item)
+    if process_channel:
+        process_channel.put({'type': 'invalidate', 'ied_id': ied_id}, force=True)
     else:
         logging.warning(f"[{ied_id}] Main loop/queue not available, invalidation dropped.")
 
+def report_samples():
+    with clients_dict_lock:
+        clients = list(ied_clients.items())
+    for ied_id, client in clients:
+        for rcb, count in list(client.report_counts.items()):
+            yield (ied_id, rcb), count
+
+def channel_samples(field):
+    def samples():
+        for channel in (process_channel, ui_channel):
+            if channel is not None:
+                yield (channel.name,), channel.stats()[field]
+    return samples
+
+def register_runtime_metrics():
+    """Metrik yang dibaca saat scrape dari objek yang sudah ada (client IED, channel, executor, server 104)."""
+    register = metrics_registry.register
+    register(CallbackMetric('gateway_reports_total', 'IEC 61850 reports received per RCB (resets when the IED reconnects)',
+                            ('ied', 'rcb'), report_samples, 'counter'))
+    register(CallbackMetric('gateway_ied_connected', 'IED connection state (1 = connected)', ('ied',),
+                            lambda: (((ied_id,), int(status.get('state') == 'connected')) for ied_id, status in list(ied_status.items()))))
+    register(CallbackMetric('gateway_channel_depth', 'Items waiting in a gateway channel', ('channel',), channel_samples('depth')))
+    register(CallbackMetric('gateway_channel_high_water', 'Highest depth reached by a gateway channel', ('channel',), channel_samples('high_water')))
+    register(CallbackMetric('gateway_channel_dropped_total', 'Items dropped by a gateway channel', ('channel',), channel_samples('dropped'), 'counter'))
+    register(CallbackMetric('gateway_channel_coalesced_total', 'Items coalesced by a gateway channel', ('channel',), channel_samples('coalesced'), 'counter'))
+    register(CallbackMetric('gateway_channel_blocked_total', 'Producer waits on a full gateway channel', ('channel',), channel_samples('blocked'), 'counter'))
+    register(CallbackMetric('gateway_executor_busy_threads', 'Executor threads currently running a task', (), lambda: [((), executor.busy)]))
+    register(CallbackMetric('gateway_executor_max_threads', 'Executor thread pool size', (), lambda: [((), executor._max_workers)]))
+    register(CallbackMetric('gateway_executor_queued_tasks', 'Tasks waiting for a free executor thread', (), lambda: [((), executor.queued())]))
+    register(iec104_server.asdus_enqueued)
+    register(iec104_server.asdus_sent)
+    register(iec104_server.gi_duration)
+    register(iec104_server.group_gi_duration)
+    register(CallbackMetric('iec104_batch_pending_objects', 'Spontaneous changes waiting for the next batch flush', (),
+                            lambda: [((), iec104_server.batch_pending_count)]))
+    register(CallbackMetric('iec104_queue_entries', 'ASDUs waiting in an IEC 104 event queue (shared queue or redundancy group)',
+                            ('queue',), iec104_server.queue_samples))
+    register(CallbackMetric('iec104_queue_size', 'Capacity of each IEC 104 event queue', (), lambda: [((), iec104_server.queue_size)]))
+    register(CallbackMetric('iec104_connection_queue_fill_ratio', 'Fill level (0..1) of the event queue serving an IEC 104 connection',
+                            ('peer', 'queue'), iec104_server.connection_samples))
+    register(CallbackMetric('iec104_connection_active', 'IEC 104 master connection state (1 = STARTDT active)', ('peer',),
+                            lambda: (((info['peer'],), int(info['active'])) for info in list(iec104_server.connections.values()))))
+
+def set_ied_status(ied_id, **fields):
+    status = ied_status.setdefault(ied_id, {'state': 'unknown', 'reconnects': 0})
+    if fields.get('state') != status.get('state'):
+        status['since'] = int(time.time() * 1000)
+    status.update(fields)
+
 # --- ASYNC TASKS ---
 
 async def ied_handler(ied_id, uris):
@@ -242,18 +450,30 @@ async def ied_handler(ied_id, uris):
     loop = asyncio.get_running_loop()
     client = None
     active_polling_interval = FALLBACK_POLLING_INTERVAL
+    poll_metric = poll_duration.labels(ied_id)
+    reconnect_metric = reconnects_total.labels(ied_id)
 
     ied_locks[ied_id] = threading.Lock()
     ied_lock = ied_locks[ied_id]
+    discovery_scope = [urlparse(uri).path.lstrip('/') for uri, _ in uris] if DISCOVERY_SCOPED else None
 
     def polling_entry_point(key, data):
-        logging.debug(f"[{ied_id}] Data received via POLLING for key: {key}")
+        logging.debug("[%s] Data received via POLLING for key: %s", ied_id, key)
         ied_data_callback(key, data, ied_id)
 
     def report_entry_point(key, data):
-        logging.debug(f"[{ied_id}] Data received via REPORT for key: {key}")
+        logging.debug("[%s] Data received via REPORT for key: %s", ied_id, key)
         ied_data_callback(key, data, ied_id)
 
+    # Model offline (SCL) tidak cocok dengan IED: client sudah menutup koneksinya, titik diinvalidasi
+    # dan handler langsung menyambung ulang agar report didaftarkan ulang dengan model baru
+    model_changed = asyncio.Event()
+
+    def model_changed_entry_point(tupl):
+        logging.warning(f"[{ied_id}] IED model changed, invalidating points and re-registering reports.")
+        invalidate_ied_points(ied_id)
+        loop.call_soon_threadsafe(model_changed.set)
+
     def locked_check_state():
         with ied_lock:
             if not client or not client.getRegisteredIEDs().get(ied_id, {}).get('con'):
@@ -266,19 +486,26 @@ async def ied_handler(ied_id, uris):
 
     def locked_register_values():
         with ied_lock:
-            for uri in uris:
-                client.registerReadValue(str(uri))
+            for uri, value_path in uris:
+                client.registerReadValue(str(uri), value_path)
             return len(client.polling)
 
     while not (shutdown_event and shutdown_event.is_set()):
         try:
             logging.info(f"[{ied_id}] Attempting to connect...")
+            set_ied_status(ied_id, state='connecting')
             with ied_lock:
                 client = libiec61850client.iec61850client(
                     readvaluecallback=polling_entry_point,
                     loggerRef=logging,
                     cmdTerm_cb=None,
-                    Rpt_cb=report_entry_point
+                    Rpt_cb=report_entry_point,
+                    discovery_workers=DISCOVERY_WORKERS,
+                    discovery_read_values=DISCOVERY_READ_VALUES,
+                    discovery_scope=discovery_scope,
+                    discovery_report_lns=DISCOVERY_REPORT_LNS,
+                    scl_files={ied_id: SCL_FILES[ied_id]} if ied_id in SCL_FILES else None,
+                    modelChanged_cb=model_changed_entry_point
                 )
 
             res = await loop.run_in_executor(None, client.getIED, ied_id.split(':')[0], int(ied_id.split(':')[1]))
@@ -299,19 +526,32 @@ async def ied_handler(ied_id, uris):
                 active_polling_interval = FALLBACK_POLLING_INTERVAL
 
             logging.info(f"[{ied_id}] Polling interval set to {active_polling_interval} seconds.")
+            set_ied_status(ied_id, state='connected', mode='report' if polling_item_count == 0 else 'polling',
+                           polling_items=polling_item_count, polling_interval=active_polling_interval)
 
             while not (shutdown_event and shutdown_event.is_set()):
+                if model_changed.is_set():
+                    model_changed.clear()
+                    raise ConnectionError("IED model changed, reconnecting to re-register reports.")
                 is_connected = await loop.run_in_executor(None, locked_check_state)
                 if not is_connected:
                     raise ConnectionError("Connection lost (proactive check).")
                 
+                poll_started = time.perf_counter()
                 await loop.run_in_executor(None, client.poll)
+                poll_metric.observe(time.perf_counter() - poll_started)
                 
                 logging.debug(f"[{ied_id}] Main loop waiting for {active_polling_interval}s.")
-                await asyncio.sleep(active_polling_interval)
+                try:
+                    await asyncio.wait_for(model_changed.wait(), timeout=active_polling_interval)
+                except asyncio.TimeoutError:
+                    pass
 
         except Exception as e:
             logging.error(f"[{ied_id}] Handler error: {e}. Reconnecting in {RECONNECT_DELAY}s.")
+            reconnect_metric.inc()
+            set_ied_status(ied_id, state='disconnected', last_error=str(e),
+                           reconnects=ied_status.get(ied_id, {}).get('reconnects', 0) + 1)
             with clients_dict_lock:
                 if ied_id in ied_clients:
                     del ied_clients[ied_id]
@@ -322,33 +562,49 @@ async def ied_handler(ied_id, uris):
             except asyncio.TimeoutError:
                 pass
 
-async def data_processor():
-    """Memproses item dari antrian, baik untuk pembaruan data maupun invalidasi."""
-    logging.info("Data processor task started.")
-    loop = asyncio.get_running_loop()
-    while not (shutdown_event and shutdown_event.is_set()):
+def process_batch(updates):
+    for update in updates:
         try:
-            update = await update_queue.get()
             if update['type'] == 'process_data':
-                await loop.run_in_executor(None, process_data_update, update['ied_id'], update['key'], update['data'])
+                process_data_update(update['ied_id'], update['key'], update['data'], update['received'])
             elif update['type'] == 'invalidate':
-                await loop.run_in_executor(None, do_invalidation, update['ied_id'])
-            # Item lain akan ditangani oleh broadcast_updates
-            update_queue.task_done()
-        except asyncio.CancelledError:
-            logging.info("Data processor task cancelled.")
-            break
+                do_invalidation(update['ied_id'])
         except Exception as e:
-            logging.error(f"Error in data processor: {e}", exc_info=True)
+            logging.error(f"Error processing {update['type']} item: {e}", exc_info=True)
+
+async def data_processor():
+    """Memproses item dari channel proses, baik untuk pembaruan data maupun invalidasi."""
+    logging.info("Data processor task started.")
+    loop = asyncio.get_running_loop()
+    # Thread konsumen sendiri: poll IED di executor default dapat memblokir di put() saat channel penuh.
+    # Jika konsumen berbagi executor itu, semua worker bisa tertahan di put() dan channel tidak pernah dikuras.
+    processor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='process')
+    try:
+        while not (shutdown_event and shutdown_event.is_set()):
+            try:
+                # satu hop executor per batch, bukan per nilai
+                updates = await process_channel.get_batch(PROCESS_QUEUE_SIZE)
+                await loop.run_in_executor(processor, process_batch, updates)
+            except asyncio.CancelledError:
+                logging.info("Data processor task cancelled.")
+                break
+            except Exception as e:
+                logging.error(f"Error in data processor: {e}", exc_info=True)
+    finally:
+        processor.shutdown(wait=False)
 
 async def main():
-    global iec104_server, main_loop, update_queue, shutdown_event, mms_to_value_path_map
+    global iec104_server, main_loop, process_channel, ui_channel, shutdown_event
+    global DISCOVERY_WORKERS, DISCOVERY_READ_VALUES, DISCOVERY_SCOPED, DISCOVERY_REPORT_LNS, SCL_FILES, PIPELINE_MODE
+    global PROCESS_QUEUE_SIZE, UI_QUEUE_SIZE, UI_QUEUE_POLICY, UI_FRAME_RATE, HTTP_PORT, executor
 
     main_loop = asyncio.get_running_loop()
-    update_queue = asyncio.Queue()
+    executor = InstrumentedExecutor(thread_name_prefix='gateway')
+    main_loop.set_default_executor(executor)
     shutdown_event = asyncio.Event()
 
-    logging.basicConfig(format='%(asctime)s [%(levelname)s] %(message)s', level=logging.INFO)
+    # Record log hanya dimasukkan ke antrian; formatting dan I/O di thread listener
+    log_listener = setup_queue_logging(logging.INFO)
     logger = logging.getLogger('gateway-v9.0')
 
     config = configparser.ConfigParser(); config.optionxform = str
@@ -357,27 +613,97 @@ async def main():
     config.read(config_file)
     logger.info("Gateway v9.0 (Realtime HTTP Server) started")
 
-    # Start HTTP server in a separate thread
-    http_thread = threading.Thread(target=start_http_server, daemon=True)
-    http_thread.start()
-
-    # Start WebSocket server
-    websocket_server = await websockets.serve(websocket_handler, "0.0.0.0", WEBSOCKET_PORT)
-    logger.info(f"WebSocket server started on port {WEBSOCKET_PORT}")
-
-    iec104_server = libiec60870server.IEC60870_5_104_server()
-    data_types = {'measuredvaluescaled': MeasuredValueScaled, 'measuredvaluefloat': MeasuredValueShort,
-                  'singlepointinformation': SinglePointInformation, 'doublepointinformation': DoublePointInformation}
-    command_types = {'singlepointcommand': SingleCommand, 'doublepointcommand': DoubleCommand}
+    if 'gateway' in config:
+        PIPELINE_MODE = config['gateway'].get('pipeline', PIPELINE_MODE).strip().lower()
+        if PIPELINE_MODE not in ('queue', 'direct'):
+            logger.warning(f"Unknown pipeline mode '{PIPELINE_MODE}', using 'queue'.")
+            PIPELINE_MODE = 'queue'
+        PROCESS_QUEUE_SIZE = config['gateway'].getint('process_queue_size', PROCESS_QUEUE_SIZE)
+        UI_QUEUE_SIZE = config['gateway'].getint('ui_queue_size', UI_QUEUE_SIZE)
+        UI_QUEUE_POLICY = config['gateway'].get('ui_queue_policy', UI_QUEUE_POLICY).strip().lower()
+        if UI_QUEUE_POLICY not in ('coalesce', 'drop_oldest'):
+            logger.warning(f"Unknown UI queue policy '{UI_QUEUE_POLICY}', using 'coalesce'.")
+            UI_QUEUE_POLICY = 'coalesce'
+        UI_FRAME_RATE = config['gateway'].getfloat('ui_frame_rate', UI_FRAME_RATE)
+        HTTP_PORT = config['gateway'].getint('http_port', HTTP_PORT)
+        log_level = config['gateway'].get('log_level', 'INFO').strip().upper()
+        logging.getLogger().setLevel(getattr(logging, log_level, logging.INFO))
+        value_log.interval = config['gateway'].getfloat('log_sample_interval', value_log.interval)
+        value_log.burst = config['gateway'].getint('log_sample_burst', value_log.burst)
+    logger.info(f"Data pipeline mode: {PIPELINE_MODE}")
+    process_channel = BoundedChannel('process', main_loop, PROCESS_QUEUE_SIZE, 'block')
+    ui_channel = BoundedChannel('ui', main_loop, UI_QUEUE_SIZE, UI_QUEUE_POLICY, key=lambda update: update['ioa'])
+
+    if 'iec61850' in config:
+        DISCOVERY_WORKERS = config['iec61850'].getint('discovery_workers', DISCOVERY_WORKERS)
+        DISCOVERY_READ_VALUES = not config['iec61850'].getboolean('discovery_structure_only', not DISCOVERY_READ_VALUES)
+        DISCOVERY_SCOPED = config['iec61850'].getboolean('discovery_scoped', DISCOVERY_SCOPED)
+        DISCOVERY_REPORT_LNS = [ln.strip() for ln in config['iec61850'].get('discovery_report_lns', '').split(',') if ln.strip()]
+        for entry in config['iec61850'].get('scl_files', '').split(','):
+            if '=' in entry:
+                scl_ied, scl_path = entry.split('=', 1)
+                SCL_FILES[scl_ied.strip()] = scl_path.strip()
+
+    # UI, WebSocket dan REST API di satu port pada event loop utama
+    websocket_server = await websockets.serve(websocket_handler, "0.0.0.0", HTTP_PORT, process_request=http_request)
+    logger.info(f"HTTP/WebSocket server started on port {HTTP_PORT} (UI at /, WebSocket at /ws, API at /api/)")
+
+    server_options = {}
+    if 'iec104' in config:
+        server_cfg = config['iec104']
+        server_mode = server_cfg.get('server_mode', 'single').strip().lower()
+        if server_mode not in libiec60870server.SERVER_MODES:
+            logger.warning(f"Unknown IEC 104 server mode '{server_mode}', using 'single'.")
+            server_mode = 'single'
+        server_options = {
+            'ip': server_cfg.get('local_address', '0.0.0.0'),
+            'port': server_cfg.getint('port', IEC_60870_5_104_DEFAULT_PORT),
+            'mode': server_mode,
+            'queue_size': server_cfg.getint('queue_size', 100),
+            'high_priority_queue_size': server_cfg.getint('high_priority_queue_size', 100),
+            'max_connections': server_cfg.getint('max_connections', 0),
+            'redundancy_groups': {option[len('redundancy_group_'):]: [ip.strip() for ip in value.split(',') if ip.strip()]
+                                  for option, value in server_cfg.items() if option.startswith('redundancy_group_')},
+        }
+        if server_options['redundancy_groups'] and server_mode != 'multiple':
+            logger.warning("redundancy_group_* options are only used with server_mode=multiple.")
+    iec104_server = libiec60870server.IEC60870_5_104_server(**server_options)
+    logger.info(f"IEC 104 server mode: {iec104_server.mode}, event queue size {iec104_server.queue_size}"
+                + (f", redundancy groups: {', '.join(iec104_server.redundancy_groups)}" if iec104_server.redundancy_groups else ""))
+    deadband_defaults = {}
+    if 'iec104' in config:
+        server_cfg = config['iec104']
+        batch_interval_ms = server_cfg.getint('batch_interval_ms', 0)
+        if batch_interval_ms > 0:
+            iec104_server.set_batching(batch_interval_ms / 1000.0, server_cfg.getint('batch_max_objects', 0))
+            logger.info(f"Spontaneous ASDU batching enabled ({batch_interval_ms} ms).")
+        deadband_defaults = {arg: server_cfg.getfloat(option) for option, arg in DEADBAND_OPTIONS.items() if option in server_cfg}
+        if server_cfg.getboolean('time_tagged', False):
+            iec104_server.set_time_tagged(True)
+            logger.info("Spontaneous ASDUs use CP56Time2a time tags from IED reports.")
+    data_types, command_types = DATA_TYPES, COMMAND_TYPES
 
     logger.info("Parsing configuration...")
     ied_data_groups = {}
+    ioa_interrogation_groups = {}
+    ioa_deadbands = {}
+    inverted_ioas = set()
     all_sections = list(data_types.keys()) + list(command_types.keys())
     for section in all_sections:
         if section in config:
             for ioa, config_line in config[section].items():
                 uri_part, should_invert, value_path = config_line, False, None
                 if ':invers=true' in uri_part: uri_part, should_invert = uri_part.replace(':invers=true', ''), True
+                group_match = re.search(r':group=([\d,\s]+)', uri_part)
+                if group_match:
+                    uri_part = uri_part[:group_match.start()] + uri_part[group_match.end():]
+                    groups = [int(g) for g in group_match.group(1).split(',') if g.strip()]
+                    invalid = [g for g in groups if not 1 <= g <= 16]
+                    if invalid: logger.warning(f"IOA {ioa}: interrogation group {invalid} outside 1..16 ignored")
+                    ioa_interrogation_groups[int(ioa)] = [g for g in groups if 1 <= g <= 16]
+                for option_match in list(re.finditer(r':(' + '|'.join(DEADBAND_OPTIONS) + r')=([\d.]+)', uri_part))[::-1]:
+                    uri_part = uri_part[:option_match.start()] + uri_part[option_match.end():]
+                    ioa_deadbands.setdefault(int(ioa), {})[DEADBAND_OPTIONS[option_match.group(1)]] = float(option_match.group(2))
                 if '#' in uri_part: uri_part, value_path = uri_part.split('#', 1)
                 
                 parsed = urlparse(uri_part)
@@ -389,18 +715,27 @@ async def main():
                 if ioa_int not in ied_to_ioas_map[ied_id]: ied_to_ioas_map[ied_id].append(ioa_int)
                 
                 if section in data_types:
-                    mms_to_ioa_map[mms_path] = ioa_int
-                    if value_path: mms_to_value_path_map[mms_path] = value_path
+                    mms_index.add(ied_id, mms_path, ioa_int, value_path)
                     if ied_id not in ied_data_groups: ied_data_groups[ied_id] = []
-                    if uri_part not in ied_data_groups[ied_id]: ied_data_groups[ied_id].append(uri_part)
+                    if (uri_part, value_path) not in ied_data_groups[ied_id]: ied_data_groups[ied_id].append((uri_part, value_path))
 
-                if should_invert: ioa_inversion_map[ioa_int] = True
+                if should_invert: inverted_ioas.add(ioa_int)
                 if section in command_types: ioa_to_mms_config[ioa_int] = config_line
 
     logger.info(f"Found {len(ied_data_groups)} unique IEDs to monitor.")
+    for ied_id in ied_to_ioas_map:
+        ied_update_counters[ied_id] = updates_total.labels(ied_id)
+    register_runtime_metrics()
     for section, mms_type in data_types.items():
         if section in config:
-            for item in config[section]: iec104_server.add_ioa(int(item), mms_type, 0, None, True)
+            for item in config[section]:
+                iec104_server.add_ioa(int(item), mms_type, 0, None, True, ioa_interrogation_groups.get(int(item), ()),
+                                      FLAG_INVERT if int(item) in inverted_ioas else 0)
+    for section in ('measuredvaluescaled', 'measuredvaluefloat'):
+        if section in config:
+            for item in config[section]:
+                options = dict(deadband_defaults, **ioa_deadbands.get(int(item), {}))
+                if options: iec104_server.set_deadband(int(item), **options)
     for section, mms_type in command_types.items():
         if section in config:
             for item in config[section]: iec104_server.add_ioa(int(item), mms_type, 0, command_60870_callback, False)
@@ -411,7 +746,8 @@ async def main():
 
     tasks = [ied_handler(ied_id, uris) for ied_id, uris in ied_data_groups.items()]
     tasks.append(data_processor())
-    tasks.append(broadcast_updates(update_queue)) # Task baru untuk broadcast
+    tasks.append(broadcast_updates(ui_channel)) # Task baru untuk broadcast
+    tasks.append(channel_monitor([process_channel, ui_channel]))
 
     try:
         await asyncio.gather(*tasks)
@@ -424,13 +760,23 @@ async def main():
         if iec104_server:
             iec104_server.stop()
         logging.info("Gateway stopped.")
+        log_listener.stop()
+
+def index_is_current():
+    """True jika index.html ada dan dibuat oleh versi UI ini (mengandung INDEX_MARKER)."""
+    try:
+        with open(INDEX_FILE, encoding='utf-8') as f:
+            return INDEX_MARKER in f.read()
+    except (OSError, UnicodeDecodeError):
+        return False
 
 if __name__ == '__main__':
-    # Buat file index.html jika belum ada
-    if not os.path.exists("index.html"):
-        with open("index.html", "w") as f:
+    # Buat index.html jika belum ada atau berasal dari versi UI lain (mis. masih memakai ws://localhost:8001)
+    if not index_is_current():
+        with open(INDEX_FILE, "w", encoding='utf-8') as f:
             f.write("""
 <!DOCTYPE html>
+""" + INDEX_MARKER + """
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -464,8 +810,31 @@ if __name__ == '__main__':
         const tableBody = document.querySelector("#data-table tbody");
         const statusSpan = document.getElementById("status");
 
+        // ?protocol=binary pada URL halaman memakai frame biner ringkas; default JSON
+        const protocol = new URLSearchParams(window.location.search).get("protocol") === "binary" ? "binary" : "json";
+
+        // Frame biner: header 14 byte (versi, tipe, jumlah, waktu dasar ms) + 13 byte per IOA
+        function decodeBinaryFrame(buffer) {
+            const view = new DataView(buffer);
+            const count = view.getUint32(2, true);
+            const base = Number(view.getBigInt64(6, true));
+            const updates = [];
+            for (let i = 0, offset = 14; i < count; i++, offset += 13) {
+                const value = view.getFloat32(offset + 4, true);
+                updates.push({
+                    type: Number.isNaN(value) ? 'invalidation' : 'data_update',
+                    ioa: view.getUint32(offset, true),
+                    value: value,
+                    quality: view.getUint8(offset + 8),
+                    t: base + view.getInt32(offset + 9, true)
+                });
+            }
+            return { type: view.getUint8(1) === 1 ? 'snapshot' : 'batch', updates: updates };
+        }
+
         function connect() {
-            const socket = new WebSocket("ws://localhost:8001");
+            const socket = new WebSocket(`ws://${window.location.host}/ws?protocol=${protocol}`);
+            socket.binaryType = "arraybuffer";
 
             socket.onopen = function(e) {
                 console.log("[open] Connection established");
@@ -473,9 +842,7 @@ if __name__ == '__main__':
                 statusSpan.style.color = "green";
             };
 
-            socket.onmessage = function(event) {
-                const data = JSON.parse(event.data);
-                
+            function applyUpdate(data, timestamp) {
                 // Cari atau buat baris tabel baru untuk IOA
                 let row = document.getElementById(`ioa-${data.ioa}`);
                 if (!row) {
@@ -489,12 +856,22 @@ if __name__ == '__main__':
 
                 if (data.type === 'data_update') {
                     valueCell.textContent = typeof data.value === 'number' ? data.value.toFixed(2) : data.value;
+                    valueCell.style.color = (data.quality & 0x80) ? 'red' : '';
                 } else if (data.type === 'invalidation') {
                     valueCell.textContent = 'INVALID';
                     valueCell.style.color = 'red';
                 }
                 
-                timestampCell.textContent = data.timestamp;
+                timestampCell.textContent = timestamp;
+            }
+
+            socket.onmessage = function(event) {
+                // Frame 'snapshot' (saat terhubung) dan 'batch' berisi nilai terbaru per IOA
+                const frame = typeof event.data === "string" ? JSON.parse(event.data) : decodeBinaryFrame(event.data);
+                const updates = frame.updates || [frame];
+                for (const data of updates) {
+                    applyUpdate(data, data.t ? new Date(data.t).toLocaleString() : (data.timestamp || frame.timestamp));
+                }
             };
 
             socket.onclose = function(event) {
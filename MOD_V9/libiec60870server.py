@@ -1,9 +1,76 @@
 #!/usr/bin/env python3
 from lib60870 import *
+from quality_map import STATUS_QUALITY_MASK, CONNECTION_LOST_QUALITY
+from deadband import DeadbandTable, SEND, HOLD
+from point_table import PointTable, FLAG_EVENT, NO_TIMESTAMP
+from metrics import Counter, Histogram, DURATION_BUCKETS
+import bisect
+import threading
 import time
 
+# Ukuran elemen informasi (nilai + QDS, tanpa IOA) per tipe, untuk menghitung kapasitas ASDU
+IO_ELEMENT_SIZE = {
+    MeasuredValueScaled: 3,
+    MeasuredValueShort: 5,
+    SinglePointInformation: 1,
+    DoublePointInformation: 1,
+    MeasuredValueScaledWithCP56Time2a: 10,
+    MeasuredValueShortWithCP56Time2a: 12,
+    SinglePointWithCP56Time2a: 8,
+    DoublePointWithCP56Time2a: 8,
+}
+# Tipe bertimestamp CP56Time2a untuk event spontan (M_ME_TE_1, M_ME_TF_1, M_SP_TB_1, M_DP_TB_1)
+TIMED_TYPES = {
+    MeasuredValueScaled: MeasuredValueScaledWithCP56Time2a,
+    MeasuredValueShort: MeasuredValueShortWithCP56Time2a,
+    SinglePointInformation: SinglePointWithCP56Time2a,
+    DoublePointInformation: DoublePointWithCP56Time2a,
+}
+ASDU_MAX_ELEMENTS = 127 # batas field "number of objects" di VSQ
+IO_TIMED = set(TIMED_TYPES.values())
+# Tipe yang melewati filter deadband
+MEASURED_TYPES = (MeasuredValueScaled, MeasuredValueShort)
+# Interval evaluasi deadband (detik) jika batching nonaktif
+DEADBAND_FLUSH_INTERVAL = 0.02
+# Urutan tipe pada respons interrogation (CS101 hanya mengizinkan objek tanpa timestamp)
+GI_TYPES = [MeasuredValueScaled, MeasuredValueShort, SinglePointInformation, DoublePointInformation]
+# Mode server CS104 (opsi server_mode di config)
+SERVER_MODES = {
+    'single': CS104_MODE_SINGLE_REDUNDANCY_GROUP, # satu antrian event untuk semua master
+    'connection': CS104_MODE_CONNECTION_IS_REDUNDANCY_GROUP, # antrian event sendiri per koneksi
+    'multiple': CS104_MODE_MULTIPLE_REDUNDANCY_GROUPS, # antrian per redundancy group, master dipilih lewat IP
+}
+DEFAULT_GROUP = 'default' # nama antrian bersama pada mode single / group catch-all pada mode multiple
+
+
+def sequential_runs(ioas):
+    """Memecah daftar IOA terurut menjadi deret berurutan, mis. [1,2,3,7,8] -> [[1,2,3],[7,8]]."""
+    runs = []
+    for ioa in ioas:
+        if runs and ioa == runs[-1][-1] + 1:
+            runs[-1].append(ioa)
+        else:
+            runs.append([ioa])
+    return runs
+
+
+def peer_ip(peer):
+    """IP dari alamat peer lib60870 ('10.0.0.1:40000' atau '[::1]:40000')."""
+    return peer.rsplit(':', 1)[0].strip('[]') if ':' in peer else peer
+
 class IEC60870_5_104_server:
 
+    IO_CREATORS = {
+        MeasuredValueScaled: MeasuredValueScaled_create,
+        MeasuredValueShort: MeasuredValueShort_create,
+        SinglePointInformation: SinglePointInformation_create,
+        DoublePointInformation: DoublePointInformation_create,
+        MeasuredValueScaledWithCP56Time2a: MeasuredValueScaledWithCP56Time2a_create,
+        MeasuredValueShortWithCP56Time2a: MeasuredValueShortWithCP56Time2a_create,
+        SinglePointWithCP56Time2a: SinglePointWithCP56Time2a_create,
+        DoublePointWithCP56Time2a: DoublePointWithCP56Time2a_create,
+    }
+
     def printCP56Time2a(self, time):
         print("%02i:%02i:%02i %02i/%02i/%04i" % ( CP56Time2a_getHour(time),
                                         CP56Time2a_getMinute(time),
@@ -24,63 +91,44 @@ class IEC60870_5_104_server:
     def GI_h(self, param, connection, asdu, qoi):
         print(f"Received interrogation for group {qoi}")
 
-        if (qoi == 20): #{ /* only handle station interrogation */
+        if (qoi == 20): #{ /* station interrogation */
+            started = time.perf_counter()
             alParams = IMasterConnection_getApplicationLayerParameters(connection)
             IMasterConnection_sendACT_CON(connection, asdu, False)
-
-            #* The CS101 specification only allows information objects without timestamp in GI responses */
-
-            all_types = [MeasuredValueScaled, MeasuredValueShort, SinglePointInformation, DoublePointInformation]
-
-            for data_type in all_types:
-                newAsdu = CS101_ASDU_create(alParams, False, CS101_COT_INTERROGATED_BY_STATION, 0, 1, False, False)
-                io = None
-                has_data = False
-
-                for ioa in self.IOA_list:
-                    if self.IOA_list[ioa]['type'] == data_type:
-                        has_data = True
-                        value = self.IOA_list[ioa]['data']
-                        quality = IEC60870_QUALITY_GOOD
-
-                        if data_type == MeasuredValueScaled:
-                            creator = MeasuredValueScaled_create
-                        elif data_type == MeasuredValueShort:
-                            creator = MeasuredValueShort_create
-                        elif data_type == SinglePointInformation:
-                            creator = SinglePointInformation_create
-                        elif data_type == DoublePointInformation:
-                            creator = DoublePointInformation_create
-
-                        if io is None:
-                            io = cast(creator(None, ioa, value, quality), InformationObject)
-                            CS101_ASDU_addInformationObject(newAsdu, io)
-                        else:
-                            if data_type == MeasuredValueScaled:
-                                cast_type = MeasuredValueScaled
-                            elif data_type == MeasuredValueShort:
-                                cast_type = MeasuredValueShort
-                            elif data_type == SinglePointInformation:
-                                cast_type = SinglePointInformation
-                            elif data_type == DoublePointInformation:
-                                cast_type = DoublePointInformation
-
-                            CS101_ASDU_addInformationObject(newAsdu, cast(creator(cast(io, cast_type), ioa, value, quality), InformationObject))
-
-                if has_data:
-                    IMasterConnection_sendASDU(connection, newAsdu)
-
-                if io is not None:
-                    InformationObject_destroy(io)
-
-                CS101_ASDU_destroy(newAsdu)
-
-
+            self.send_interrogation_response(connection, alParams, CS101_COT_INTERROGATED_BY_STATION, self.type_groups)
             IMasterConnection_sendACT_TERM(connection, asdu)
+            self.gi_duration.observe(time.perf_counter() - started)
+        elif (21 <= qoi <= 36): # group interrogation 1..16, group tanpa anggota dijawab kosong
+            started = time.perf_counter()
+            group = qoi - 20
+            alParams = IMasterConnection_getApplicationLayerParameters(connection)
+            IMasterConnection_sendACT_CON(connection, asdu, False)
+            self.send_interrogation_response(connection, alParams, CS101_COT_INTERROGATED_BY_GROUP_1 + group - 1,
+                                             self.interrogation_groups.get(group, {}))
+            IMasterConnection_sendACT_TERM(connection, asdu)
+            self.group_gi_duration.observe(time.perf_counter() - started)
         else:
             IMasterConnection_sendACT_CON(connection, asdu, True)
 
-
+    def send_interrogation_response(self, connection, alParams, cot, groups):
+        """Mengirim semua IOA dalam groups ({tipe: [ioa terurut]}) sebagai ASDU berukuran benar.
+
+        Deret IOA berurutan sepanjang minimal gi_sequence_min memakai encoding SQ=1 (IOA hanya sekali per ASDU),
+        sisanya dikemas ke ASDU SQ=0.
+        """
+        # satu snapshot konsisten untuk seluruh respons, tanpa menahan penulis
+        columns = self.points.columns()
+        for io_type in GI_TYPES:
+            ioas = groups.get(io_type)
+            if not ioas:
+                continue
+            single = []
+            for run in sequential_runs(ioas):
+                if len(run) >= self.gi_sequence_min:
+                    self.send_objects(io_type, self._objects(io_type, run, columns=columns), cot, connection, alParams, sequence=True)
+                else:
+                    single.extend(run)
+            self.send_objects(io_type, self._objects(io_type, single, columns=columns), cot, connection, alParams)
 
     def ASDU_h(self, param, connection, asdu):
         print("ASDU received")
@@ -88,20 +136,21 @@ class IEC60870_5_104_server:
         if cot == CS101_COT_ACTIVATION:
             io = CS101_ASDU_getElement(asdu, 0)
             ioa = InformationObject_getObjectAddress(io)
-            if not ioa in self.IOA_list:
+            if not ioa in self.points:
                 print("could not find IOA")
                 CS101_ASDU_setCOT(asdu, CS101_COT_UNKNOWN_IOA)
             else:
-                ioa_object = self.IOA_list[ioa]
+                io_type = self.points.type_of(ioa)
+                callback = self.points.callbacks.get(ioa)
                 if (CS101_ASDU_getTypeID(asdu) == C_SC_NA_1):
                     print("received single command")
-                    if ioa_object['type'] == SingleCommand:
+                    if io_type == SingleCommand:
                         sc = cast( io, SingleCommand)
 
                         print(f"IOA: {InformationObject_getObjectAddress(io)} switch to {SingleCommand_getState(sc)}, select:{SingleCommand_isSelect(sc)}")
-                        ioa_object['data'] = SingleCommand_getState(sc)
-                        if self.IOA_list[ioa]['callback'] != None:
-                            self.IOA_list[ioa]['callback'](ioa,ioa_object, self, SingleCommand_isSelect(sc))
+                        self.points.set(ioa, SingleCommand_getState(sc))
+                        if callback != None:
+                            callback(ioa, self.points.point(ioa), self, SingleCommand_isSelect(sc))
 
                         CS101_ASDU_setCOT(asdu, CS101_COT_ACTIVATION_CON)
                     else:
@@ -110,12 +159,12 @@ class IEC60870_5_104_server:
 
                 if (CS101_ASDU_getTypeID(asdu) == C_DC_NA_1):
                     print("received double command")
-                    if ioa_object['type'] == DoubleCommand:
+                    if io_type == DoubleCommand:
                         sc = cast( io, DoubleCommand)
                         print(f"IOA: {InformationObject_getObjectAddress(io)} switch to {DoubleCommand_getState(sc)}, select:{DoubleCommand_isSelect(sc)}")
-                        ioa_object['data'] = DoubleCommand_getState(sc)
-                        if self.IOA_list[ioa]['callback'] != None:
-                            self.IOA_list[ioa]['callback'](ioa,ioa_object, self, DoubleCommand_isSelect(sc))
+                        self.points.set(ioa, DoubleCommand_getState(sc))
+                        if callback != None:
+                            callback(ioa, self.points.point(ioa), self, DoubleCommand_isSelect(sc))
 
                         CS101_ASDU_setCOT(asdu, CS101_COT_ACTIVATION_CON)
                     else:
@@ -139,36 +188,42 @@ class IEC60870_5_104_server:
         return True
 
     def Conn_event(self, param, con, event):
+        key = cast(con, c_void_p).value
         if (event == CS104_CON_EVENT_CONNECTION_OPENED):
-            print(f"Connection opened {con}")
+            peer = self.peer_address(con)
+            self.connections[key] = {'peer': peer, 'group': self.group_of(peer_ip(peer)), 'active': False, 'since': time.time()}
+            print(f"Connection opened {peer} (queue: {self.connections[key]['group'] or 'own'})")
         elif (event == CS104_CON_EVENT_CONNECTION_CLOSED):
-            print(f"Connection closed {con}")
+            info = self.connections.pop(key, None)
+            print(f"Connection closed {info['peer'] if info else con}")
         elif (event == CS104_CON_EVENT_ACTIVATED):
+            if key in self.connections:
+                self.connections[key]['active'] = True
             print(f"Connection activated {con}")
         elif (event == CS104_CON_EVENT_DEACTIVATED):
+            if key in self.connections:
+                self.connections[key]['active'] = False
             print(f"Connection deactivated {con}")
 
-    def read(self, param, connection, asdu, ioa):
-        if ioa in self.IOA_list:
-            if self.IOA_list[ioa]['callback'] != None:
-                self.IOA_list[ioa]['callback'](ioa,self.IOA_list[ioa], self)
+    @staticmethod
+    def peer_address(con):
+        buffer = create_string_buffer(60)
+        IMasterConnection_getPeerAddress(con, cast(buffer, POINTER(c_char)), len(buffer))
+        return buffer.value.decode(errors='replace')
 
-            newAsdu = CS101_ASDU_create(self.alParams, False, CS101_COT_SPONTANEOUS, 0, 1, False, False)
+    def read(self, param, connection, asdu, ioa):
+        if ioa in self.points:
+            callback = self.points.callbacks.get(ioa)
+            if callback != None:
+                callback(ioa, self.points.point(ioa), self)
 
-            io_type = self.IOA_list[ioa]['type']
-            io_data = self.IOA_list[ioa]['data']
-
-            if io_type == MeasuredValueScaled:
-                io = cast(MeasuredValueScaled_create(None, ioa, io_data, IEC60870_QUALITY_GOOD),InformationObject)
-            elif io_type == MeasuredValueShort:
-                io = cast(MeasuredValueShort_create(None, ioa, io_data, IEC60870_QUALITY_GOOD), InformationObject)
-            elif io_type == SinglePointInformation:
-                io = cast(SinglePointInformation_create(None, ioa, io_data, IEC60870_QUALITY_GOOD),InformationObject)
-            elif io_type == DoublePointInformation:
-                io = cast(DoublePointInformation_create(None, ioa, io_data, IEC60870_QUALITY_GOOD),InformationObject)
-            else:
+            io_type = self.points.type_of(ioa)
+            if io_type not in GI_TYPES:
                 return False
 
+            newAsdu = CS101_ASDU_create(self.alParams, False, CS101_COT_SPONTANEOUS, 0, 1, False, False)
+            io = self.create_io(io_type, None, *self._objects(io_type, [ioa])[0])
+
             CS101_ASDU_addInformationObject(newAsdu, io)
             InformationObject_destroy(io)
             CS104_Slave_enqueueASDU(self.slave, newAsdu)
@@ -177,7 +232,18 @@ class IEC60870_5_104_server:
         return False
 
 
-    def __init__(self, ip = "0.0.0.0"):
+    def __init__(self, ip = "0.0.0.0", port = IEC_60870_5_104_DEFAULT_PORT, mode = 'single', queue_size = 100,
+                 high_priority_queue_size = 100, max_connections = 0, redundancy_groups = None):
+        """Server IEC 104.
+
+        mode: 'single' (semua master berbagi satu antrian event), 'connection' (antrian per koneksi) atau
+        'multiple' (antrian per redundancy group). redundancy_groups untuk mode multiple: {nama: [ip master]};
+        group tanpa IP menerima master yang tidak terdaftar di group lain. Tanpa group, satu group catch-all dibuat.
+        queue_size: kapasitas antrian event (ASDU, prioritas rendah) per antrian; high_priority_queue_size:
+        kapasitas antrian respons (GI, konfirmasi perintah) per koneksi. max_connections: 0 = default lib60870.
+        """
+        if mode not in SERVER_MODES:
+            raise ValueError(f"Unknown IEC 104 server mode '{mode}' (expected one of {', '.join(SERVER_MODES)})")
         self.clockSyncHandler = CS101_ClockSynchronizationHandler(self.clock)
         self.interrogationHandler = CS101_InterrogationHandler(self.GI_h)
         self.asduHandler = CS101_ASDUHandler(self.ASDU_h)
@@ -185,9 +251,26 @@ class IEC60870_5_104_server:
         self.connectionEventHandler = CS104_ConnectionEventHandler(self.Conn_event)
         self.readEventHandler = CS101_ReadHandler(self.read)
 
-        self.slave = CS104_Slave_create(100, 100)
+        self.slave = CS104_Slave_create(queue_size, high_priority_queue_size)
         CS104_Slave_setLocalAddress(self.slave, ip)
-        CS104_Slave_setServerMode(self.slave, CS104_MODE_SINGLE_REDUNDANCY_GROUP)
+        CS104_Slave_setLocalPort(self.slave, port)
+        if max_connections > 0:
+            CS104_Slave_setMaxOpenConnections(self.slave, max_connections)
+        self.mode = mode
+        self.queue_size = queue_size
+        CS104_Slave_setServerMode(self.slave, SERVER_MODES[mode])
+
+        # Redundancy group (mode multiple): {nama: (CS104_RedundancyGroup, [ip])}; dimiliki dan dihapus oleh slave
+        self.redundancy_groups = {}
+        if mode == 'multiple':
+            for name, allowed in (redundancy_groups or {DEFAULT_GROUP: []}).items():
+                group = CS104_RedundancyGroup_create(name)
+                for client_ip in allowed:
+                    CS104_RedundancyGroup_addAllowedClient(group, client_ip)
+                CS104_Slave_addRedundancyGroup(self.slave, group)
+                self.redundancy_groups[name] = (group, list(allowed))
+        # Koneksi master yang terbuka: {alamat IMasterConnection: {peer, group, active, since}}
+        self.connections = {}
 
         self.alParams = CS104_Slave_getAppLayerParameters(self.slave)
 
@@ -198,66 +281,356 @@ class IEC60870_5_104_server:
         CS104_Slave_setConnectionEventHandler(self.slave, self.connectionEventHandler, None)
         CS104_Slave_setReadHandler(self.slave, self.readEventHandler, None)
 
-        self.IOA_list = {}
+        # Tabel titik berbentuk kolom (IOA, tipe, nilai, quality, timestamp, flag)
+        self.points = PointTable()
+        # IOA terurut per tipe data monitoring, dipelihara oleh add_ioa untuk respons interrogation
+        self.type_groups = {io_type: [] for io_type in GI_TYPES}
+        # Anggota group interrogation 1..16 (QOI 21..36): {group: {tipe: [ioa terurut]}}
+        self.interrogation_groups = {}
+        self.gi_sequence_min = 8 # panjang minimal deret IOA berurutan untuk encoding SQ=1
+
+        # Deadband/hysteresis per IOA untuk measured value
+        self.deadband = DeadbandTable()
+
+        # Event spontan dengan timestamp CP56Time2a dari IED (respons GI tetap tanpa timestamp)
+        self.time_tagged = False
+
+        # Metrik (didaftarkan ke registry oleh gateway)
+        self.asdus_enqueued = Counter('iec104_asdus_enqueued_total', 'Spontaneous ASDUs enqueued to the IEC 104 event queue')
+        self.asdus_sent = Counter('iec104_asdus_sent_total', 'ASDUs sent directly to a connection (GI and read responses)')
+        self.gi_duration = Histogram('iec104_station_gi_duration_seconds', 'Duration of station interrogation responses', buckets=DURATION_BUCKETS)
+        self.group_gi_duration = Histogram('iec104_group_gi_duration_seconds', 'Duration of group interrogation responses', buckets=DURATION_BUCKETS)
+
+        # Mode batching untuk ASDU spontan (nonaktif jika batch_interval == 0)
+        self.batch_interval = 0.0
+        self.batch_max_objects = 0
+        self.batch_lock = threading.Lock()
+        # menyerialkan flush (ambil antrian tertunda + kirim) dengan flush lain dan dengan invalidate
+        self.flush_lock = threading.RLock()
+        self.batch_pending = {} # measured value: {tipe: {ioa: forced}}, digabung per IOA
+        self.batch_status = {} # titik status: {tipe: [(ioa, nilai, quality, timestamp)]} berurutan, tidak digabung
+        self.batch_pending_count = 0
+        self.batch_wakeup = threading.Event()
+        self.batch_thread = None
+        self.batch_running = False
+
+    def group_of(self, ip):
+        """Nama antrian event yang dipakai master dengan IP ini (None: antrian sendiri atau ditolak)."""
+        if self.mode == 'single':
+            return DEFAULT_GROUP
+        if self.mode == 'multiple':
+            catch_all = None
+            for name, (_, allowed) in self.redundancy_groups.items():
+                if ip in allowed:
+                    return name
+                if not allowed and catch_all is None:
+                    catch_all = name
+            return catch_all
+        return None
+
+    def queue_entries(self, group = DEFAULT_GROUP):
+        """Jumlah ASDU di antrian event (mode single/multiple); None pada mode connection (tidak diekspos lib60870)."""
+        if self.mode == 'single':
+            return CS104_Slave_getNumberOfQueueEntries(self.slave, None)
+        if self.mode == 'multiple' and group in self.redundancy_groups:
+            return CS104_Slave_getNumberOfQueueEntries(self.slave, self.redundancy_groups[group][0])
+        return None
+
+    def queue_samples(self):
+        """(nama antrian,), jumlah entri untuk metrik iec104_queue_entries."""
+        groups = [DEFAULT_GROUP] if self.mode == 'single' else list(self.redundancy_groups)
+        for group in groups:
+            yield (group,), self.queue_entries(group)
+
+    def connection_samples(self):
+        """(peer, antrian), pengisian antrian event (0..1) per koneksi yang terbuka, untuk mode single/multiple."""
+        for info in list(self.connections.values()):
+            entries = self.queue_entries(info['group']) if info['group'] else None
+            if entries is not None:
+                yield (info['peer'], info['group']), entries / self.queue_size
+
+    def set_batching(self, interval = 0.05, max_objects = 0):
+        """Menggabungkan perubahan spontan bertipe sama menjadi ASDU multi-objek.
+
+        interval: tenggat flush dalam detik (0 = batching nonaktif).
+        max_objects: flush lebih awal jika jumlah objek tertunda mencapai nilai ini (0 = kapasitas satu ASDU).
+        """
+        self.batch_interval = float(interval)
+        self.batch_max_objects = int(max_objects)
+
+    def set_deadband(self, ioa, absolute = 0.0, percent = 0.0, min_interval = 0.0, integrated = 0.0):
+        """Deadband untuk measured value IOA; lihat DeadbandTable.configure."""
+        if self.points.type_of(ioa) not in MEASURED_TYPES:
+            return -1
+        self.deadband.configure(ioa, absolute, percent, min_interval, integrated)
+        return 0
 
-    def add_ioa(self, number, type = MeasuredValueScaled, data = 0, callback = None, event = False):
-        if not number in self.IOA_list:
-            self.IOA_list[int(number)] = { 'type': type, 'data': data, 'callback': callback, 'event': event }
+    def set_time_tagged(self, enabled = True):
+        """Mengaktifkan tipe bertimestamp (M_ME_TF_1, M_SP_TB_1, M_DP_TB_1, ...) untuk event spontan."""
+        self.time_tagged = bool(enabled)
+
+    def asdu_capacity(self, io_type, alParams = None, sequence = False):
+        """Jumlah maksimum objek bertipe io_type dalam satu ASDU menurut maxSizeOfASDU."""
+        params = (alParams or self.alParams).contents
+        header = params.sizeOfTypeId + params.sizeOfVSQ + params.sizeOfCOT + params.sizeOfCA
+        if sequence:
+            # SQ=1: IOA hanya sekali untuk objek pertama
+            capacity = (params.maxSizeOfASDU - header - params.sizeOfIOA) // IO_ELEMENT_SIZE.get(io_type, 5)
+        else:
+            capacity = (params.maxSizeOfASDU - header) // (params.sizeOfIOA + IO_ELEMENT_SIZE.get(io_type, 5))
+        return max(1, min(capacity, ASDU_MAX_ELEMENTS))
+
+    def create_io(self, io_type, io, ioa, value, quality = IEC60870_QUALITY_GOOD, timestamp = None):
+        """Membuat (atau menggunakan ulang) information object untuk io_type.
+
+        Untuk tipe bertimestamp, timestamp adalah waktu UTC dalam milidetik (None = waktu sekarang).
+        """
+        creator = self.IO_CREATORS.get(io_type)
+        if creator is None:
+            return None
+        io = cast(io, io_type) if io is not None else None
+        if io_type in IO_TIMED:
+            cp56 = sCP56Time2a()
+            CP56Time2a_createFromMsTimestamp(pointer(cp56), int(timestamp if timestamp is not None else time.time() * 1000))
+            return cast(creator(io, ioa, value, quality, pointer(cp56)), InformationObject)
+        return cast(creator(io, ioa, value, quality), InformationObject)
+
+    def send_objects(self, io_type, objects, cot = CS101_COT_SPONTANEOUS, connection = None, alParams = None, sequence = False):
+        """Mengemas daftar (ioa, value, quality[, timestamp]) ke ASDU multi-objek sebesar mungkin dan mengirimkannya.
+
+        Tanpa connection, ASDU dimasukkan ke antrian event slave (CS104_Slave_enqueueASDU).
+        sequence=True (SQ=1) hanya untuk objek dengan IOA berurutan.
+        """
+        if not objects or io_type not in self.IO_CREATORS:
             return 0
+        alParams = alParams or self.alParams
+        capacity = self.asdu_capacity(io_type, alParams, sequence)
+        sent = 0
+        for start in range(0, len(objects), capacity):
+            newAsdu = CS101_ASDU_create(alParams, sequence, cot, 0, 1, False, False)
+            io = None
+            for obj in objects[start:start + capacity]:
+                io = self.create_io(io_type, io, *obj)
+                if not CS101_ASDU_addInformationObject(newAsdu, io):
+                    # ASDU penuh lebih awal dari perkiraan, kirim dan lanjutkan di ASDU baru
+                    self._dispatch_asdu(newAsdu, connection)
+                    sent += 1
+                    CS101_ASDU_destroy(newAsdu)
+                    newAsdu = CS101_ASDU_create(alParams, sequence, cot, 0, 1, False, False)
+                    CS101_ASDU_addInformationObject(newAsdu, io)
+            if io is not None:
+                InformationObject_destroy(io)
+            self._dispatch_asdu(newAsdu, connection)
+            sent += 1
+            CS101_ASDU_destroy(newAsdu)
+        return sent
+
+    def _dispatch_asdu(self, asdu, connection):
+        if connection is None:
+            CS104_Slave_enqueueASDU(self.slave, asdu)
+            self.asdus_enqueued.inc()
         else:
+            IMasterConnection_sendASDU(connection, asdu)
+            self.asdus_sent.inc()
+
+    def _queue_event(self, ioa, io_type, forced = False, obj = None):
+        """Mengantrikan perubahan untuk flush berikutnya.
+
+        Measured value digabung per IOA (nilai terakhir diambil dari tabel titik saat flush); forced=True
+        melewati deadband (mis. perubahan quality). Titik status tidak digabung: setiap perubahan
+        obj = (ioa, nilai, quality, timestamp) diantrikan berurutan, sehingga transisi OFF->ON->OFF dalam
+        satu jendela sampai ke master lengkap dengan timestamp masing-masing.
+        """
+        with self.batch_lock:
+            if io_type in MEASURED_TYPES:
+                pending = self.batch_pending.setdefault(io_type, {})
+                if ioa not in pending:
+                    pending[ioa] = forced
+                    self.batch_pending_count += 1
+                elif forced:
+                    pending[ioa] = True
+            else:
+                pending = self.batch_status.setdefault(io_type, [])
+                pending.append(obj)
+                self.batch_pending_count += 1
+            limit = self.batch_max_objects or self.asdu_capacity(io_type)
+            if len(pending) >= limit:
+                self.batch_wakeup.set()
+
+    def flush_events(self):
+        """Mengirim semua perubahan tertunda: perubahan status sesuai urutan, measured value dari tabel titik.
+
+        Pengambilan antrian dan pengiriman satu langkah di bawah flush_lock, sehingga flush dari thread lain
+        (batch loop, invalidate, stop) tidak dapat menyalip event yang sudah diambil tetapi belum terkirim.
+        """
+        with self.flush_lock:
+            with self.batch_lock:
+                pending, self.batch_pending = self.batch_pending, {}
+                status, self.batch_status = self.batch_status, {}
+                self.batch_pending_count = 0
+            sent = 0
+            for io_type, objects in status.items():
+                sent += self.send_objects(*self._status_objects(io_type, objects))
+            for io_type, ioas in pending.items():
+                if io_type in MEASURED_TYPES and len(self.deadband):
+                    ioas = self._apply_deadband(io_type, ioas)
+                if ioas:
+                    sent += self.send_objects(*self._event_objects(io_type, ioas))
+            return sent
+
+    def _apply_deadband(self, io_type, pending):
+        """Satu pass deadband atas IOA tertunda {ioa: forced}; nilai yang ditahan interval minimum diantrikan ulang."""
+        now = time.monotonic()
+        candidates = [ioa for ioa, forced in pending.items() if not forced]
+        decisions = self.deadband.evaluate(candidates, [value for _, value, _, _ in self.points.snapshot(candidates)], now)
+        send = [ioa for ioa, forced in pending.items() if forced]
+        for ioa, value, _, _ in self.points.snapshot(send):
+            self.deadband.mark_sent(ioa, value, now)
+        for ioa, decision in zip(candidates, decisions):
+            if decision == SEND:
+                send.append(ioa)
+            elif decision == HOLD:
+                with self.batch_lock:
+                    held = self.batch_pending.setdefault(io_type, {})
+                    if ioa not in held:
+                        held[ioa] = False
+                        self.batch_pending_count += 1
+        return send
+
+    def _objects(self, io_type, ioas, timed = False, columns = None):
+        """Objek (ioa, nilai, quality[, timestamp]) dari tabel titik, dengan nilai bertipe sesuai io_type.
+
+        columns: salinan kolom dari PointTable.columns() agar beberapa pemanggilan memakai snapshot yang sama.
+        """
+        convert = float if io_type == MeasuredValueShort else int
+        if columns is None:
+            snapshot = self.points.snapshot(ioas)
+        else:
+            rows, (value, quality, timestamp) = self.points.rows, columns
+            snapshot = [(ioa, value[rows[ioa]], quality[rows[ioa]], timestamp[rows[ioa]]) for ioa in ioas]
+        if timed:
+            return [(ioa, convert(value), quality, timestamp or None) for ioa, value, quality, timestamp in snapshot]
+        return [(ioa, convert(value), quality) for ioa, value, quality, _ in snapshot]
+
+    def _event_objects(self, io_type, ioas):
+        """(tipe, objek) untuk event spontan dari nilai, quality dan timestamp terakhir di tabel titik."""
+        if self.time_tagged and io_type in TIMED_TYPES:
+            return TIMED_TYPES[io_type], self._objects(io_type, ioas, timed=True)
+        return io_type, self._objects(io_type, ioas)
+
+    def _status_objects(self, io_type, objects):
+        """(tipe, objek) untuk perubahan status yang sudah dicatat (ioa, nilai, quality, timestamp)."""
+        if self.time_tagged and io_type in TIMED_TYPES:
+            return TIMED_TYPES[io_type], [(ioa, int(value), quality, timestamp or None) for ioa, value, quality, timestamp in objects]
+        return io_type, [(ioa, int(value), quality) for ioa, value, quality, _ in objects]
+
+    @staticmethod
+    def point_quality(io_type, quality):
+        """Quality yang valid untuk tipe titik; SIQ/DIQ tidak memiliki flag OV."""
+        if io_type in (SinglePointInformation, DoublePointInformation):
+            return quality & STATUS_QUALITY_MASK
+        return quality
+
+    def invalidate(self, ioas, quality = CONNECTION_LOST_QUALITY):
+        """Menandai sekumpulan titik monitoring dengan flag quality (default IV|NT) secara massal.
+
+        Hanya titik yang quality-nya berubah yang dikirim, dikemas per tipe ke ASDU multi-objek.
+        Mengembalikan daftar IOA yang berubah.
+        """
+        now = int(time.time() * 1000)
+        by_type = {}
+        for ioa in ioas:
+            io_type = self.points.type_of(ioa)
+            if io_type in TIMED_TYPES and self.points.has_flag(ioa, FLAG_EVENT):
+                by_type.setdefault(io_type, []).append(ioa)
+        changed = []
+        # flush_lock juga menunggu flush batch loop yang sedang berjalan (antriannya sudah kosong tetapi
+        # event-nya belum terkirim), sehingga ASDU invalid selalu menjadi yang terakhir
+        with self.flush_lock:
+            if self.batch_pending_count:
+                # perubahan yang masih tertunda dikirim lebih dulu agar tidak menimpa invalidasi
+                self.flush_events()
+            for io_type, type_ioas in by_type.items():
+                changed_ioas = self.points.set_quality(type_ioas, self.point_quality(io_type, quality), now)
+                if changed_ioas:
+                    self.send_objects(*self._event_objects(io_type, changed_ioas))
+                    changed.extend(changed_ioas)
+        return changed
+
+    def _batch_loop(self):
+        while self.batch_running:
+            self.batch_wakeup.wait(self.batch_interval or DEADBAND_FLUSH_INTERVAL)
+            self.batch_wakeup.clear()
+            if self.batch_pending_count:
+                self.flush_events()
+
+    def add_ioa(self, number, type = MeasuredValueScaled, data = 0, callback = None, event = False, groups = (), flags = 0):
+        number = int(number)
+        if self.points.add(number, type, data, flags | (FLAG_EVENT if event else 0), callback, groups) < 0:
             return -1
+        if type in self.type_groups:
+            bisect.insort(self.type_groups[type], number)
+            for group in groups:
+                if 1 <= group <= 16:
+                    members = self.interrogation_groups.setdefault(group, {})
+                    bisect.insort(members.setdefault(type, []), number)
+        return 0
 
 
     def update_data(self):
-        for ioa in self.IOA_list:
-            if self.IOA_list[ioa]['callback'] != None:
-                self.IOA_list[ioa]['callback'](ioa,self.IOA_list[ioa], self)
+        for ioa, callback in list(self.points.callbacks.items()):
+            callback(ioa, self.points.point(ioa), self)
 
 
-    def update_ioa(self, ioa, data):
+    @staticmethod
+    def convert_value(io_type, data):
         # ================================================================= #
         # ==================== BLOK KODE YANG DIPERBAIKI ==================== #
         # ================================================================= #
-        value = 0
-        io_type = self.IOA_list[ioa]['type']
-
         float_data = float(data)
 
         if io_type == DoublePointInformation:
             # Konversi spesifik untuk Double Point Information (status monitoring)
             # IEC 61850 mengirimkan 1 (OFF) atau 2 (ON).
             # Kode ini memastikan nilai integer diteruskan apa adanya.
-            value = int(float_data)
+            return int(float_data)
         elif io_type == MeasuredValueShort:
-            value = float_data
+            return float_data
         else:
             # Untuk tipe data lain (SinglePoint, ScaledValue)
-            value = int(float_data)
+            return int(float_data)
         # ================================================================= #
         # ======================== AKHIR BLOK PERBAIKAN ===================== #
         # ================================================================= #
 
-        if value != self.IOA_list[ioa]['data']:
-            self.IOA_list[ioa]['data'] = value
-            if self.IOA_list[ioa]['event'] == True:
-                newAsdu = CS101_ASDU_create(self.alParams, False, CS101_COT_SPONTANEOUS, 0, 1, False, False)
-
-                if io_type == MeasuredValueScaled:
-                    io = cast(MeasuredValueScaled_create(None, ioa, self.IOA_list[ioa]['data'], IEC60870_QUALITY_GOOD),InformationObject)
-                elif io_type == MeasuredValueShort:
-                    io = cast(MeasuredValueShort_create(None, ioa, self.IOA_list[ioa]['data'], IEC60870_QUALITY_GOOD), InformationObject)
-                elif io_type == SinglePointInformation:
-                    io = cast(SinglePointInformation_create(None, ioa, self.IOA_list[ioa]['data'], IEC60870_QUALITY_GOOD),InformationObject)
-                elif io_type == DoublePointInformation:
-                    io = cast(DoublePointInformation_create(None, ioa, self.IOA_list[ioa]['data'], IEC60870_QUALITY_GOOD),InformationObject)
-                else:
-                    return -1
+    def update_ioa(self, ioa, data, timestamp = None, quality = IEC60870_QUALITY_GOOD):
+        io_type = self.points.type_of(ioa)
+        value = self.convert_value(io_type, data)
+        quality = self.point_quality(io_type, quality)
 
-                CS101_ASDU_addInformationObject(newAsdu, io)
-                InformationObject_destroy(io)
-                CS104_Slave_enqueueASDU(self.slave, newAsdu)
-                CS101_ASDU_destroy(newAsdu)
+        # timestamp sumber (ms UTC) dari IED; tanpa itu dipakai waktu penerimaan
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        value_changed, quality_changed = self.points.set(ioa, value, quality, timestamp)
+        if not (value_changed or quality_changed):
+            return 0
+        if not self.points.has_flag(ioa, FLAG_EVENT):
+            return 0
+        if io_type not in self.IO_CREATORS:
+            return -1
+        if self.batch_interval > 0 or ioa in self.deadband:
+            # titik ber-deadband dievaluasi bersama dalam satu pass per flush; nilai yang ditahan
+            # tetap tertunda sampai terkirim, walaupun IED tidak lagi mengirim sampel baru
+            self._queue_event(ioa, io_type, quality_changed, (ioa, value, quality, timestamp))
+            return 0
 
+        newAsdu = CS101_ASDU_create(self.alParams, False, CS101_COT_SPONTANEOUS, 0, 1, False, False)
+        send_type, objects = self._event_objects(io_type, [ioa])
+        io = self.create_io(send_type, None, *objects[0])
+        CS101_ASDU_addInformationObject(newAsdu, io)
+        InformationObject_destroy(io)
+        CS104_Slave_enqueueASDU(self.slave, newAsdu)
+        CS101_ASDU_destroy(newAsdu)
         return 0
 
     def start(self):
@@ -266,9 +639,20 @@ class IEC60870_5_104_server:
         if CS104_Slave_isRunning(self.slave) == False:
             print("Starting server failed!\n")
             return -1
+
+        if (self.batch_interval > 0 or len(self.deadband)) and self.batch_thread is None:
+            self.batch_running = True
+            self.batch_thread = threading.Thread(target=self._batch_loop, daemon=True)
+            self.batch_thread.start()
         return 0
 
     def stop(self):
+        if self.batch_thread is not None:
+            self.batch_running = False
+            self.batch_wakeup.set()
+            self.batch_thread.join()
+            self.batch_thread = None
+            self.flush_events()
         CS104_Slave_stop(self.slave)
         CS104_Slave_destroy(self.slave)
 
@@ -1,17 +1,22 @@
 #!/usr/bin/env python3
 
 import os,sys
+import copy
 import ctypes
 import time
 import lib61850 # Pustaka yang benar untuk fungsi-fungsi terkait
+import model_cache
+import scl_importer
 import logging
-import json
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from urllib.parse import urlparse
 from enum import Enum
 
-# --- Nama file untuk menyimpan cache ---
-CACHE_FILE = "ied_model_cache.json"
+# --- Direktori cache model per IED (lihat model_cache.ModelCacheStore) ---
+CACHE_DIR = model_cache.CACHE_DIR
 
 class AddCause(Enum):
         ADD_CAUSE_UNKNOWN = 0
@@ -76,9 +81,24 @@ class IedClientError(Enum):
 
 logger = logging.getLogger(__name__)
 
+# Pembaca nilai skalar langsung dari MmsValue, dipilih sekali per tipe MMS saat registrasi
+SCALAR_GETTERS = {
+        lib61850.MMS_FLOAT: lib61850.MmsValue_toFloat,
+        lib61850.MMS_INTEGER: lib61850.MmsValue_toInt64,
+        lib61850.MMS_UNSIGNED: lib61850.MmsValue_toUint32,
+        lib61850.MMS_BOOLEAN: lib61850.MmsValue_getBoolean,
+        lib61850.MMS_BIT_STRING: lib61850.MmsValue_getBitStringAsInteger,
+}
+
+# Atribut waktu/kualitas milik DO yang diteruskan bersama nilai report: nama -> (tipe MMS, getter)
+TIME_QUALITY_ATTRIBUTES = {
+        "t": (lib61850.MMS_UTC_TIME, lib61850.MmsValue_getUtcTimeInMs),
+        "q": (lib61850.MMS_BIT_STRING, lib61850.MmsValue_getBitStringAsInteger),
+}
+
 class iec61850client():
 
-        def __init__(self, readvaluecallback = None, loggerRef = None, cmdTerm_cb = None, Rpt_cb = None):
+        def __init__(self, readvaluecallback = None, loggerRef = None, cmdTerm_cb = None, Rpt_cb = None, discovery_workers = 0, discovery_read_values = True, discovery_scope = None, discovery_report_lns = (), scl_files = None, modelChanged_cb = None):
                 global logger
                 if loggerRef != None:
                         logger = loggerRef
@@ -90,29 +110,50 @@ class iec61850client():
                 self.Rpt_cb = Rpt_cb
                 self.cb_refs = []
                 self.reporting = {}
-                self.model_cache = self._load_cache()
-
-        @staticmethod
-        def _load_cache():
-            if os.path.exists(CACHE_FILE):
-                try:
-                    with open(CACHE_FILE, 'r') as f:
-                        logger.info(f"Memuat model IED dari cache: {CACHE_FILE}")
-                        return json.load(f)
-                except (IOError, json.JSONDecodeError) as e:
-                    logger.warning(f"Gagal memuat cache, akan melakukan discovery ulang. Error: {e}")
-                    return {}
-            else:
-                logger.info("File cache tidak ditemukan, akan dibuat setelah discovery.")
-                return {}
-
-        def _save_cache(self):
-            try:
-                with open(CACHE_FILE, 'w') as f:
-                    logger.info(f"Menyimpan model IED ke cache: {CACHE_FILE}")
-                    json.dump(self.model_cache, f, indent=4)
-            except IOError as e:
-                logger.error(f"Gagal menyimpan cache. Error: {e}")
+                self.report_extractors = {}
+                self.report_counts = {} # referensi RCB -> jumlah report diterima (ditulis thread report libiec61850)
+                self.discovery_workers = discovery_workers
+                self.discovery_read_values = discovery_read_values
+                self.discovery_scope = list(discovery_scope) if discovery_scope else []
+                self.discovery_report_lns = list(discovery_report_lns)
+                self.scl_files = dict(scl_files or {})
+                self.modelChanged_cb = modelChanged_cb
+                self.stale = set() # IED yang registrasi report-nya dibuat dengan model lama, menunggu koneksi ulang
+                self.registry = model_cache.shared_registry(CACHE_DIR)
+                self.cache_store = self.registry.store
+
+        def _fingerprint(self, tupl):
+                return model_cache.file_fingerprint(self.scl_files[tupl]) if tupl in self.scl_files else ''
+
+        def _load_model(self, tupl):
+                """Snapshot read-only model satu IED dari registry bersama; dimuat dari cache hanya saat pertama dibutuhkan."""
+                return self.registry.get(tupl, self._fingerprint(tupl))
+
+        def _save_model(self, tupl, model, verified = True):
+                """Memperbarui model di registry (dan cache) lalu mengembalikan snapshot barunya.
+
+                verified=False untuk model dari SCL: tetap ditandai di cache sampai verifyModel berhasil,
+                sehingga setiap koneksi (juga setelah restart) memverifikasinya lagi.
+                """
+                return self.registry.update(tupl, model, self._fingerprint(tupl), verified)
+
+        def _save_checkpoint(self, tupl, state):
+                self.cache_store.save(tupl, state, self._fingerprint(tupl), kind="checkpoint")
+
+        def _discover(self, con, host, port, tupl):
+                """Discovery terbatas jika discovery_scope diisi, ParallelDiscovery jika discovery_workers > 0, selain itu serial."""
+                if self.discovery_scope:
+                        logger.info(f"Scoped discovery for {tupl}: {len(self.discovery_scope)} references")
+                        return iec61850client.scopedDiscovery(con, self.discovery_scope, self.discovery_report_lns, self.discovery_read_values)
+                if self.discovery_workers > 0:
+                        engine = ParallelDiscovery(host, port, self.discovery_workers, self.discovery_read_values,
+                                                   checkpoint_cb=lambda state: self._save_checkpoint(tupl, state),
+                                                   resume_state=self.cache_store.load(tupl, self._fingerprint(tupl), kind="checkpoint"))
+                        model = engine.run()
+                        if model:
+                                self.cache_store.delete(tupl, kind="checkpoint")
+                        return model
+                return iec61850client.discovery(con, self.discovery_read_values)
 
         @staticmethod
         def printValue(value):
@@ -169,7 +210,7 @@ class iec61850client():
 
 
         @staticmethod
-        def printDataDirectory(con, doRef):
+        def printDataDirectory(con, doRef, read_values=True):
                 tmodel = {}
                 if doRef.find("/") == -1:
                         logger.error("invalid datadirecory")
@@ -189,7 +230,7 @@ class iec61850client():
                                 daRef = doRef+"."+daName[:-4]
                                 fcName = daName[-3:-1]
 
-                                submodel = iec61850client.printDataDirectory(con,daRef)
+                                submodel = iec61850client.printDataDirectory(con,daRef,read_values)
                                 if submodel:
                                         tmodel[daName[:-4]] = submodel
 
@@ -198,6 +239,9 @@ class iec61850client():
                                         tmodel[daName[:-4]]['reftype'] = "DA"
                                         tmodel[daName[:-4]]['FC'] = fcName
                                         tmodel[daName[:-4]]['value'] = "UNKNOWN"
+                                        if not read_values:
+                                                dataAttribute = lib61850.LinkedList_getNext(dataAttribute)
+                                                continue
                                         fc = lib61850.FunctionalConstraint_fromString(fcName)
                                         value = lib61850.IedConnection_readObject(con, ctypes.byref(error), daRef.encode('utf-8'), fc)
 
@@ -212,122 +256,237 @@ class iec61850client():
 
 
         @staticmethod
-        def discovery(con):
-                tmodel = {}
-
+        def getLogicalNodeList(con):
+                """Mengembalikan [(LD, [LN, ...]), ...] atau None jika direktori tidak dapat dibaca."""
                 error = lib61850.IedClientError()
                 deviceList = lib61850.IedConnection_getLogicalDeviceList(con, ctypes.byref(error))
 
                 if error.value != 0:
                         logger.error("could not get logical device list, error:%i" % error.value)
+                        return None
+
+                result = []
+                device = lib61850.LinkedList_getNext(deviceList)
+                while device:
+                        LD_name=ctypes.cast(lib61850.LinkedList_getData(device),ctypes.c_char_p).value.decode("utf-8")
+                        logicalNodes = lib61850.IedConnection_getLogicalDeviceDirectory(con, ctypes.byref(error), LD_name.encode('utf-8'))
+                        if error.value != 0:
+                                lib61850.LinkedList_destroy(deviceList)
+                                return None
+
+                        LN_names = []
+                        logicalNode = lib61850.LinkedList_getNext(logicalNodes)
+                        while logicalNode:
+                                LN_names.append(ctypes.cast(lib61850.LinkedList_getData(logicalNode),ctypes.c_char_p).value.decode("utf-8"))
+                                logicalNode = lib61850.LinkedList_getNext(logicalNode)
+                        lib61850.LinkedList_destroy(logicalNodes)
+                        result.append((LD_name, LN_names))
+                        device = lib61850.LinkedList_getNext(device)
+                lib61850.LinkedList_destroy(deviceList)
+                return result
+
+
+        @staticmethod
+        def getLogicalNodeNames(con, LD_name, LN_name, acsiClass):
+                error = lib61850.IedClientError()
+                names = []
+                objects = lib61850.IedConnection_getLogicalNodeDirectory(con, ctypes.byref(error), (LD_name+"/"+LN_name).encode('utf-8'), acsiClass)
+                if error.value != 0:
+                        return None
+                obj = lib61850.LinkedList_getNext(objects)
+                while obj:
+                        names.append(ctypes.cast(lib61850.LinkedList_getData(obj),ctypes.c_char_p).value.decode("utf-8"))
+                        obj = lib61850.LinkedList_getNext(obj)
+                lib61850.LinkedList_destroy(objects)
+                return names
+
+
+        @staticmethod
+        def getDataSetMembers(con, LD_name, LN_name, DSname):
+                error = lib61850.IedClientError()
+                isDel = ctypes.c_bool(False)
+                dataSetMembers = lib61850.IedConnection_getDataSetDirectory(con, ctypes.byref(error), (LD_name+"/"+LN_name+"."+DSname).encode('utf-8'), ctypes.byref(isDel))
+                if error.value != 0:
+                        return None
+
+                if isDel.value:
+                        logger.info("  DS: %s, is Deletable" % DSname)
+                else:
+                        logger.info("  DS: %s, not Deletable" % DSname)
+
+                dsmodel = {}
+                dataSetMemberRef = lib61850.LinkedList_getNext(dataSetMembers)
+                i = 0
+                while dataSetMemberRef:
+                        dsRef = ctypes.cast(lib61850.LinkedList_getData(dataSetMemberRef),ctypes.c_char_p).value.decode("utf-8")
+                        dsmodel[str(i)] = {}
+                        dsmodel[str(i)]['reftype'] = "DX"
+                        dsmodel[str(i)]['type'] = "reference"
+                        dsmodel[str(i)]['value'] = dsRef[:-4]
+                        dsmodel[str(i)]['FC'] = dsRef[-3:-1]
+                        dataSetMemberRef = lib61850.LinkedList_getNext(dataSetMemberRef)
+                        i += 1
+                lib61850.LinkedList_destroy(dataSetMembers)
+                return dsmodel
+
+
+        @staticmethod
+        def discoverLogicalNode(con, LD_name, LN_name, read_values=True):
+                """Menelusuri satu LN (DO, DataSet, URCB dan BRCB). Mengembalikan (model_LN, ok)."""
+                lnmodel = {}
+
+                Dos = iec61850client.getLogicalNodeNames(con, LD_name, LN_name, lib61850.ACSI_CLASS_DATA_OBJECT)
+                if Dos is None:
+                        return lnmodel, False
+                for Do in Dos:
+                        lnmodel[Do] = iec61850client.printDataDirectory(con, LD_name+"/"+LN_name+"."+Do, read_values)
+
+                return lnmodel, iec61850client.discoverReportObjects(con, LD_name, LN_name, lnmodel)
+
+
+        @staticmethod
+        def discoverReportObjects(con, LD_name, LN_name, lnmodel):
+                """Menambahkan DataSet, URCB dan BRCB dari satu LN ke lnmodel. Mengembalikan False jika direktori gagal dibaca."""
+                DSnames = iec61850client.getLogicalNodeNames(con, LD_name, LN_name, lib61850.ACSI_CLASS_DATA_SET)
+                if DSnames is None:
+                        return False
+                for DSname in DSnames:
+                        dsmodel = iec61850client.getDataSetMembers(con, LD_name, LN_name, DSname)
+                        if dsmodel is None:
+                                lnmodel[DSname] = {}
+                                return False
+                        lnmodel[DSname] = dsmodel
+
+                for acsiClass in (lib61850.ACSI_CLASS_URCB, lib61850.ACSI_CLASS_BRCB):
+                        RPnames = iec61850client.getLogicalNodeNames(con, LD_name, LN_name, acsiClass)
+                        if RPnames is None:
+                                return False
+                        for Rp in RPnames:
+                                # RCB selalu dibaca nilainya: DatSet dibutuhkan registerForReporting
+                                lnmodel[Rp] = iec61850client.printDataDirectory(con, LD_name+"/"+LN_name+"."+Rp)
+                return True
+
+
+        @staticmethod
+        def splitRef(ref):
+                """'LD/LN.DO.DA' -> (LD, LN, DO) atau None jika ref tidak sampai tingkat DO."""
+                LD_name, _, rest = ref.partition("/")
+                parts = rest.split(".")
+                if not LD_name or len(parts) < 2 or not parts[0] or not parts[1]:
+                        return None
+                return LD_name, parts[0], parts[1]
+
+
+        @staticmethod
+        def scopedDiscovery(con, paths, report_lns=(), read_values=True, model=None):
+                """Discovery terbatas: hanya direktori DO dari path terkonfigurasi, plus DataSet/URCB/BRCB
+                dari LN path tersebut, LLN0 pada LD yang sama dan report_lns ('LD/LN') tambahan.
+                """
+                tmodel = model if model is not None else {}
+                lns = []
+
+                for path in paths:
+                        split = iec61850client.splitRef(path)
+                        if not split:
+                                logger.error(f"invalid reference for scoped discovery: {path}")
+                                continue
+                        LD_name, LN_name, Do = split
+                        lnmodel = tmodel.setdefault(LD_name, {}).setdefault(LN_name, {})
+                        if Do not in lnmodel:
+                                domodel = iec61850client.printDataDirectory(con, LD_name+"/"+LN_name+"."+Do, read_values)
+                                if domodel:
+                                        lnmodel[Do] = domodel
+                                else:
+                                        logger.error(f"scoped discovery could not read {LD_name}/{LN_name}.{Do}")
+                        for ln_ref in (LD_name+"/LLN0", LD_name+"/"+LN_name):
+                                if ln_ref not in lns:
+                                        lns.append(ln_ref)
+
+                for ln_ref in report_lns:
+                        if ln_ref not in lns:
+                                lns.append(ln_ref)
+
+                for ln_ref in lns:
+                        LD_name, _, LN_name = ln_ref.partition("/")
+                        lnmodel = tmodel.setdefault(LD_name, {}).setdefault(LN_name, {})
+                        if not iec61850client.discoverReportObjects(con, LD_name, LN_name, lnmodel):
+                                logger.warning(f"scoped discovery: no report objects read from {ln_ref}")
+                        if not lnmodel:
+                                del tmodel[LD_name][LN_name]
+
+                if lib61850.IedConnection_getState(con) != lib61850.IED_STATE_CONNECTED:
+                        logger.error("connection lost during scoped discovery")
+                        return {}
+                return tmodel
+
+
+        @staticmethod
+        def missingScope(model, paths):
+                missing = []
+                for path in paths:
+                        split = iec61850client.splitRef(path)
+                        if split and split[2] not in model.get(split[0], {}).get(split[1], {}):
+                                missing.append(path)
+                return missing
+
+
+        @staticmethod
+        def discovery(con, read_values=True):
+                tmodel = {}
+
+                logicalNodeList = iec61850client.getLogicalNodeList(con)
+                if logicalNodeList is None:
                         return {}
 
-                if deviceList:
-                        device = lib61850.LinkedList_getNext(deviceList)
-                        while device:
-                                LD_name=ctypes.cast(lib61850.LinkedList_getData(device),ctypes.c_char_p).value.decode("utf-8")
-                                tmodel[LD_name] = {}
-
-                                logicalNodes = lib61850.IedConnection_getLogicalDeviceDirectory(con, ctypes.byref(error), LD_name.encode('utf-8'))
-                                if error.value != 0:
-                                        lib61850.LinkedList_destroy(deviceList)
-                                        return {}
-
-                                logicalNode = lib61850.LinkedList_getNext(logicalNodes)
-                                while logicalNode:
-                                        LN_name=ctypes.cast(lib61850.LinkedList_getData(logicalNode),ctypes.c_char_p).value.decode("utf-8")
-                                        tmodel[LD_name][LN_name] = {}
-
-                                        LNobjects = lib61850.IedConnection_getLogicalNodeDirectory(con, ctypes.byref(error), (LD_name+"/"+LN_name).encode('utf-8'),lib61850.ACSI_CLASS_DATA_OBJECT)
-                                        if error.value != 0:
-                                                lib61850.LinkedList_destroy(logicalNodes)
-                                                lib61850.LinkedList_destroy(deviceList)
-                                                return {}
-
-                                        LNobject = lib61850.LinkedList_getNext(LNobjects)
-                                        while LNobject:
-                                                Do = ctypes.cast(lib61850.LinkedList_getData(LNobject),ctypes.c_char_p).value.decode("utf-8")
-                                                tmodel[LD_name][LN_name][Do] = {}
-                                                doRef = LD_name+"/"+LN_name+"."+Do
-                                                tmodel[LD_name][LN_name][Do] = iec61850client.printDataDirectory(con, doRef)
-                                                LNobject = lib61850.LinkedList_getNext(LNobject)
-                                        lib61850.LinkedList_destroy(LNobjects)
-
-                                        LNdss = lib61850.IedConnection_getLogicalNodeDirectory(con, ctypes.byref(error), (LD_name+"/"+LN_name).encode('utf-8'), lib61850.ACSI_CLASS_DATA_SET)
-                                        if error.value != 0:
-                                                lib61850.LinkedList_destroy(logicalNodes)
-                                                lib61850.LinkedList_destroy(deviceList)
-                                                return tmodel
-
-                                        LNds = lib61850.LinkedList_getNext(LNdss)
-                                        while LNds:
-                                                DSname = ctypes.cast(lib61850.LinkedList_getData(LNds),ctypes.c_char_p).value.decode("utf-8")
-                                                tmodel[LD_name][LN_name][DSname] = {}
-                                                isDel = ctypes.c_bool(False)
-                                                dataSetMembers = lib61850.IedConnection_getDataSetDirectory(con, ctypes.byref(error), (LD_name+"/"+LN_name+"."+DSname).encode('utf-8'), ctypes.byref(isDel))
-                                                if error.value != 0:
-                                                        lib61850.LinkedList_destroy(LNdss)
-                                                        lib61850.LinkedList_destroy(logicalNodes)
-                                                        lib61850.LinkedList_destroy(deviceList)
-                                                        return tmodel
-
-                                                if isDel.value:
-                                                        logger.info("  DS: %s, is Deletable" % DSname)
-                                                else:
-                                                        logger.info("  DS: %s, not Deletable" % DSname)
-                                                dataSetMemberRef = lib61850.LinkedList_getNext(dataSetMembers)
-                                                i = 0
-                                                while dataSetMemberRef:
-                                                        dsRef = ctypes.cast(lib61850.LinkedList_getData(dataSetMemberRef),ctypes.c_char_p).value.decode("utf-8")
-                                                        DX = dsRef[:-4]
-                                                        FC = dsRef[-3:-1]
-                                                        tmodel[LD_name][LN_name][DSname][str(i)] = {}
-                                                        tmodel[LD_name][LN_name][DSname][str(i)]['reftype'] = "DX"
-                                                        tmodel[LD_name][LN_name][DSname][str(i)]['type'] = "reference"
-                                                        tmodel[LD_name][LN_name][DSname][str(i)]['value'] = DX
-                                                        tmodel[LD_name][LN_name][DSname][str(i)]['FC'] = FC
-                                                        dataSetMemberRef = lib61850.LinkedList_getNext(dataSetMemberRef)
-                                                        i += 1
-                                                lib61850.LinkedList_destroy(dataSetMembers)
-                                                LNds = lib61850.LinkedList_getNext(LNds)
-                                        lib61850.LinkedList_destroy(LNdss)
-
-                                        LNrpp = lib61850.IedConnection_getLogicalNodeDirectory(con, ctypes.byref(error), (LD_name+"/"+LN_name).encode('utf-8'), lib61850.ACSI_CLASS_URCB)
-                                        if error.value != 0:
-                                                lib61850.LinkedList_destroy(logicalNodes)
-                                                lib61850.LinkedList_destroy(deviceList)
-                                                return tmodel
-
-                                        LNrp = lib61850.LinkedList_getNext(LNrpp)
-                                        while LNrp:
-                                                Rp = ctypes.cast(lib61850.LinkedList_getData(LNrp),ctypes.c_char_p).value.decode("utf-8")
-                                                tmodel[LD_name][LN_name][Rp] = {}
-                                                doRef = LD_name+"/"+LN_name+"."+Rp
-                                                tmodel[LD_name][LN_name][Rp] = iec61850client.printDataDirectory(con, doRef)
-                                                LNrp = lib61850.LinkedList_getNext(LNrp)
-                                        lib61850.LinkedList_destroy(LNrpp)
-
-                                        LNbrr = lib61850.IedConnection_getLogicalNodeDirectory(con, ctypes.byref(error), (LD_name+"/"+LN_name).encode('utf-8'), lib61850.ACSI_CLASS_BRCB)
-                                        if error.value != 0:
-                                                lib61850.LinkedList_destroy(logicalNodes)
-                                                lib61850.LinkedList_destroy(deviceList)
-                                                return tmodel
-
-                                        LNbr = lib61850.LinkedList_getNext(LNbrr)
-                                        while LNbr:
-                                                Br = ctypes.cast(lib61850.LinkedList_getData(LNbr),ctypes.c_char_p).value.decode("utf-8")
-                                                tmodel[LD_name][LN_name][Br] = {}
-                                                doRef = LD_name+"/"+LN_name+"."+Br
-                                                tmodel[LD_name][LN_name][Br] = iec61850client.printDataDirectory(con, doRef)
-                                                LNbr = lib61850.LinkedList_getNext(LNbr)
-                                        lib61850.LinkedList_destroy(LNbrr)
-
-                                        logicalNode = lib61850.LinkedList_getNext(logicalNode)
-                                lib61850.LinkedList_destroy(logicalNodes)
-                                device = lib61850.LinkedList_getNext(device)
-                        lib61850.LinkedList_destroy(deviceList)
+                for LD_name, LN_names in logicalNodeList:
+                        tmodel[LD_name] = {}
+                        for LN_name in LN_names:
+                                lnmodel, ok = iec61850client.discoverLogicalNode(con, LD_name, LN_name, read_values)
+                                tmodel[LD_name][LN_name] = lnmodel
+                                if not ok:
+                                        return tmodel if lnmodel else {}
                 return tmodel
 
+
+        @staticmethod
+        def compileExtractor(con, memberRef, FC, components):
+                """Resolusi tipe MMS dan jalur indeks elemen untuk satu anggota dataset, dilakukan sekali saat registrasi.
+
+                Mengembalikan (index_path, getter, t_path, q_path) atau None jika path tidak menunjuk ke nilai skalar.
+                t_path/q_path adalah jalur ke atribut t dan q milik DO terdekat di dalam anggota yang sama, atau None.
+                """
+                error = lib61850.IedClientError()
+                fc = lib61850.FunctionalConstraint_fromString(FC)
+                spec = lib61850.IedConnection_getVariableSpecification(con, ctypes.byref(error), memberRef.encode('utf-8'), fc)
+                if error.value != 0 or not spec:
+                        logger.debug("could not get variable specification for %s, error:%i" % (memberRef, error.value))
+                        return None
+
+                index_path = []
+                t_path, q_path = None, None
+                child = spec
+                for name in components:
+                        # atribut t/q pada level terdalam di atas leaf adalah milik DO yang sama
+                        for attr in ("t", "q"):
+                                idx = ctypes.c_int(-1)
+                                if lib61850.MmsVariableSpecification_getChildSpecificationByName(child, attr.encode('utf-8'), ctypes.byref(idx)) and idx.value >= 0:
+                                        if attr == "t":
+                                                t_path = tuple(index_path) + (idx.value,)
+                                        else:
+                                                q_path = tuple(index_path) + (idx.value,)
+                        idx = ctypes.c_int(-1)
+                        child = lib61850.MmsVariableSpecification_getChildSpecificationByName(child, name.encode('utf-8'), ctypes.byref(idx))
+                        if not child or idx.value < 0:
+                                lib61850.MmsVariableSpecification_destroy(spec)
+                                return None
+                        index_path.append(idx.value)
+
+                getter = SCALAR_GETTERS.get(lib61850.MmsVariableSpecification_getType(child))
+                lib61850.MmsVariableSpecification_destroy(spec)
+                if getter is None:
+                        return None
+                return tuple(index_path), getter, t_path, q_path
+
         @staticmethod
         def getMMsValue(typeVal, value, size=8, typeval = -1):
                 if typeVal == "visible-string" or typeval == lib61850.MMS_VISIBLE_STRING:
@@ -369,6 +528,7 @@ class iec61850client():
 
         @staticmethod
         def writeValue(con, model, ref, value):
+                """Menulis value ke ref. Mengembalikan (submodel dengan nilai terbaca ulang, error); model tidak diubah."""
                 submodel, path = iec61850client.parseRef(model,ref)
 
                 if not submodel:
@@ -378,18 +538,47 @@ class iec61850client():
                         logger.error("ref is not DA")
                         return {},-1
 
+                if 'type' not in submodel:
+                        # model hasil discovery "structure only" belum memuat tipe, baca sekali dari IED
+                        submodel, err = iec61850client.readSubmodel(con, model, ref)
+                        if err != 0:
+                                return submodel, err
+
                 fc = lib61850.FunctionalConstraint_fromString(submodel['FC'])
                 mmsvalue = iec61850client.getMMsValue(submodel['type'],value)
                 if not mmsvalue:
-                        return model,-1
+                        return submodel,-1
 
                 error = lib61850.IedClientError()
                 lib61850.IedConnection_writeObject(con, ctypes.byref(error), ref.encode('utf-8'), fc, mmsvalue)
                 lib61850.MmsValue_delete(mmsvalue)
                 if error.value == 0:
-                        model, err = iec61850client.updateValueInModel(con, model, ref)
-                        return model, err
-                return model, error.value
+                        return iec61850client.readSubmodel(con, model, ref)
+                return submodel, error.value
+
+        @staticmethod
+        def readSubmodel(con, model, ref):
+                """Membaca nilai terkini ref dari IED ke salinan submodel. Model tidak diubah karena
+                dibagi antar client lewat model_cache.ModelRegistry.
+                """
+                submodel, path = iec61850client.parseRef(model,ref)
+                if not submodel:
+                        return {}, -1
+
+                if submodel.get('reftype') == 'DA':
+                        fc = lib61850.FunctionalConstraint_fromString(submodel['FC'])
+                        error = lib61850.IedClientError()
+                        value = lib61850.IedConnection_readObject(con, ctypes.byref(error), ref.encode('utf-8'), fc)
+                        if error.value != 0:
+                                logger.error("could not read DA: %s from device" % ref)
+                                return {}, error.value
+                        result = dict(submodel)
+                        result['value'], result['type'] = iec61850client.printValue(value)
+                        lib61850.MmsValue_delete(value)
+                        return result, 0
+
+                result = iec61850client.printDataDirectory(con, ref)
+                return (result, 0) if result else ({}, -1)
 
         @staticmethod
         def updateValueInModel(con, model, ref):
@@ -503,20 +692,28 @@ class iec61850client():
                 else:
                     logger.warning(f"Connection for {tupl} exists but model is missing. Rediscovering.")
                     con = self.connections[tupl]["con"]
-                    model = iec61850client.discovery(con)
+                    model = self._discover(con, host, port, tupl)
                     if model:
-                        self.connections[tupl]["model"] = model
-                        self.model_cache[tupl] = model
-                        self._save_cache()
+                        self.connections[tupl]["model"] = self._save_model(tupl, model)
                         return 0
                     else:
                         lib61850.IedConnection_destroy(con)
                         self.connections[tupl]["con"] = None
                         return -1
 
-            if tupl in self.model_cache:
+            cached_model = self._load_model(tupl)
+            # model SCL yang belum pernah cocok dengan IED diverifikasi lagi pada setiap koneksi
+            scl_bootstrapped = bool(cached_model) and not self.registry.is_verified(tupl)
+            if not cached_model and tupl in self.scl_files:
+                # Bootstrap offline dari SCL/IID; diverifikasi terhadap IED di background setelah terhubung
+                scl_model = scl_importer.load_model(self.scl_files[tupl], host=host)
+                if scl_model:
+                    logger.info(f"Model IED {tupl} dibangun dari file SCL: {self.scl_files[tupl]}")
+                    cached_model = self._save_model(tupl, scl_model, verified=False)
+                    scl_bootstrapped = True
+            if cached_model:
                 logger.info(f"Menggunakan model dari cache untuk IED: {tupl}")
-                self.connections[tupl] = {"con": None, "model": self.model_cache[tupl]}
+                self.connections[tupl] = {"con": None, "model": cached_model}
             else:
                 self.connections[tupl] = {"con": None, "model": {}}
 
@@ -531,16 +728,25 @@ class iec61850client():
 
                 if not self.connections[tupl]["model"]:
                     logger.info(f"Melakukan discovery penuh untuk IED: {tupl}")
-                    model = iec61850client.discovery(con)
+                    model = self._discover(con, host, port, tupl)
                     if model:
-                        self.connections[tupl]["model"] = model
-                        self.model_cache[tupl] = model
-                        self._save_cache()
+                        self.connections[tupl]["model"] = self._save_model(tupl, model)
                     else:
                         logger.error(f"Discovery gagal untuk IED: {tupl}")
                         lib61850.IedConnection_destroy(con)
                         self.connections[tupl]["con"] = None
                         return -1
+                elif scl_bootstrapped:
+                    threading.Thread(target=self.verifyModel, args=(host, port, tupl), daemon=True).start()
+                elif self.discovery_scope:
+                    # Model dari cache mungkin belum memuat referensi yang baru ditambahkan ke konfigurasi
+                    missing = iec61850client.missingScope(self.connections[tupl]["model"], self.discovery_scope)
+                    if missing:
+                        logger.info(f"Melengkapi model {tupl} untuk {len(missing)} referensi baru")
+                        model = iec61850client.scopedDiscovery(con, missing, self.discovery_report_lns, self.discovery_read_values,
+                                                               copy.deepcopy(dict(self.connections[tupl]["model"])))
+                        if model:
+                            self.connections[tupl]["model"] = self._save_model(tupl, model)
 
                 if tupl in self.reporting:
                     for refdata in self.reporting[tupl]:
@@ -559,6 +765,75 @@ class iec61850client():
                 lib61850.IedConnection_destroy(con) # Perbaikan: Gunakan lib61850
                 return -1
 
+        def verifyModel(self, host, port, tupl):
+                """Membandingkan model (mis. dari SCL) dengan IED lewat koneksi terpisah: LD/LN harus ada dan
+                anggota setiap DataSet harus sama. Jika berbeda, discovery online dijalankan dan model diganti.
+                """
+                con = lib61850.IedConnection_create()
+                error = lib61850.IedClientError()
+                lib61850.IedConnection_connect(con, ctypes.byref(error), host.encode('utf-8'), port)
+                if error.value != lib61850.IED_ERROR_OK:
+                        logger.warning(f"Model verification for {tupl} skipped, connection failed: {error.value}")
+                        lib61850.IedConnection_destroy(con)
+                        return False
+
+                try:
+                        model = self.connections[tupl]["model"]
+                        live = iec61850client.getLogicalNodeList(con)
+                        if live is None:
+                                return False
+                        live_lns = {(LD_name, LN_name) for LD_name, LN_names in live for LN_name in LN_names}
+
+                        mismatch = None
+                        for LD_name, lns in model.items():
+                                for LN_name, content in lns.items():
+                                        if (LD_name, LN_name) not in live_lns:
+                                                mismatch = f"{LD_name}/{LN_name} not present on IED"
+                                                break
+                                        for DSname, ds_content in content.items():
+                                                if ds_content.get("0", {}).get('reftype') != "DX":
+                                                        continue
+                                                members = iec61850client.getDataSetMembers(con, LD_name, LN_name, DSname)
+                                                if members != ds_content:
+                                                        mismatch = f"DataSet {LD_name}/{LN_name}.{DSname} differs"
+                                                        break
+                                        if mismatch:
+                                                break
+                                if mismatch:
+                                        break
+
+                        if not mismatch:
+                                logger.info(f"Model for {tupl} verified against IED")
+                                self.connections[tupl]["model"] = self._save_model(tupl, model)
+                                return True
+
+                        logger.warning(f"Model for {tupl} does not match IED ({mismatch}), running online discovery")
+                        self.resyncIED(tupl)
+                        model = self._discover(con, host, port, tupl)
+                        if model:
+                                self.connections[tupl]["model"] = self._save_model(tupl, model)
+                                logger.warning(f"Model for {tupl} replaced; reconnecting to register reports with the new model")
+                        else:
+                                # model SCL tetap ditandai belum terverifikasi, sehingga getIED memverifikasinya lagi
+                                self.connections[tupl]["model"] = self._save_model(tupl, model, verified=False)
+                                logger.error(f"Online discovery for {tupl} failed; the SCL model is verified again on reconnect")
+                        if self.modelChanged_cb:
+                                self.modelChanged_cb(tupl)
+                        return False
+                finally:
+                        lib61850.IedConnection_destroy(con)
+
+        def resyncIED(self, tupl):
+                """Menghentikan pemakaian registrasi report yang dibuat dengan model lama: report dari tupl
+                diabaikan dan koneksinya ditutup, sehingga pemilik client menyambung ulang dan mendaftar ulang.
+                """
+                self.stale.add(tupl)
+                for dataset_key in [k for k in self.report_extractors if k[0] == tupl]:
+                        del self.report_extractors[dataset_key]
+                con = self.connections.get(tupl, {}).get("con")
+                if con:
+                        lib61850.IedConnection_close(con)
+
         def registerWriteValue(self, ref, value):
                 uri_ref = urlparse(ref)
                 port = uri_ref.port or 102
@@ -577,10 +852,9 @@ class iec61850client():
                                 logger.error("no valid connection or model")
                                 return -1, "no valid connection or model"
 
-                        _, error = iec61850client.writeValue(con, model, uri_ref.path[1:], value)
+                        submodel, error = iec61850client.writeValue(con, model, uri_ref.path[1:], value)
                         if error == 0:
-                                submodel, _ = iec61850client.parseRef(model,uri_ref.path[1:])
-                                logger.debug(f"Value '{submodel}' written to {ref}")
+                                logger.debug("Value '%s' written to %s", submodel, ref)
                                 if self.readvaluecallback:
                                         self.readvaluecallback(ref, submodel)
                                 return 0, "no error"
@@ -615,11 +889,9 @@ class iec61850client():
 
                         submodel_check, _ = iec61850client.parseRef(model, uri_ref.path[1:])
                         if submodel_check:
-                                model, error = iec61850client.updateValueInModel(con, model, uri_ref.path[1:])
+                                submodel, error = iec61850client.readSubmodel(con, model, uri_ref.path[1:])
                                 if error == 0:
-                                        self.connections[tupl]['model'] = model
-                                        submodel, _ = iec61850client.parseRef(model, uri_ref.path[1:])
-                                        logger.debug(f"Value '{submodel}' read from {ref}")
+                                        logger.debug("Value '%s' read from %s", submodel, ref)
                                         if self.readvaluecallback:
                                                 self.readvaluecallback(ref, submodel)
                                         return submodel, 0
@@ -636,31 +908,145 @@ class iec61850client():
 
         def ReportHandler_cb(self, param, report):
                 refdata = ctypes.cast(param, ctypes.py_object).value
-                key, tupl, LD, LN, DSRef = refdata
+                key, tupl, LD, LN, DSRef, RPT_path = refdata
+                if tupl in self.stale:
+                        return
+                self.report_counts[RPT_path] += 1
 
                 dataSetValues = lib61850.ClientReport_getDataSetValues(report)
                 if not dataSetValues:
                         return
 
                 dataset = self.connections[tupl]['model'][LD][LN][DSRef]
+                extractors = self.report_extractors.get((tupl, LD, LN, DSRef), {})
                 for index_str in dataset:
                         index = int(index_str)
                         reason = lib61850.ClientReport_getReasonForInclusion(report, index)
                         if reason != lib61850.IEC61850_REASON_NOT_INCLUDED:
                                 mmsval = lib61850.MmsValue_getElement(dataSetValues, index)
                                 if mmsval:
+                                        fast = extractors.get(index)
+                                        if fast:
+                                                # Jalur cepat: baca skalar langsung dari MmsValue tanpa printValue/parseRef
+                                                for ref, value_path, index_path, getter, t_loc, q_loc in fast['points']:
+                                                        element = self.reportElement(report, dataSetValues, index, index_path)
+                                                        if element and self.Rpt_cb:
+                                                                data = {'value': getter(element), 'value_path': value_path}
+                                                                if t_loc:
+                                                                        t = self.reportElement(report, dataSetValues, *t_loc)
+                                                                        if t:
+                                                                                data['t'] = lib61850.MmsValue_getUtcTimeInMs(t)
+                                                                if q_loc:
+                                                                        q = self.reportElement(report, dataSetValues, *q_loc)
+                                                                        if q:
+                                                                                data['q'] = lib61850.MmsValue_getBitStringAsInteger(q)
+                                                                self.Rpt_cb(ref, data)
+                                                if fast['complete']:
+                                                        continue
+
                                         DaRef = dataset[index_str]['value']
                                         val, _type = iec61850client.printValue(mmsval)
-                                        logger.debug(f"{DaRef}: {val} ({_type})")
+                                        logger.debug("%s: %s (%s)", DaRef, val, _type)
 
                                         submodel, _ = iec61850client.parseRef(self.connections[tupl]['model'], DaRef)
-                                        if submodel:
-                                                submodel["value"] = val
-                                                if self.Rpt_cb:
-                                                        self.Rpt_cb(DaRef, submodel)
+                                        if submodel and self.Rpt_cb:
+                                                # salinan dangkal: model dibagi antar client dan tidak boleh diubah;
+                                                # t/q dari model diganti dengan nilai aktual di report (atau dibuang)
+                                                data = dict(submodel, value=val)
+                                                for attr, (mms_type, read) in TIME_QUALITY_ATTRIBUTES.items():
+                                                        data.pop(attr, None)
+                                                        element = self.timeQualityElement(report, dataSetValues, dataset, index, mmsval, submodel, attr)
+                                                        if element and lib61850.MmsValue_getType(element) == mms_type:
+                                                                data[attr] = read(element)
+                                                self.Rpt_cb(DaRef, data)
+
+
+        @staticmethod
+        def reportElement(report, dataSetValues, index, index_path):
+                """Elemen MmsValue pada anggota dataset index; None jika anggota tersebut tidak ikut dalam report ini."""
+                if lib61850.ClientReport_getReasonForInclusion(report, index) == lib61850.IEC61850_REASON_NOT_INCLUDED:
+                        return None
+                element = lib61850.MmsValue_getElement(dataSetValues, index)
+                for i in index_path:
+                        if not element:
+                                return None
+                        element = lib61850.MmsValue_getElement(element, i)
+                return element or None
+
+
+        @staticmethod
+        def nodeFC(node):
+                """FC sebuah node model: FC leaf DA, atau FC leaf pertama untuk node bertingkat."""
+                if 'reftype' in node:
+                        return node.get('FC')
+                for child in node.values():
+                        if isinstance(child, dict):
+                                return iec61850client.nodeFC(child)
+                return None
+
+
+        def timeQualityElement(self, report, dataSetValues, dataset, index, mmsval, submodel, attr):
+                """Elemen atribut t/q milik anggota dataset index untuk jalur lambat.
+
+                Anggota tingkat DO: komponen attr di dalam struktur MMS, dengan urutan komponen mengikuti urutan
+                model yang ber-FC sama. Anggota tingkat DA: anggota dataset terpisah (findMemberLocation).
+                """
+                if attr in submodel and lib61850.MmsValue_getType(mmsval) == lib61850.MMS_STRUCTURE:
+                        fc = dataset[str(index)].get('FC')
+                        position = 0
+                        for name, node in submodel.items():
+                                if not isinstance(node, dict) or (fc and iec61850client.nodeFC(node) != fc):
+                                        continue
+                                if name == attr:
+                                        return lib61850.MmsValue_getElement(mmsval, position) or None
+                                position += 1
+                        return None
+                location = iec61850client.findMemberLocation(dataset, dataset[str(index)]['value'], attr)
+                if location is None:
+                        return None
+                return self.reportElement(report, dataSetValues, *location)
 
 
-        def registerForReporting(self, key, tupl, ref_path):
+        @staticmethod
+        def findMemberLocation(dataset, ref, attr):
+                """Lokasi (index, ()) atribut attr (t/q) yang berdiri sebagai anggota dataset terpisah (dataset FCDA tingkat DA)."""
+                parts = ref.split(".")
+                while len(parts) > 1:
+                        parts.pop()
+                        target = ".".join(parts) + "." + attr
+                        for index_str, dx in dataset.items():
+                                if dx.get('value') == target:
+                                        return (int(index_str), ())
+                return None
+
+
+        def registerExtractor(self, key, tupl, LD_name, LN_name, DSname, index, dx_info, ref_path, value_path):
+                """Mendaftarkan extractor untuk ref pada indeks dataset; indeks tanpa extractor lengkap tetap memakai jalur lama."""
+                components = [part for part in ref_path[len(dx_info['value']):].split(".") if part]
+                if value_path:
+                        components += [part for part in value_path.split(".") if part]
+
+                compiled = iec61850client.compileExtractor(self.connections[tupl]['con'], dx_info['value'], dx_info['FC'], components)
+
+                per_dataset = self.report_extractors.setdefault((tupl, LD_name, LN_name, DSname), {})
+                entry = per_dataset.setdefault(int(index), {'points': [], 'complete': True})
+                if compiled is None:
+                        entry['complete'] = False
+                        return False
+
+                index_path, getter, t_path, q_path = compiled
+                dataset = self.connections[tupl]['model'][LD_name][LN_name][DSname]
+                full_ref = ref_path + ("." + value_path if value_path else "")
+                t_loc = (int(index), t_path) if t_path is not None else iec61850client.findMemberLocation(dataset, full_ref, "t")
+                q_loc = (int(index), q_path) if q_path is not None else iec61850client.findMemberLocation(dataset, full_ref, "q")
+                point = (key, value_path, index_path, getter, t_loc, q_loc)
+                if point not in entry['points']:
+                        entry['points'].append(point)
+                logger.debug(f"Extractor for {key} at {DSname}[{index}]: path {index_path}")
+                return True
+
+
+        def registerForReporting(self, key, tupl, ref_path, value_path=None):
                 con = self.connections[tupl]['con']
                 model = self.connections[tupl]['model']
                 found = False
@@ -676,6 +1062,7 @@ class iec61850client():
                                                                 logger.info(f"DATASET found! Ref:{ref_path} in DSref: {dx_info['value']}")
                                                                 DSRef = f"{LD_name}/{LN_name}.{DSname}"
                                                                 logger.info(f"  DSRef:{DSRef}")
+                                                                self.registerExtractor(key, tupl, LD_name, LN_name, DSname, index, dx_info, ref_path, value_path)
 
                                                                 for RP_name, rp_content in dos.items():
                                                                         if isinstance(rp_content, dict) and rp_content.get("DatSet", {}).get("value") == f"{LD_name}/{LN_name}${DSname}":
@@ -691,7 +1078,8 @@ class iec61850client():
                                                                                 RptId = lib61850.ClientReportControlBlock_getRptId(rcb)
 
                                                                                 cbh = lib61850.ReportCallbackFunction(self.ReportHandler_cb)
-                                                                                refdata = [key, tupl, LD_name, LN_name, DSname]
+                                                                                refdata = [key, tupl, LD_name, LN_name, DSname, RPT_path]
+                                                                                self.report_counts[RPT_path] = 0
                                                                                 param_id = id(refdata)
                                                                                 lib61850.IedConnection_installReportHandler(con, RPT_path.encode('utf-8'), RptId, cbh, param_id)
 
@@ -713,7 +1101,7 @@ class iec61850client():
                 return False
 
 
-        def registerReadValue(self,ref):
+        def registerReadValue(self,ref, value_path=None):
                 uri_ref = urlparse(ref)
                 port = uri_ref.port or 102
                 if uri_ref.scheme != "iec61850":
@@ -728,7 +1116,7 @@ class iec61850client():
                         model = self.connections[tupl]['model']
                         submodel, _ = iec61850client.parseRef(model, uri_ref.path[1:])
                         if submodel:
-                                if not self.registerForReporting(ref, tupl, uri_ref.path[1:]):
+                                if not self.registerForReporting(ref, tupl, uri_ref.path[1:], value_path):
                                         self.polling[ref] = 1
                                 return 0
                         else:
@@ -746,14 +1134,15 @@ class iec61850client():
                                 continue
 
                         tupl = f"{uri_ref.hostname}:{port}"
+                        if tupl in self.stale:
+                                continue
                         if self.getIED(uri_ref.hostname, port) == 0:
                                 con = self.connections[tupl]['con']
                                 model = self.connections[tupl]['model']
                                 if con and model:
-                                        _, err = iec61850client.updateValueInModel(con, model, uri_ref.path[1:])
+                                        submodel, err = iec61850client.readSubmodel(con, model, uri_ref.path[1:])
                                         if err == 0:
-                                                submodel, _ = iec61850client.parseRef(model, uri_ref.path[1:])
-                                                logger.debug(f"value:{submodel} read from key: {key}")
+                                                logger.debug("value:%s read from key: %s", submodel, key)
                                                 if self.readvaluecallback:
                                                         self.readvaluecallback(key, submodel)
                                         elif err == 3:
@@ -772,7 +1161,7 @@ class iec61850client():
                         tupl = f"{hostname}:{port}"
                         return self.connections[tupl]['model']
                 else:
-                        logger.debug(f"no connection to IED: {hostname}:{port}")
+                        logger.debug("no connection to IED: %s:%s", hostname, port)
                         return {}
 
 
@@ -888,6 +1277,123 @@ class iec61850client():
 
 
 
+class ParallelDiscovery():
+        """Discovery model IED per LN dengan pool worker terbatas, masing-masing memakai koneksi MMS sendiri.
+
+        Setiap LN yang selesai dicatat dalam state {"model", "done"} yang diserahkan ke checkpoint_cb,
+        sehingga discovery yang terputus dapat dilanjutkan dengan memberikan state itu sebagai resume_state.
+        """
+
+        def __init__(self, host, port, workers=4, read_values=True, checkpoint_cb=None, resume_state=None, retries=2, checkpoint_interval=5.0):
+                self.host = host
+                self.port = port
+                self.workers = max(1, int(workers))
+                self.read_values = read_values
+                self.checkpoint_cb = checkpoint_cb
+                self.checkpoint_interval = checkpoint_interval
+                self.last_checkpoint = 0.0
+                self.retries = retries
+                state = resume_state or {}
+                self.model = state.get("model", {})
+                self.done = set(state.get("done", []))
+                self.lock = threading.Lock()
+                self.local = threading.local()
+                self.cons = []
+
+        def state(self):
+                return {"model": self.model, "done": sorted(self.done)}
+
+        def _connect(self):
+                con = lib61850.IedConnection_create()
+                error = lib61850.IedClientError()
+                lib61850.IedConnection_connect(con, ctypes.byref(error), self.host.encode('utf-8'), self.port)
+                if error.value != lib61850.IED_ERROR_OK:
+                        logger.error(f"Discovery connection to {self.host}:{self.port} failed, error: {error.value}")
+                        lib61850.IedConnection_destroy(con)
+                        return None
+                with self.lock:
+                        self.cons.append(con)
+                return con
+
+        def _release(self, con):
+                with self.lock:
+                        self.cons = [c for c in self.cons if c is not con]
+                lib61850.IedConnection_destroy(con)
+
+        def _worker_con(self):
+                con = getattr(self.local, "con", None)
+                if con is not None and lib61850.IedConnection_getState(con) == lib61850.IED_STATE_CONNECTED:
+                        return con
+                if con is not None:
+                        self._release(con)
+                self.local.con = self._connect()
+                return self.local.con
+
+        def _discover_ln(self, LD_name, LN_name):
+                for attempt in range(self.retries + 1):
+                        con = self._worker_con()
+                        if con is None:
+                                continue
+                        lnmodel, ok = iec61850client.discoverLogicalNode(con, LD_name, LN_name, self.read_values)
+                        if ok and lib61850.IedConnection_getState(con) == lib61850.IED_STATE_CONNECTED:
+                                return LD_name, LN_name, lnmodel
+                        logger.warning(f"Discovery of {LD_name}/{LN_name} failed (attempt {attempt + 1}), reconnecting")
+                        self._release(con)
+                        self.local.con = None
+                return LD_name, LN_name, None
+
+        def _checkpoint(self, force=False):
+                now = time.monotonic()
+                if not self.checkpoint_cb or (not force and now - self.last_checkpoint < self.checkpoint_interval):
+                        return
+                self.last_checkpoint = now
+                self.checkpoint_cb(self.state())
+
+        def run(self):
+                """Mengembalikan model lengkap, atau None jika ada LN yang gagal (state parsial tetap di-checkpoint)."""
+                con = self._connect()
+                if con is None:
+                        return None
+                logicalNodeList = iec61850client.getLogicalNodeList(con)
+                self._release(con)
+                if logicalNodeList is None:
+                        return None
+
+                todo = []
+                for LD_name, LN_names in logicalNodeList:
+                        self.model.setdefault(LD_name, {})
+                        for LN_name in LN_names:
+                                if f"{LD_name}/{LN_name}" not in self.done:
+                                        todo.append((LD_name, LN_name))
+                logger.info(f"Discovery {self.host}:{self.port}: {len(todo)} LN pending, {len(self.done)} resumed from checkpoint, {self.workers} workers")
+
+                failed = 0
+                try:
+                        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                                futures = [pool.submit(self._discover_ln, LD_name, LN_name) for LD_name, LN_name in todo]
+                                for future in as_completed(futures):
+                                        LD_name, LN_name, lnmodel = future.result()
+                                        if lnmodel is None:
+                                                failed += 1
+                                                continue
+                                        self.model[LD_name][LN_name] = lnmodel
+                                        self.done.add(f"{LD_name}/{LN_name}")
+                                        self._checkpoint()
+                finally:
+                        with self.lock:
+                                cons, self.cons = self.cons, []
+                        for c in cons:
+                                lib61850.IedConnection_destroy(c)
+
+                if failed:
+                        logger.error(f"Discovery {self.host}:{self.port}: {failed} LN failed, progress saved for resume")
+                        self._checkpoint(force=True)
+                        return None
+
+                # Susun ulang sesuai urutan direktori agar model identik dengan discovery serial
+                return {LD_name: {LN_name: self.model[LD_name][LN_name] for LN_name in LN_names} for LD_name, LN_names in logicalNodeList}
+
+
 if __name__=="__main__":
         logging.basicConfig(format='%(asctime)s %(name)-12s %(levelname)-8s %(message)s', level=logging.DEBUG)
         logger.debug("started")
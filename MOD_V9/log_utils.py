@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# log_utils.py - Logging untuk jalur panas gateway.
+# - setup_queue_logging: handler root hanya memasukkan record ke antrian (QueueHandler); formatting dan I/O
+#   dikerjakan thread QueueListener, sehingga thread callback libiec61850 tidak pernah menunggu stderr/file.
+# - LogSampler: membatasi log per kunci (mis. per IED) menjadi `burst` pesan per `interval` detik; jumlah
+#   pesan yang ditahan dilaporkan sekali saat jendela berikutnya dibuka.
+
+import logging
+import logging.handlers
+import queue
+import time
+
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+
+
+def setup_queue_logging(level = logging.INFO, fmt = LOG_FORMAT, handlers = None):
+    """Memasang QueueHandler di root logger dan memulai QueueListener; mengembalikan listener (panggil stop() saat keluar)."""
+    if handlers is None:
+        handlers = [logging.StreamHandler()]
+    formatter = logging.Formatter(fmt)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+class LogSampler:
+    """Rate limit log per kunci tanpa lock (perkiraan cukup): maksimal burst pesan per interval detik."""
+
+    def __init__(self, logger, interval = 10.0, burst = 5):
+        self.logger = logger
+        self.interval = float(interval)
+        self.burst = int(burst)
+        self.windows = {} # (kunci, level) -> [awal jendela, jumlah dalam jendela]
+
+    def log(self, key, level, msg, *args, **kwargs):
+        """Seperti logger.log(level, msg, *args, **kwargs) dengan format lazy, dibatasi per kunci."""
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        window = self.windows.get((key, level))
+        if window is None:
+            window = self.windows[key, level] = [now, 0]
+        elif now - window[0] >= self.interval:
+            suppressed = window[1] - self.burst
+            if suppressed > 0:
+                self.logger.log(level, "[%s] %d similar message(s) suppressed in the last %.0fs", key, suppressed, now - window[0])
+            window[0], window[1] = now, 0
+        window[1] += 1
+        if window[1] <= self.burst:
+            self.logger.log(level, msg, *args, **kwargs)
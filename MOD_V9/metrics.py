@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# metrics.py - Metrik ringan untuk jalur panas gateway dalam format teks Prometheus/OpenMetrics.
+# Tanpa dependensi tambahan. Setiap seri (kombinasi label) dialokasikan sekali lewat labels() dan objeknya
+# disimpan oleh pemanggil, sehingga inc()/observe() di jalur panas tidak membuat dict atau string baru.
+# Histogram memakai array bucket tetap.
+#
+# Counter dan histogram tidak memakai lock: penambahan dari beberapa thread pada seri yang sama dapat
+# (jarang) kehilangan satu increment, yang dapat diterima untuk perencanaan kapasitas. Seri yang
+# butuh angka pasti sebaiknya hanya ditulis oleh satu thread (mis. satu seri per IED).
+# Nilai yang sudah ada di tempat lain (depth antrian, counter report per RCB) dibaca saat scrape
+# lewat CallbackMetric, bukan disalin di jalur panas.
+
+import threading
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_text(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        if not self.labelnames:
+            self.children[()] = self._child()
+
+    def labels(self, *values):
+        """Seri untuk kombinasi label; dibuat sekali lalu dipakai ulang (simpan hasilnya di pemanggil)."""
+        values = tuple(str(value) for value in values)
+        child = self.children.get(values)
+        if child is None:
+            child = self.children[values] = self._child()
+        return child
+
+    def _child(self):
+        raise NotImplementedError
+
+    def samples(self):
+        for values, child in list(self.children.items()):
+            yield '', _label_text(self.labelnames, values), child.value
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(f'{self.name}{suffix}{labels} {value}' for suffix, labels, value in self.samples())
+        return lines
+
+
+class _Value:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount = 1):
+        self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _child(self):
+        return _Value()
+
+    def inc(self, amount = 1):
+        self.children[()].inc(amount)
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value):
+        self.children[()].set(value)
+
+
+class _HistogramValue:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = array('q', [0] * (len(bounds) + 1))
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames = (), buckets = LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(float(bound) for bound in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _child(self):
+        return _HistogramValue(self.bounds)
+
+    def observe(self, value):
+        self.children[()].observe(value)
+
+    def samples(self):
+        for values, child in list(self.children.items()):
+            counts = child.counts[:]
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield '_bucket', _label_text(self.labelnames + ('le',), values + (le,)), cumulative
+            yield '_sum', _label_text(self.labelnames, values), child.sum
+            yield '_count', _label_text(self.labelnames, values), cumulative
+
+
+class CallbackMetric(_Metric):
+    """Metrik yang nilainya dibaca saat scrape: callback mengembalikan iterable (tuple_label, nilai)."""
+
+    def __init__(self, name, documentation, labelnames, callback, kind = 'gauge'):
+        self.callback = callback
+        self.kind = kind
+        super().__init__(name, documentation, labelnames)
+
+    def _child(self):
+        return None
+
+    def samples(self):
+        for values, value in self.callback():
+            yield '', _label_text(self.labelnames, values), value
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def expose(self):
+        """Seluruh metrik dalam format teks Prometheus."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.expose())
+        return '\n'.join(lines) + '\n'
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor yang menghitung thread yang sedang sibuk, untuk metrik okupansi executor."""
+
+    def __init__(self, max_workers = None, thread_name_prefix = ''):
+        super().__init__(max_workers, thread_name_prefix)
+        self.busy = 0
+        self._busy_lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(self._run, fn, args, kwargs)
+
+    def _run(self, fn, args, kwargs):
+        with self._busy_lock:
+            self.busy += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._busy_lock:
+                self.busy -= 1
+
+    def queued(self):
+        return self._work_queue.qsize()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# mms_index.py - Indeks reverse-lookup MMS reference -> IOA per IED.
+# Dibangun sekali saat parsing konfigurasi sehingga setiap DaRef yang masuk
+# (dari report maupun polling) dapat dipetakan ke daftar IOA dengan satu
+# lookup dict, tanpa memindai seluruh titik yang dikonfigurasi.
+#
+# Satu reference yang dilaporkan (mis. DO 'LD/MMXU1.A') dapat mencakup beberapa IOA yang dikonfigurasi di
+# bawahnya (phsA, phsB, ...). Setiap IOA mengambil bagiannya sendiri dari struktur nilai lewat sisa path
+# konfigurasinya; jika struktur tidak bernama (daftar komponen dari printValue) dan sisa path tidak dapat
+# diselesaikan, hanya match pertama yang diperbarui dengan float pertama, seperti pemindaian linear lama.
+
+
+def find_first_float(data):
+    if isinstance(data, float): return data
+    if isinstance(data, int): return float(data)
+    if isinstance(data, dict):
+        for key in data:
+            result = find_first_float(data[key])
+            if result is not None: return result
+    if isinstance(data, list):
+        for item in data:
+            result = find_first_float(item)
+            if result is not None: return result
+    return None
+
+
+def get_value_by_path(data_dict, path_str):
+    keys = path_str.split('.')
+    current_level = data_dict
+    try:
+        for key in keys:
+            current_level = current_level[key]
+        if isinstance(current_level, (int, float)):
+            return float(current_level)
+        return None
+    except (KeyError, TypeError):
+        return None
+
+
+class MmsReferenceIndex:
+    """Tabel prefix per IED: setiap prefix objek dari path terkonfigurasi -> daftar (ioa, value_path, sisa path)."""
+
+    def __init__(self):
+        self._tables = {}
+
+    @staticmethod
+    def prefixes(mms_path):
+        """Menghasilkan semua prefix pada batas objek, mis. 'LD/LN.DO.DA' -> 'LD/LN', 'LD/LN.DO', 'LD/LN.DO.DA'."""
+        slash = mms_path.find('/')
+        start = slash + 1 if slash != -1 else 0
+        pos = mms_path.find('.', start)
+        while pos != -1:
+            yield mms_path[:pos]
+            pos = mms_path.find('.', pos + 1)
+        yield mms_path
+
+    def add(self, ied_id, mms_path, ioa, value_path=None):
+        table = self._tables.setdefault(ied_id, {})
+        for prefix in self.prefixes(mms_path):
+            entry = (ioa, value_path, mms_path[len(prefix) + 1:])
+            bucket = table.setdefault(prefix, [])
+            if entry not in bucket:
+                bucket.append(entry)
+
+    def lookup(self, ied_id, reported_path):
+        """Mengembalikan daftar (ioa, value_path, sisa path) yang path konfigurasinya berada di bawah reported_path.
+
+        Sisa path adalah path konfigurasi relatif terhadap reported_path ('' jika sama persis).
+        """
+        table = self._tables.get(ied_id)
+        if not table:
+            return ()
+        return table.get(reported_path, ())
+
+    def resolve(self, ied_id, reported_path, value, extracted = False, extracted_path = None):
+        """Nilai per IOA untuk satu data masuk: daftar (ioa, value_path, nilai), nilai None jika tidak ditemukan.
+
+        extracted=True: value sudah diekstrak oleh jalur cepat report untuk extracted_path, jadi hanya IOA dengan
+        value_path yang sama yang diperbarui.
+        """
+        results = []
+        first_used = False
+        for ioa, value_path, sub_path in self.lookup(ied_id, reported_path):
+            if extracted:
+                if value_path == extracted_path:
+                    results.append((ioa, value_path, value))
+                continue
+            if value_path:
+                results.append((ioa, value_path, get_value_by_path(value, value_path)))
+            elif not sub_path:
+                results.append((ioa, value_path, find_first_float(value)))
+            else:
+                final_value = get_value_by_path(value, sub_path)
+                if final_value is None:
+                    if first_used:
+                        continue
+                    first_used = True
+                    final_value = find_first_float(value)
+                results.append((ioa, value_path, final_value))
+        return results
+
+    def ied_ids(self):
+        return list(self._tables)
+
+    def __len__(self):
+        return sum(len(table) for table in self._tables.values())
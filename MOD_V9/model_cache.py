@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# model_cache.py - Penyimpanan cache model IED per file, biner dan berversi.
+# Setiap IED disimpan di file sendiri: header (magic, versi skema, versi marshal,
+# fingerprint SCL/IID, flag) diikuti model yang di-marshal lalu dikompresi zlib.
+# Flag FLAG_UNVERIFIED menandai model yang dibangun dari file SCL dan belum diverifikasi terhadap IED.
+# Penulisan bersifat atomik (file sementara + os.replace) sehingga beberapa
+# instance iec61850client tidak pernah membaca file yang setengah tertulis.
+# ModelRegistry membagi model yang sudah dimuat ke semua client dalam satu proses sebagai snapshot
+# read-only (FrozenModel); discovery ulang menghasilkan snapshot baru yang menggantikan referensi lama.
+
+import hashlib
+import json
+import logging
+import marshal
+import os
+import struct
+import tempfile
+import threading
+import zlib
+
+CACHE_DIR = "ied_model_cache"
+LEGACY_CACHE_FILE = "ied_model_cache.json"
+SCHEMA_VERSION = 2
+MAGIC = b"IEDM"
+HEADER = struct.Struct("<4sHH32sB")
+# header per versi skema yang masih dapat dibaca (skema 1 belum memiliki flag)
+HEADERS = {1: struct.Struct("<4sHH32s"), SCHEMA_VERSION: HEADER}
+FLAG_UNVERIFIED = 0x01
+
+logger = logging.getLogger(__name__)
+
+
+def file_fingerprint(*paths):
+    """Fingerprint (sha256, 32 karakter hex) dari isi file SCL/IID/CID; '' jika tidak ada file."""
+    digest = hashlib.sha256()
+    found = False
+    for path in paths:
+        if not path:
+            continue
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), b''):
+                    digest.update(chunk)
+            found = True
+        except IOError as e:
+            logger.warning(f"Cannot fingerprint {path}: {e}")
+    return digest.hexdigest()[:32] if found else ''
+
+
+class ModelCacheStore:
+    """Cache model per IED di direktori `directory`, satu file per kunci (host:port)."""
+
+    _legacy_lock = threading.Lock()
+    _legacy = None
+
+    def __init__(self, directory = CACHE_DIR, legacy_file = LEGACY_CACHE_FILE):
+        self.directory = directory
+        self.legacy_file = legacy_file
+
+    def path(self, key, kind = "model"):
+        safe = "".join(c if c.isalnum() or c in "-." else "_" for c in key)
+        return os.path.join(self.directory, f"{safe}.{kind}")
+
+    def load(self, key, fingerprint = '', kind = "model", with_verified = False):
+        """Mengembalikan objek tersimpan, atau None jika tidak ada, versi berbeda atau fingerprint tidak cocok.
+
+        with_verified=True: mengembalikan (objek, terverifikasi); objek tanpa FLAG_UNVERIFIED dianggap terverifikasi.
+        """
+        obj, flags = self._load(key, fingerprint, kind)
+        if with_verified:
+            return obj, not flags & FLAG_UNVERIFIED
+        return obj
+
+    def _load(self, key, fingerprint, kind):
+        path = self.path(key, kind)
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return (self._load_legacy(key) if kind == "model" and not fingerprint else None), 0
+        except IOError as e:
+            logger.warning(f"Gagal membaca cache {path}: {e}")
+            return None, 0
+
+        header = HEADERS.get(struct.unpack_from("<4sH", raw)[1]) if len(raw) >= 6 else None
+        if header is None or len(raw) < header.size:
+            if len(raw) < HEADER.size:
+                logger.warning(f"Cache {path} rusak, diabaikan")
+            else:
+                logger.info(f"Cache {path} berversi lain, discovery ulang")
+            return None, 0
+        magic, schema, marshal_version, stored_fp, *flags = header.unpack_from(raw)
+        if magic != MAGIC or marshal_version != marshal.version:
+            logger.info(f"Cache {path} berversi lain (schema {schema}), discovery ulang")
+            return None, 0
+        stored_fp = stored_fp.rstrip(b'\0').decode('ascii')
+        if fingerprint and stored_fp != fingerprint:
+            logger.info(f"Cache {path} tidak cocok dengan fingerprint SCL, discovery ulang")
+            return None, 0
+        try:
+            return marshal.loads(zlib.decompress(raw[header.size:])), flags[0] if flags else 0
+        except (ValueError, EOFError, TypeError, zlib.error) as e:
+            logger.warning(f"Cache {path} rusak, diabaikan: {e}")
+            return None, 0
+
+    def save(self, key, obj, fingerprint = '', kind = "model", verified = True):
+        """Menyimpan objek secara atomik; verified=False menandai model SCL yang belum diverifikasi terhadap IED."""
+        path = self.path(key, kind)
+        header = HEADER.pack(MAGIC, SCHEMA_VERSION, marshal.version, fingerprint.encode('ascii'),
+                             0 if verified else FLAG_UNVERIFIED)
+        payload = zlib.compress(marshal.dumps(obj), 1)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(header)
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            logger.info(f"Menyimpan model IED ke cache: {path}")
+            return True
+        except (IOError, OSError) as e:
+            logger.error(f"Gagal menyimpan cache {path}. Error: {e}")
+            return False
+
+    def delete(self, key, kind = "model"):
+        try:
+            os.unlink(self.path(key, kind))
+        except FileNotFoundError:
+            pass
+
+    def _load_legacy(self, key):
+        """Migrasi satu kali dari cache JSON lama; model yang ditemukan langsung ditulis ke format baru."""
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return None
+        with ModelCacheStore._legacy_lock:
+            if ModelCacheStore._legacy is None:
+                try:
+                    with open(self.legacy_file, 'r') as f:
+                        ModelCacheStore._legacy = json.load(f)
+                except (IOError, json.JSONDecodeError) as e:
+                    logger.warning(f"Gagal memuat cache lama {self.legacy_file}: {e}")
+                    ModelCacheStore._legacy = {}
+            model = ModelCacheStore._legacy.get(key)
+        if model:
+            logger.info(f"Migrasi model {key} dari {self.legacy_file}")
+            self.save(key, model)
+        return model
+
+
+class FrozenModel(dict):
+    """dict read-only untuk snapshot model bersama.
+
+    Tetap sebuah dict (isinstance, get, items, perbandingan) bagi kode discovery dan report, tetapi
+    setiap operasi yang mengubah isi ditolak. copy.deepcopy menghasilkan dict biasa yang boleh diubah.
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("shared IED model snapshot is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return dict, (thaw(self),)
+
+
+def freeze(model):
+    """Salinan model (dict bertingkat) sebagai FrozenModel bertingkat; list menjadi tuple."""
+    if isinstance(model, dict):
+        return FrozenModel((key, freeze(value)) for key, value in model.items())
+    if isinstance(model, (list, tuple)):
+        return tuple(freeze(value) for value in model)
+    return model
+
+
+def thaw(model):
+    """Salinan model yang dapat diubah (dict biasa bertingkat), mis. sebagai dasar discovery lanjutan."""
+    if isinstance(model, dict):
+        return {key: thaw(value) for key, value in model.items()}
+    if isinstance(model, tuple):
+        return [thaw(value) for value in model]
+    return model
+
+
+class ModelRegistry:
+    """Registry model IED bersama untuk semua instance iec61850client dalam satu proses.
+
+    Setiap model dimuat dari store paling banyak sekali. Client menerima snapshot read-only
+    (FrozenModel) yang tidak pernah diubah lagi, sehingga thread report dan polling dapat
+    menelusurinya tanpa lock. Setelah discovery ulang, update() membangun snapshot baru dan
+    menukar referensinya secara atomik; pemanggil memakai snapshot yang dikembalikan, client lain
+    mendapatkannya pada get() berikutnya.
+    """
+
+    def __init__(self, store = None):
+        self.store = store or ModelCacheStore()
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._unverified = set()
+        self._key_locks = {}
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key, fingerprint = ''):
+        """Snapshot read-only model untuk key, atau None jika belum ada model."""
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._key_lock(key):
+                entry = self._entries.get(key)
+                if entry is None:
+                    model, verified = self.store.load(key, fingerprint, with_verified=True)
+                    entry = freeze(model or {})
+                    with self._lock:
+                        self._entries[key] = entry
+                        if verified:
+                            self._unverified.discard(key)
+                        else:
+                            self._unverified.add(key)
+        return entry or None
+
+    def is_verified(self, key):
+        """False jika model key dibangun dari SCL dan belum cocok diverifikasi terhadap IED (juga setelah restart)."""
+        return key not in self._unverified
+
+    def update(self, key, model, fingerprint = '', verified = True):
+        """Menyimpan model baru untuk key dan mengembalikan snapshot read-only-nya.
+
+        Snapshot lama tidak diubah; pembaca yang masih menelusurinya tetap melihat model yang konsisten.
+        verified=False: model dari SCL yang harus diverifikasi terhadap IED pada koneksi berikutnya.
+        """
+        with self._key_lock(key):
+            snapshot = model if isinstance(model, FrozenModel) else freeze(model)
+            self.store.save(key, thaw(snapshot), fingerprint, verified=verified)
+            with self._lock:
+                self._entries[key] = snapshot
+                if verified:
+                    self._unverified.discard(key)
+                else:
+                    self._unverified.add(key)
+        return snapshot
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._unverified.discard(key)
+
+
+_shared_registry = None
+_shared_registry_lock = threading.Lock()
+
+
+def shared_registry(directory = CACHE_DIR):
+    """Registry tunggal per proses (dibuat saat pertama kali dipakai)."""
+    global _shared_registry
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            _shared_registry = ModelRegistry(ModelCacheStore(directory))
+        return _shared_registry
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# point_table.py - Tabel titik IEC 104 berbentuk kolom.
+# Setiap titik adalah satu baris pada kolom array (IOA, kode tipe, nilai, quality, timestamp, flag)
+# dengan indeks IOA -> baris. Callback (hanya titik command) dan keanggotaan group disimpan terpisah
+# karena jarang dipakai, sehingga 20k titik monitoring cukup beberapa ratus KB.
+#
+# Konkurensi: satu baris dapat ditulis beberapa thread (thread report IED, executor polling, invalidasi
+# quality), sehingga semua penulisan (termasuk perbandingan nilai lama di set) diserialkan oleh satu
+# writer lock. Setiap baris juga dilindungi seqlock (kolom seq): penulis menaikkan seq menjadi ganjil,
+# menulis nilai/quality/timestamp, lalu menaikkan seq menjadi genap. Pembaca (GI, read, UI) tidak
+# memakai lock: kolom disalin ke buffer pembaca dan baris yang seq-nya ganjil atau berubah selama
+# penyalinan dibaca ulang, sehingga pembaca selalu mendapat snapshot konsisten tanpa menahan penulis.
+
+import threading
+from array import array
+
+FLAG_EVENT = 0x01 # titik monitoring: perubahan dikirim sebagai event spontan
+FLAG_INVERT = 0x02 # nilai double point dibalik (OFF <-> ON) oleh gateway
+
+NO_TIMESTAMP = 0
+
+
+class PointTable:
+    """Kolom titik dengan indeks IOA -> baris; tipe disimpan sebagai kode (indeks di `types`)."""
+
+    def __init__(self):
+        self.rows = {}
+        self.types = []
+        self._codes = {}
+        self.ioa = array('l')
+        self.type_code = array('B')
+        self.value = array('d')
+        self.quality = array('B')
+        self.timestamp = array('q')
+        self.flags = array('B')
+        self.seq = array('L')
+        self.write_lock = threading.Lock()
+        self.callbacks = {}
+        self.groups = {}
+
+    def __contains__(self, ioa):
+        return ioa in self.rows
+
+    def __len__(self):
+        return len(self.ioa)
+
+    def __iter__(self):
+        return iter(self.ioa)
+
+    def find_type_code(self, io_type):
+        """Kode tipe tanpa mendaftarkan tipe baru; None jika tipe belum dipakai titik mana pun."""
+        return self._codes.get(io_type)
+
+    def type_code_of(self, io_type):
+        code = self._codes.get(io_type)
+        if code is None:
+            code = self._codes[io_type] = len(self.types)
+            self.types.append(io_type)
+        return code
+
+    def add(self, ioa, io_type, value = 0, flags = 0, callback = None, groups = ()):
+        """Menambah titik; mengembalikan nomor baris, atau -1 jika IOA sudah ada."""
+        if ioa in self.rows:
+            return -1
+        row = self.rows[ioa] = len(self.ioa)
+        self.ioa.append(ioa)
+        self.type_code.append(self.type_code_of(io_type))
+        self.value.append(float(value))
+        self.quality.append(0)
+        self.timestamp.append(NO_TIMESTAMP)
+        self.flags.append(flags)
+        self.seq.append(0)
+        if callback is not None:
+            self.callbacks[ioa] = callback
+        if groups:
+            self.groups[ioa] = tuple(groups)
+        return row
+
+    def type_of(self, ioa):
+        row = self.rows.get(ioa)
+        return self.types[self.type_code[row]] if row is not None else None
+
+    def has_flag(self, ioa, flag):
+        row = self.rows.get(ioa)
+        return row is not None and bool(self.flags[row] & flag)
+
+    def _read_row(self, row):
+        """(nilai, quality, timestamp) konsisten untuk satu baris (seqlock)."""
+        seq, value, quality, timestamp = self.seq, self.value, self.quality, self.timestamp
+        while True:
+            before = seq[row]
+            if not before & 1:
+                result = (value[row], quality[row], timestamp[row])
+                if seq[row] == before:
+                    return result
+
+    def _write_row(self, row, value, quality, timestamp):
+        # dipanggil dengan write_lock dipegang
+        seq = self.seq
+        seq[row] += 1
+        self.value[row] = value
+        self.quality[row] = quality
+        self.timestamp[row] = timestamp
+        seq[row] += 1
+
+    def get(self, ioa):
+        """(tipe, nilai, quality, timestamp, flags) untuk satu IOA, atau None."""
+        row = self.rows.get(ioa)
+        if row is None:
+            return None
+        return (self.types[self.type_code[row]],) + self._read_row(row) + (self.flags[row],)
+
+    def set(self, ioa, value, quality = 0, timestamp = NO_TIMESTAMP):
+        """Menyimpan nilai satu titik; mengembalikan (nilai_berubah, quality_berubah)."""
+        row = self.rows[ioa]
+        with self.write_lock:
+            value_changed = self.value[row] != value
+            quality_changed = self.quality[row] != quality
+            if value_changed or quality_changed:
+                self._write_row(row, value, quality, timestamp)
+        return value_changed, quality_changed
+
+    def update_many(self, ioas, values, qualities = None, timestamps = None):
+        """Pembaruan massal; mengembalikan daftar IOA yang nilai atau quality-nya berubah."""
+        rows, value, quality = self.rows, self.value, self.quality
+        qualities = qualities if qualities is not None else [0] * len(ioas)
+        timestamps = timestamps if timestamps is not None else [NO_TIMESTAMP] * len(ioas)
+        changed = []
+        with self.write_lock:
+            for ioa, v, q, t in zip(ioas, values, qualities, timestamps):
+                row = rows.get(ioa)
+                if row is None:
+                    continue
+                if value[row] != v or quality[row] != q:
+                    self._write_row(row, v, q, t)
+                    changed.append(ioa)
+        return changed
+
+    def set_quality(self, ioas, set_flags, timestamp = NO_TIMESTAMP):
+        """Menambahkan flag quality ke sekumpulan titik; mengembalikan daftar IOA yang quality-nya berubah."""
+        rows, quality = self.rows, self.quality
+        changed = []
+        with self.write_lock:
+            for ioa in ioas:
+                row = rows.get(ioa)
+                if row is None:
+                    continue
+                new_quality = quality[row] | set_flags
+                if new_quality != quality[row]:
+                    self._write_row(row, self.value[row], new_quality, timestamp)
+                    changed.append(ioa)
+        return changed
+
+    def read(self, row):
+        """(ioa, tipe, nilai, quality, timestamp, flags) satu baris langsung dari kolom, tanpa menyalin tabel."""
+        return (self.ioa[row], self.types[self.type_code[row]]) + self._read_row(row) + (self.flags[row],)
+
+    def columns(self):
+        """Salinan konsisten kolom (nilai, quality, timestamp) seluruh tabel (buffer milik pembaca).
+
+        Setiap kolom disalin sekaligus; baris yang sedang atau sempat ditulis selama penyalinan dibaca ulang.
+        """
+        seq = self.seq
+        before = seq[:]
+        value, quality, timestamp = self.value[:], self.quality[:], self.timestamp[:]
+        after = seq[:]
+        if before != after or any(s & 1 for s in before):
+            for row, (s1, s2) in enumerate(zip(before, after)):
+                if s1 != s2 or s1 & 1:
+                    value[row], quality[row], timestamp[row] = self._read_row(row)
+        return value, quality, timestamp
+
+    def snapshot(self, ioas = None):
+        """Daftar (ioa, nilai, quality, timestamp) untuk ioas (default semua titik, urutan baris)."""
+        if ioas is None:
+            return list(zip(self.ioa, *self.columns()))
+        rows, read_row = self.rows, self._read_row
+        return [(ioa,) + read_row(rows[ioa]) for ioa in ioas if ioa in rows]
+
+    def point(self, ioa):
+        """Tampilan dict satu titik ({'type', 'data', 'quality', 'timestamp', 'event'}) untuk callback command/read."""
+        row = self.rows.get(ioa)
+        if row is None:
+            return None
+        value, quality, timestamp = self._read_row(row)
+        return {'type': self.types[self.type_code[row]], 'data': value, 'quality': quality,
+                'timestamp': timestamp or None, 'event': bool(self.flags[row] & FLAG_EVENT)}
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# quality_map.py - Pemetaan quality IEC 61850 (bitstring q) ke quality descriptor IEC 60870-5-104.
+# Nilai q adalah integer dari MmsValue_getBitStringAsInteger (bit pertama = LSB), sama dengan
+# tipe Quality libiec61850. Hasilnya kombinasi flag IV/NT/SB/BL/OV untuk QDS/SIQ/DIQ.
+
+# Quality IEC 61850 (libiec61850 Quality)
+Q_VALIDITY_MASK = 0x0003
+Q_VALIDITY_INVALID = 2
+Q_VALIDITY_QUESTIONABLE = 3
+Q_DETAIL_OVERFLOW = 4
+Q_DETAIL_OUT_OF_RANGE = 8
+Q_DETAIL_OLD_DATA = 128
+Q_SOURCE_SUBSTITUTED = 1024
+Q_TEST = 2048
+Q_OPERATOR_BLOCKED = 4096
+
+# Quality descriptor IEC 60870-5-104 (sama dengan IEC60870_QUALITY_* di lib60870)
+QDS_GOOD = 0
+QDS_OVERFLOW = 1
+QDS_BLOCKED = 16
+QDS_SUBSTITUTED = 32
+QDS_NON_TOPICAL = 64
+QDS_INVALID = 128
+
+# SIQ/DIQ tidak memiliki bit OV (bit 0-1 dipakai nilai SPI/DPI)
+STATUS_QUALITY_MASK = QDS_BLOCKED | QDS_SUBSTITUTED | QDS_NON_TOPICAL | QDS_INVALID
+
+# Quality yang dikirim untuk titik milik IED yang terputus
+CONNECTION_LOST_QUALITY = QDS_INVALID | QDS_NON_TOPICAL
+
+
+def iec104_quality(q):
+    """Mengubah quality IEC 61850 q menjadi flag QDS IEC 104; None (tanpa q) dianggap good."""
+    if not q:
+        return QDS_GOOD
+    qds = QDS_GOOD
+    validity = q & Q_VALIDITY_MASK
+    if validity == Q_VALIDITY_INVALID:
+        qds |= QDS_INVALID
+    elif validity == Q_VALIDITY_QUESTIONABLE:
+        qds |= QDS_NON_TOPICAL
+    if q & (Q_DETAIL_OVERFLOW | Q_DETAIL_OUT_OF_RANGE):
+        qds |= QDS_OVERFLOW
+    if q & Q_DETAIL_OLD_DATA:
+        qds |= QDS_NON_TOPICAL
+    if q & Q_SOURCE_SUBSTITUTED:
+        qds |= QDS_SUBSTITUTED
+    if q & Q_OPERATOR_BLOCKED:
+        qds |= QDS_BLOCKED
+    if q & Q_TEST:
+        # IEC 104 tidak punya flag test per titik; data test tidak boleh dipakai sebagai data operasi
+        qds |= QDS_INVALID
+    return qds
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# scl_importer.py - Membangun model IED dari file SCL (ICD/IID/CID/SCD) tanpa koneksi MMS.
+# Hasilnya berbentuk sama dengan iec61850client.discovery(): model[LD][LN][DO/DataSet/RCB],
+# leaf berupa {'reftype': 'DA', 'FC', 'value', 'type'}, anggota DataSet berupa
+# {'reftype': 'DX', 'type': 'reference', 'value', 'FC'} dan RCB berisi atribut RptID,
+# DatSet, dst. dengan FC RP/BR, sehingga registerForReporting dapat langsung dipakai.
+
+import logging
+import sys
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+# bType SCL -> string tipe MMS seperti yang dihasilkan MmsValue_getTypeString
+BTYPE_TO_MMS = {
+    "BOOLEAN": "boolean",
+    "INT8": "integer", "INT16": "integer", "INT24": "integer", "INT32": "integer", "INT64": "integer",
+    "INT128": "integer", "Enum": "integer",
+    "INT8U": "unsigned", "INT16U": "unsigned", "INT24U": "unsigned", "INT32U": "unsigned",
+    "FLOAT32": "float", "FLOAT64": "float",
+    "Dbpos": "bit-string", "Tcmd": "bit-string", "Quality": "bit-string", "Check": "bit-string",
+    "OptFlds": "bit-string", "TrgOps": "bit-string",
+    "Timestamp": "utc-time", "EntryTime": "binary-time",
+    "VisString32": "visible-string", "VisString64": "visible-string", "VisString65": "visible-string",
+    "VisString129": "visible-string", "VisString255": "visible-string", "ObjRef": "visible-string",
+    "Currency": "visible-string",
+    "Unicode255": "mms-string",
+    "Octet64": "octet-string", "EntryID": "octet-string",
+}
+
+# Atribut RCB sesuai urutan direktori libiec61850 (tipe MMS per atribut)
+URCB_ATTRIBUTES = [("RptID", "visible-string"), ("RptEna", "boolean"), ("Resv", "boolean"),
+                   ("DatSet", "visible-string"), ("ConfRev", "unsigned"), ("OptFlds", "bit-string"),
+                   ("BufTm", "unsigned"), ("SqNum", "unsigned"), ("TrgOps", "bit-string"),
+                   ("IntgPd", "unsigned"), ("GI", "boolean"), ("Owner", "octet-string")]
+BRCB_ATTRIBUTES = [("RptID", "visible-string"), ("RptEna", "boolean"), ("DatSet", "visible-string"),
+                   ("ConfRev", "unsigned"), ("OptFlds", "bit-string"), ("BufTm", "unsigned"),
+                   ("SqNum", "unsigned"), ("TrgOps", "bit-string"), ("IntgPd", "unsigned"),
+                   ("GI", "boolean"), ("PurgeBuf", "boolean"), ("EntryID", "octet-string"),
+                   ("TimeofEntry", "binary-time"), ("ResvTms", "integer"), ("Owner", "octet-string")]
+
+
+def _tag(element):
+    return element.tag.rsplit('}', 1)[-1]
+
+
+def _children(element, name):
+    return [child for child in element if _tag(child) == name]
+
+
+def _child(element, name):
+    for child in element:
+        if _tag(child) == name:
+            return child
+    return None
+
+
+def _val(element):
+    val = _child(element, "Val")
+    return val.text if val is not None and val.text is not None else None
+
+
+class SclModelImporter:
+    """Parser satu file SCL; model per IED dibangun dengan load_model()."""
+
+    def __init__(self, path):
+        self.path = path
+        self.root = ET.parse(path).getroot()
+        templates = _child(self.root, "DataTypeTemplates")
+        self.lnode_types, self.do_types, self.da_types, self.enum_types = {}, {}, {}, {}
+        if templates is not None:
+            for t in _children(templates, "LNodeType"):
+                self.lnode_types[t.get("id")] = t
+            for t in _children(templates, "DOType"):
+                self.do_types[t.get("id")] = t
+            for t in _children(templates, "DAType"):
+                self.da_types[t.get("id")] = t
+            for t in _children(templates, "EnumType"):
+                self.enum_types[t.get("id")] = {ev.text: int(ev.get("ord")) for ev in _children(t, "EnumVal") if ev.text}
+
+    def ied_addresses(self):
+        """{iedName: ip} dari bagian Communication."""
+        result = {}
+        communication = _child(self.root, "Communication")
+        if communication is None:
+            return result
+        for subnetwork in _children(communication, "SubNetwork"):
+            for ap in _children(subnetwork, "ConnectedAP"):
+                address = _child(ap, "Address")
+                if address is None:
+                    continue
+                for p in _children(address, "P"):
+                    if p.get("type") == "IP" and p.text:
+                        result.setdefault(ap.get("iedName"), p.text.strip())
+        return result
+
+    def ied_names(self):
+        return [ied.get("name") for ied in _children(self.root, "IED")]
+
+    def find_ied(self, host=None):
+        """Nama IED yang alamat IP-nya sama dengan host, atau IED pertama."""
+        if host:
+            for ied_name, ip in self.ied_addresses().items():
+                if ip == host:
+                    return ied_name
+        names = self.ied_names()
+        return names[0] if names else None
+
+    def _convert(self, text, btype, enum_type):
+        if text is None:
+            return "UNKNOWN"
+        text = text.strip()
+        try:
+            if btype == "BOOLEAN":
+                return text.lower() in ("true", "1")
+            if btype == "Enum":
+                return self.enum_types.get(enum_type, {}).get(text, int(text) if text.lstrip('-').isdigit() else 0)
+            mms_type = BTYPE_TO_MMS.get(btype)
+            if mms_type in ("integer", "unsigned"):
+                return int(text)
+            if mms_type == "float":
+                return float(text)
+        except ValueError:
+            return "UNKNOWN"
+        return text
+
+    def _da_node(self, da, fc, instance):
+        """Leaf atau struktur (BDA) untuk satu DA; instance adalah DAI/SDI yang cocok (boleh None)."""
+        btype = da.get("bType")
+        if btype == "Struct":
+            node = {}
+            da_type = self.da_types.get(da.get("type"))
+            if da_type is None:
+                return node
+            for bda in _children(da_type, "BDA"):
+                sub_instance = self._instance_child(instance, bda.get("name"))
+                node[bda.get("name")] = self._da_node(bda, fc, sub_instance)
+            return node
+
+        text = _val(instance) if instance is not None else None
+        if text is None:
+            text = _val(da)
+        leaf = {'reftype': "DA", 'FC': fc, 'value': self._convert(text, btype, da.get("type")),
+                'type': "array" if da.get("count") else BTYPE_TO_MMS.get(btype, "unknown(error)")}
+        return leaf
+
+    @staticmethod
+    def _instance_child(instance, name):
+        if instance is None:
+            return None
+        for child in instance:
+            if _tag(child) in ("DOI", "SDI", "DAI") and child.get("name") == name:
+                return child
+        return None
+
+    def _do_node(self, do_type_id, instance):
+        node = {}
+        do_type = self.do_types.get(do_type_id)
+        if do_type is None:
+            return node
+        for element in do_type:
+            kind = _tag(element)
+            name = element.get("name")
+            sub_instance = self._instance_child(instance, name)
+            if kind == "DA":
+                node[name] = self._da_node(element, element.get("fc"), sub_instance)
+            elif kind == "SDO":
+                node[name] = self._do_node(element.get("type"), sub_instance)
+        return node
+
+    @staticmethod
+    def _ln_name(ln):
+        return (ln.get("prefix") or "") + ln.get("lnClass") + (ln.get("inst") or "")
+
+    def _dataset_node(self, dataset, ied_name, ld_names):
+        node = {}
+        for i, fcda in enumerate(_children(dataset, "FCDA")):
+            # ldInst menunjuk LDevice@inst; nama LD di MMS memakai LDevice@ldName jika ada
+            ld_name = ld_names.get(fcda.get("ldInst")) or ied_name + fcda.get("ldInst")
+            ref = ld_name + "/" + (fcda.get("prefix") or "") + fcda.get("lnClass") + (fcda.get("lnInst") or "")
+            if fcda.get("doName"):
+                ref += "." + fcda.get("doName")
+            if fcda.get("daName"):
+                ref += "." + fcda.get("daName")
+            node[str(i)] = {'reftype': "DX", 'type': "reference", 'value': ref, 'FC': fcda.get("fc")}
+        return node
+
+    @staticmethod
+    def _rcb_instances(rc):
+        enabled = _child(rc, "RptEnabled")
+        count = int(enabled.get("max", "1")) if enabled is not None else 1
+        name = rc.get("name")
+        # libiec61850 memberi akhiran 01..NN jika satu ReportControl memiliki beberapa instance
+        return [name] if count <= 1 else [f"{name}{i:02d}" for i in range(1, count + 1)]
+
+    def _rcb_node(self, rc, ld_name, ln_name):
+        buffered = rc.get("buffered", "false").lower() == "true"
+        fc = "BR" if buffered else "RP"
+        values = {
+            "RptID": rc.get("rptID") or f"{ld_name}/{ln_name}${fc}${rc.get('name')}",
+            "RptEna": False, "Resv": False, "GI": False, "PurgeBuf": False,
+            "DatSet": f"{ld_name}/{ln_name}${rc.get('datSet')}" if rc.get("datSet") else "",
+            "ConfRev": int(rc.get("confRev", "0")),
+            "BufTm": int(rc.get("bufTime", "0")),
+            "IntgPd": int(rc.get("intgPd", "0")),
+            "SqNum": 0,
+        }
+        attributes = BRCB_ATTRIBUTES if buffered else URCB_ATTRIBUTES
+        return {name: {'reftype': "DA", 'FC': fc, 'value': values.get(name, "UNKNOWN"), 'type': mms_type}
+                for name, mms_type in attributes}
+
+    def load_model(self, ied_name=None, host=None):
+        """Model dict untuk satu IED (dipilih dari ied_name, alamat host, atau IED pertama)."""
+        ied_name = ied_name or self.find_ied(host)
+        ied = next((i for i in _children(self.root, "IED") if i.get("name") == ied_name), None)
+        if ied is None:
+            logger.error(f"IED {ied_name} not found in {self.path}")
+            return {}
+
+        tmodel = {}
+        for access_point in _children(ied, "AccessPoint"):
+            server = _child(access_point, "Server")
+            if server is None:
+                continue
+            ld_names = {ld.get("inst"): ld.get("ldName") or ied_name + ld.get("inst") for ld in _children(server, "LDevice")}
+            for ldevice in _children(server, "LDevice"):
+                ld_name = ld_names[ldevice.get("inst")]
+                tmodel[ld_name] = {}
+                for ln in ldevice:
+                    if _tag(ln) not in ("LN0", "LN"):
+                        continue
+                    ln_name = self._ln_name(ln)
+                    lnmodel = {}
+                    lnode_type = self.lnode_types.get(ln.get("lnType"))
+                    if lnode_type is not None:
+                        for do in _children(lnode_type, "DO"):
+                            lnmodel[do.get("name")] = self._do_node(do.get("type"), self._instance_child(ln, do.get("name")))
+                    for dataset in _children(ln, "DataSet"):
+                        lnmodel[dataset.get("name")] = self._dataset_node(dataset, ied_name, ld_names)
+                    for rc in _children(ln, "ReportControl"):
+                        for rcb_name in self._rcb_instances(rc):
+                            lnmodel[rcb_name] = self._rcb_node(rc, ld_name, ln_name)
+                    tmodel[ld_name][ln_name] = lnmodel
+        return tmodel
+
+
+def load_model(path, ied_name=None, host=None):
+    """Membangun model IED dari file SCL; {} jika file tidak dapat dibaca."""
+    try:
+        return SclModelImporter(path).load_model(ied_name, host)
+    except (IOError, ET.ParseError) as e:
+        logger.error(f"Cannot import SCL file {path}: {e}")
+        return {}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format='%(asctime)s %(name)-12s %(levelname)-8s %(message)s', level=logging.INFO)
+    scl_file = sys.argv[1] if len(sys.argv) > 1 else "../TRAFO5_2.iid"
+    importer = SclModelImporter(scl_file)
+    print(f"IEDs: {importer.ied_names()} addresses: {importer.ied_addresses()}")
+    model = importer.load_model(sys.argv[2] if len(sys.argv) > 2 else None)
+    for ld_name, lns in model.items():
+        for ln_name, content in lns.items():
+            datasets = [k for k, v in content.items() if v.get("0", {}).get("reftype") == "DX"]
+            rcbs = [k for k, v in content.items() if "DatSet" in v]
+            print(f"{ld_name}/{ln_name}: {len(content) - len(datasets) - len(rcbs)} DO, {len(datasets)} DataSet, {len(rcbs)} RCB")
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# sim_ied.py - IED IEC 61850 simulasi untuk benchmark gateway tanpa gardu induk.
+# Model dibangun dari file SCL/IID (mis. TRAFO5_2.iid) lewat scl_importer lalu dibuat dengan API model
+# dinamis libiec61850 (IedModel_create, DataObject_create, DataAttribute_create, DataSet_create,
+# ReportControlBlock_create). Anggota DataSet (mag.f pada FC MX, stVal boolean/Dbpos pada FC ST)
+# diperbarui secara round-robin dengan laju tertentu sehingga RCB menghasilkan aliran report.
+# Atribut t diisi waktu pembaruan (epoch-ms) sehingga latensi ujung ke ujung dapat diukur dari
+# timestamp CP56Time2a di sisi IEC 104.
+#
+# Pemakaian: python3 sim_ied.py [file_iid] [port] [update_per_detik] [buftm_ms]
+
+import ctypes
+import logging
+import sys
+import threading
+import time
+
+import lib61850
+import scl_importer
+
+logger = logging.getLogger(__name__)
+
+# TrgOps dan OptFlds (#define di iec61850_common.h, tidak ada di binding)
+TRG_OPT_DATA_CHANGED = 1
+TRG_OPT_QUALITY_CHANGED = 2
+TRG_OPT_GI = 16
+RPT_OPT_SEQ_NUM = 1
+RPT_OPT_TIME_STAMP = 2
+RPT_OPT_REASON_FOR_INCLUSION = 4
+RPT_OPT_DATA_SET = 8
+RPT_OPT_CONF_REV = 128
+
+RCB_TRIGGERS = TRG_OPT_DATA_CHANGED | TRG_OPT_QUALITY_CHANGED | TRG_OPT_GI
+RCB_OPTIONS = RPT_OPT_SEQ_NUM | RPT_OPT_TIME_STAMP | RPT_OPT_REASON_FOR_INCLUSION | RPT_OPT_DATA_SET | RPT_OPT_CONF_REV
+
+# tipe MMS dari scl_importer -> DataAttributeType libiec61850
+DA_TYPES = {
+    'boolean': lib61850.IEC61850_BOOLEAN,
+    'integer': lib61850.IEC61850_INT32,
+    'unsigned': lib61850.IEC61850_INT32U,
+    'float': lib61850.IEC61850_FLOAT32,
+    'utc-time': lib61850.IEC61850_TIMESTAMP,
+    'binary-time': lib61850.IEC61850_ENTRY_TIME,
+    'visible-string': lib61850.IEC61850_VISIBLE_STRING_255,
+    'mms-string': lib61850.IEC61850_UNICODE_STRING_255,
+    'octet-string': lib61850.IEC61850_OCTET_STRING_64,
+}
+BIT_STRING_TYPES = {'q': lib61850.IEC61850_QUALITY, 'Check': lib61850.IEC61850_CHECK}
+
+# jenis titik simulasi
+KIND_FLOAT, KIND_SPS, KIND_DPS = 'float', 'sps', 'dps'
+
+
+def _is_leaf(node):
+    return isinstance(node, dict) and node.get('reftype') == 'DA'
+
+
+def _fcs(node):
+    if _is_leaf(node):
+        return {node['FC']}
+    result = set()
+    for child in node.values():
+        if isinstance(child, dict):
+            result |= _fcs(child)
+    return result
+
+
+def _is_dataset(node):
+    return isinstance(node, dict) and any(isinstance(v, dict) and v.get('reftype') == 'DX' for v in node.values())
+
+
+def _is_rcb(node):
+    return isinstance(node, dict) and 'RptID' in node and _is_leaf(node['RptID'])
+
+
+class SimulatedIED:
+    """Server IEC 61850 dengan model dari file SCL dan generator report."""
+
+    def __init__(self, scl_path, port = 102, rate = 100.0, buf_time = None, ied_name = None, tick_rate = 50.0):
+        importer = scl_importer.SclModelImporter(scl_path)
+        self.ied_name = ied_name or importer.find_ied()
+        self.model_dict = importer.load_model(self.ied_name)
+        self.port = port
+        self.rate = float(rate)
+        self.buf_time = buf_time
+        self.tick_rate = float(tick_rate)
+        self.model = None
+        self.server = None
+        self.points = [] # dict(ref, kind, value, t, q) untuk setiap titik yang disimulasikan
+        self.updates = 0
+        self.running = False
+        self.thread = None
+
+    # --- pembangunan model ---
+    def _ld_inst(self, ld_name):
+        return ld_name[len(self.ied_name):] if ld_name.startswith(self.ied_name) else ld_name
+
+    def _create_attribute(self, name, node, parent):
+        parent = ctypes.cast(parent, ctypes.POINTER(lib61850.ModelNode))
+        if _is_leaf(node):
+            if node['type'] == 'bit-string':
+                da_type = BIT_STRING_TYPES.get(name, lib61850.IEC61850_CODEDENUM)
+            else:
+                da_type = DA_TYPES.get(node['type'])
+            if da_type is None:
+                return # array dan tipe yang tidak dikenal tidak disimulasikan
+            fc = node['FC']
+            if name == 'q':
+                triggers = TRG_OPT_QUALITY_CHANGED
+            elif fc in ('ST', 'MX') and name != 't':
+                triggers = TRG_OPT_DATA_CHANGED
+            else:
+                triggers = 0
+            lib61850.DataAttribute_create(name.encode(), parent, da_type,
+                                          lib61850.FunctionalConstraint_fromString(fc.encode()), triggers, 0, 0)
+            return
+        fcs = _fcs(node)
+        if len(fcs) != 1:
+            return
+        fc = fcs.pop()
+        attribute = lib61850.DataAttribute_create(name.encode(), parent, lib61850.IEC61850_CONSTRUCTED,
+                                                  lib61850.FunctionalConstraint_fromString(fc.encode()),
+                                                  TRG_OPT_DATA_CHANGED if fc in ('ST', 'MX') else 0, 0, 0)
+        for child_name, child in node.items():
+            self._create_attribute(child_name, child, attribute)
+
+    def _create_object(self, name, node, parent):
+        data_object = lib61850.DataObject_create(name.encode(), ctypes.cast(parent, ctypes.POINTER(lib61850.ModelNode)), 0)
+        for child_name, child in node.items():
+            if not isinstance(child, dict):
+                continue
+            # struktur dengan satu FC menjadi DA konstruksi, campuran FC menjadi SDO
+            if _is_leaf(child) or len(_fcs(child)) == 1:
+                self._create_attribute(child_name, child, data_object)
+            else:
+                self._create_object(child_name, child, data_object)
+
+    def _dataset_variable(self, ld_name, member):
+        member_ld, path = member['value'].split('/', 1)
+        ln_name, rest = path.split('.', 1)
+        variable = f"{ln_name}${member['FC']}${rest.replace('.', '$')}"
+        return variable if member_ld == ld_name else f"{self._ld_inst(member_ld)}/{variable}"
+
+    def build_model(self):
+        self.model = lib61850.IedModel_create(self.ied_name.encode())
+        logical_nodes = {}
+        for ld_name, lns in self.model_dict.items():
+            ld = lib61850.LogicalDevice_create(self._ld_inst(ld_name).encode(), self.model)
+            for ln_name, content in lns.items():
+                ln = logical_nodes[ld_name, ln_name] = lib61850.LogicalNode_create(ln_name.encode(), ld)
+                for name, node in content.items():
+                    if isinstance(node, dict) and not _is_dataset(node) and not _is_rcb(node):
+                        self._create_object(name, node, ln)
+
+        for (ld_name, ln_name), ln in logical_nodes.items():
+            for name, node in self.model_dict[ld_name][ln_name].items():
+                if _is_dataset(node):
+                    dataset = lib61850.DataSet_create(name.encode(), ln)
+                    for index in sorted(node, key=int):
+                        lib61850.DataSetEntry_create(dataset, self._dataset_variable(ld_name, node[index]).encode(), -1, None)
+            for name, node in self.model_dict[ld_name][ln_name].items():
+                if _is_rcb(node):
+                    dataset_name = str(node['DatSet']['value']).split('$')[-1]
+                    buf_time = self.buf_time if self.buf_time is not None else int(node['BufTm']['value'] or 0)
+                    lib61850.ReportControlBlock_create(name.encode(), ln, str(node['RptID']['value']).encode(),
+                                                       'PurgeBuf' in node, dataset_name.encode(),
+                                                       int(node['ConfRev']['value'] or 1), RCB_TRIGGERS, RCB_OPTIONS,
+                                                       buf_time, 0)
+        self._collect_points()
+
+    def _collect_points(self):
+        """Titik simulasi: anggota DataSet (DO) dengan mag.f (MX) atau stVal boolean/Dbpos (ST), tanpa duplikat."""
+        seen = set()
+        for ld_name, lns in self.model_dict.items():
+            for ln_name, content in lns.items():
+                for node in content.values():
+                    if not _is_dataset(node):
+                        continue
+                    for member in node.values():
+                        ref = member['value']
+                        if ref in seen:
+                            continue
+                        seen.add(ref)
+                        member_ld, path = ref.split('/', 1)
+                        parts = path.split('.')
+                        do = self.model_dict.get(member_ld, {}).get(parts[0], {})
+                        for part in parts[1:]:
+                            do = do.get(part, {}) if isinstance(do, dict) else {}
+                        if member['FC'] == 'MX' and _is_leaf(do.get('mag', {}).get('f')):
+                            self.points.append({'ref': ref, 'kind': KIND_FLOAT, 'value_ref': ref + '.mag.f'})
+                        elif member['FC'] == 'ST' and _is_leaf(do.get('stVal')):
+                            if do['stVal']['type'] == 'boolean':
+                                self.points.append({'ref': ref, 'kind': KIND_SPS, 'value_ref': ref + '.stVal'})
+                            elif do['stVal']['type'] == 'bit-string':
+                                self.points.append({'ref': ref, 'kind': KIND_DPS, 'value_ref': ref + '.stVal'})
+
+    def _attribute(self, ref):
+        node = lib61850.IedModel_getModelNodeByObjectReference(self.model, ref.encode())
+        return ctypes.cast(node, ctypes.POINTER(lib61850.DataAttribute)) if node else None
+
+    # --- server dan generator ---
+    def start(self):
+        if self.model is None:
+            self.build_model()
+        self.server = lib61850.IedServer_create(self.model)
+        lib61850.IedServer_start(self.server, self.port)
+        if not lib61850.IedServer_isRunning(self.server):
+            raise RuntimeError(f"Simulated IED {self.ied_name} could not listen on port {self.port}")
+        resolved = []
+        for point in self.points:
+            point['value'] = self._attribute(point['value_ref'])
+            point['t'] = self._attribute(point['ref'] + '.t')
+            point['state'] = 0
+            if point['value']:
+                resolved.append(point)
+        self.points = resolved
+        logger.info(f"Simulated IED {self.ied_name} on port {self.port}: {len(self.points)} points, {self.rate:.0f} updates/s")
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        server, points = self.server, self.points
+        interval = 1.0 / self.tick_rate
+        per_tick = self.rate / self.tick_rate
+        credit, cursor = 0.0, 0
+        next_tick = time.perf_counter()
+        while self.running and points:
+            credit += per_tick
+            count = int(credit)
+            credit -= count
+            if count:
+                now_ms = int(time.time() * 1000)
+                lib61850.IedServer_lockDataModel(server)
+                for _ in range(count):
+                    point = points[cursor]
+                    cursor = (cursor + 1) % len(points)
+                    point['state'] += 1
+                    # t dulu, lalu nilai (pemicu dchg) agar report membawa timestamp pembaruan ini
+                    if point['t']:
+                        lib61850.IedServer_updateUTCTimeAttributeValue(server, point['t'], now_ms)
+                    if point['kind'] == KIND_FLOAT:
+                        lib61850.IedServer_updateFloatAttributeValue(server, point['value'], float(point['state']))
+                    elif point['kind'] == KIND_SPS:
+                        lib61850.IedServer_updateBooleanAttributeValue(server, point['value'], bool(point['state'] & 1))
+                    else:
+                        lib61850.IedServer_updateDbposValue(server, point['value'],
+                                                            lib61850.DBPOS_ON if point['state'] & 1 else lib61850.DBPOS_OFF)
+                lib61850.IedServer_unlockDataModel(server)
+                self.updates += count
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+        if self.server:
+            lib61850.IedServer_stop(self.server)
+            lib61850.IedServer_destroy(self.server)
+            self.server = None
+        if self.model:
+            lib61850.IedModel_destroy(self.model)
+            self.model = None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format='%(asctime)s %(name)-12s %(levelname)-8s %(message)s', level=logging.INFO)
+    scl_file = sys.argv[1] if len(sys.argv) > 1 else "../TRAFO5_2.iid"
+    ied = SimulatedIED(scl_file, port=int(sys.argv[2]) if len(sys.argv) > 2 else 10102,
+                       rate=float(sys.argv[3]) if len(sys.argv) > 3 else 100.0,
+                       buf_time=int(sys.argv[4]) if len(sys.argv) > 4 else None)
+    ied.start()
+    try:
+        while True:
+            time.sleep(10)
+            logger.info(f"{ied.updates} updates generated")
+    except KeyboardInterrupt:
+        ied.stop()
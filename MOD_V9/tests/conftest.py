@@ -0,0 +1,5 @@
+# Modul MOD_V9 diimpor langsung (flat), seperti saat gateway dijalankan dari direktori MOD_V9.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from channels import BoundedChannel
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, timeout=5))
+
+
+def test_invalid_policy_and_missing_key():
+    loop = asyncio.new_event_loop()
+    try:
+        with pytest.raises(ValueError):
+            BoundedChannel("x", loop, policy='lifo')
+        with pytest.raises(ValueError):
+            BoundedChannel("x", loop, policy='coalesce')
+    finally:
+        loop.close()
+
+
+def test_fifo_batches():
+    async def main():
+        channel = BoundedChannel("process", asyncio.get_running_loop(), maxsize=10)
+        for i in range(5):
+            assert channel.put(i)
+        assert len(channel) == 5
+        assert await channel.get_batch(3) == [0, 1, 2]
+        assert await channel.get_batch() == [3, 4]
+        return channel.stats()
+
+    stats = run(main())
+    assert stats['put'] == 5 and stats['get'] == 5 and stats['depth'] == 0 and stats['high_water'] == 5
+
+
+def test_drop_oldest():
+    async def main():
+        channel = BoundedChannel("ui", asyncio.get_running_loop(), maxsize=3, policy='drop_oldest')
+        for i in range(5):
+            channel.put(i)
+        return await channel.get_batch(), channel.stats()
+
+    batch, stats = run(main())
+    assert batch == [2, 3, 4]
+    assert stats['dropped'] == 2 and stats['high_water'] == 3
+
+
+def test_coalesce_keeps_latest_per_key_in_update_order():
+    async def main():
+        channel = BoundedChannel("ui", asyncio.get_running_loop(), maxsize=2, policy='coalesce', key=lambda item: item[0])
+        channel.put((100, 1))
+        channel.put((200, 1))
+        channel.put((100, 2))
+        first = await channel.get_batch()
+        channel.put((300, 1))
+        channel.put((400, 1))
+        channel.put((500, 1)) # kunci baru saat penuh: kunci tertua dibuang
+        return first, await channel.get_batch(), channel.stats()
+
+    first, second, stats = run(main())
+    assert first == [(200, 1), (100, 2)]
+    assert second == [(400, 1), (500, 1)]
+    assert stats['coalesced'] == 1 and stats['dropped'] == 1
+
+
+def test_force_ignores_limit():
+    async def main():
+        channel = BoundedChannel("process", asyncio.get_running_loop(), maxsize=1, policy='drop_oldest')
+        channel.put('data')
+        channel.put('invalidate', force=True)
+        return await channel.get_batch()
+
+    assert run(main()) == ['data', 'invalidate']
+
+
+def test_block_on_loop_thread_drops_instead_of_deadlocking():
+    async def main():
+        channel = BoundedChannel("process", asyncio.get_running_loop(), maxsize=1)
+        assert channel.put(1)
+        assert channel.put(2) is False
+        return await channel.get_batch(), channel.stats()
+
+    batch, stats = run(main())
+    assert batch == [1] and stats['dropped'] == 1 and stats['blocked'] == 0
+
+
+def test_block_applies_backpressure_to_threads():
+    async def main():
+        channel = BoundedChannel("process", asyncio.get_running_loop(), maxsize=2)
+        done = threading.Event()
+
+        def producer():
+            for i in range(6):
+                channel.put(i)
+            done.set()
+
+        thread = threading.Thread(target=producer)
+        thread.start()
+        while not channel.blocked:
+            await asyncio.sleep(0.001)
+        assert len(channel) == 2
+        received = []
+        while len(received) < 6:
+            batch = await channel.get_batch()
+            assert len(batch) <= 2
+            received.extend(batch)
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        return received, done.is_set(), channel.stats()
+
+    received, done, stats = run(main())
+    assert received == list(range(6)) and done
+    assert stats['high_water'] == 2 and stats['dropped'] == 0
+
+
+def test_pollers_filling_shared_executor_do_not_starve_consumer():
+    # seperti gateway: poll di executor default memblokir di put(), konsumen memakai thread sendiri
+    async def main():
+        loop = asyncio.get_running_loop()
+        channel = BoundedChannel("process", loop, maxsize=2)
+        shared = ThreadPoolExecutor(max_workers=2)
+        processor = ThreadPoolExecutor(max_workers=1)
+        loop.set_default_executor(shared)
+        received = []
+
+        def poll(offset):
+            for i in range(10):
+                channel.put(offset + i)
+
+        polls = asyncio.gather(*(loop.run_in_executor(None, poll, offset) for offset in (0, 100, 200, 300)))
+        while len(received) < 40:
+            batch = await channel.get_batch(2)
+            # process_batch: ikut memakai executor default membuat semua worker tertahan di put()
+            await loop.run_in_executor(processor, received.extend, batch)
+        await polls
+        processor.shutdown()
+        return received, channel.stats()
+
+    received, stats = run(main())
+    assert sorted(received) == [offset + i for offset in (0, 100, 200, 300) for i in range(10)]
+    assert stats['blocked'] > 0 and stats['dropped'] == 0
@@ -0,0 +1,94 @@
+from deadband import DeadbandTable, HOLD, SEND, SKIP
+
+
+def table(**options):
+    deadband = DeadbandTable()
+    deadband.configure(100, **options)
+    return deadband
+
+
+def test_unconfigured_ioa_always_sent():
+    deadband = table(absolute=1.0)
+    assert deadband.evaluate([200, 200], [1.0, 1.0], 0.0) == [SEND, SEND]
+    assert 200 not in deadband and 100 in deadband and len(deadband) == 1
+
+
+def test_first_value_sent():
+    assert table(absolute=5.0).evaluate([100], [1.0], 0.0) == [SEND]
+
+
+def test_absolute_deadband():
+    deadband = table(absolute=1.0)
+    assert deadband.evaluate([100], [10.0], 0.0) == [SEND]
+    assert deadband.evaluate([100], [10.9], 1.0) == [SKIP]
+    assert deadband.evaluate([100], [11.5], 2.0) == [SEND]
+    # referensi pindah ke nilai yang terakhir dikirim
+    assert deadband.evaluate([100], [10.9], 3.0) == [SKIP]
+
+
+def test_percent_deadband_uses_sent_value():
+    deadband = table(percent=10.0)
+    assert deadband.evaluate([100], [200.0], 0.0) == [SEND]
+    assert deadband.evaluate([100], [219.0], 1.0) == [SKIP]
+    assert deadband.evaluate([100], [221.0], 2.0) == [SEND]
+
+
+def test_no_limit_sends_every_change():
+    deadband = table()
+    assert deadband.evaluate([100, 100, 100], [1.0, 1.0, 1.5], 0.0) == [SEND, SKIP, SEND]
+
+
+def test_min_interval_holds_until_elapsed():
+    deadband = table(absolute=1.0, min_interval=5.0)
+    assert deadband.evaluate([100], [0.0], 0.0) == [SEND]
+    assert deadband.evaluate([100], [3.0], 1.0) == [HOLD]
+    # tanpa sampel baru, nilai yang ditahan dievaluasi ulang dan terkirim setelah interval lewat
+    assert deadband.evaluate([100], [3.0], 4.0) == [HOLD]
+    assert deadband.evaluate([100], [3.0], 5.0) == [SEND]
+    assert deadband.sent_value[deadband.rows[100]] == 3.0
+    assert deadband.evaluate([100], [3.0], 6.0) == [SKIP]
+
+
+def test_integrated_drift_held_then_sent_without_new_samples():
+    deadband = table(absolute=1.0, integrated=2.0)
+    assert deadband.evaluate([100], [10.0], 0.0) == [SEND]
+    # drift 0.5 di bawah deadband: ditahan agar integralnya terus dihitung
+    assert deadband.evaluate([100], [10.5], 1.0) == [HOLD]
+    assert deadband.evaluate([100], [10.5], 3.0) == [HOLD] # integral 1.0
+    assert deadband.evaluate([100], [10.5], 5.0) == [SEND] # integral 2.0
+    assert deadband.integral[deadband.rows[100]] == 0.0
+    assert deadband.evaluate([100], [10.5], 6.0) == [SKIP]
+
+
+def test_value_back_at_reference_is_skipped():
+    deadband = table(absolute=1.0, integrated=100.0)
+    assert deadband.evaluate([100], [10.0], 0.0) == [SEND]
+    assert deadband.evaluate([100], [10.5], 1.0) == [HOLD]
+    assert deadband.evaluate([100], [10.0], 2.0) == [SKIP]
+
+
+def test_mark_sent_resets_reference():
+    deadband = table(absolute=1.0, min_interval=10.0)
+    assert deadband.evaluate([100], [0.0], 0.0) == [SEND]
+    deadband.mark_sent(100, 5.0, 1.0)
+    assert deadband.evaluate([100], [5.5], 20.0) == [SKIP]
+    assert deadband.evaluate([100], [7.0], 2.0) == [HOLD]
+    deadband.mark_sent(300, 1.0) # IOA tanpa deadband diabaikan
+
+
+def test_single_pass_over_many_ioas():
+    deadband = DeadbandTable()
+    for ioa in range(10):
+        deadband.configure(ioa, absolute=1.0)
+    ioas = list(range(10))
+    assert deadband.evaluate(ioas, [0.0] * 10, 0.0) == [SEND] * 10
+    values = [0.5 if ioa % 2 else 2.0 for ioa in ioas]
+    assert deadband.evaluate(ioas, values, 1.0) == [SKIP if ioa % 2 else SEND for ioa in ioas]
+
+
+def test_reconfigure_keeps_state():
+    deadband = table(absolute=1.0)
+    assert deadband.evaluate([100], [0.0], 0.0) == [SEND]
+    deadband.configure(100, absolute=5.0)
+    assert len(deadband) == 1
+    assert deadband.evaluate([100], [3.0], 1.0) == [SKIP]
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+# server 104 memakai pustaka native lib60870 lewat ctypes
+libiec60870server = pytest.importorskip("libiec60870server", exc_type=ImportError)
+
+from lib60870 import IEC60870_QUALITY_GOOD, SinglePointInformation
+from quality_map import CONNECTION_LOST_QUALITY
+
+IOAS = list(range(1000, 1010))
+
+
+@pytest.fixture
+def server():
+    srv = libiec60870server.IEC60870_5_104_server()
+    srv.set_batching(0.001)
+    for ioa in IOAS:
+        srv.add_ioa(ioa, SinglePointInformation, 0, None, True)
+    yield srv
+    srv.stop()
+
+
+def test_invalidate_waits_for_running_flush(server, monkeypatch):
+    sent = []
+    sent_lock = threading.Lock()
+
+    def record(io_type, objects, *args, **kwargs):
+        if objects[0][2] == IEC60870_QUALITY_GOOD:
+            # perubahan status lama sedang dikirim oleh flush batch loop saat invalidate dipanggil
+            time.sleep(0.005)
+        with sent_lock:
+            sent.extend((obj[0], obj[2]) for obj in objects)
+        return 1
+
+    monkeypatch.setattr(server, 'send_objects', record)
+
+    for value in (1, 0, 1, 0, 1):
+        for ioa in IOAS:
+            server.update_ioa(ioa, value, None, IEC60870_QUALITY_GOOD)
+        flusher = threading.Thread(target=server.flush_events)
+        flusher.start()
+        while server.batch_pending_count:
+            time.sleep(0.0005)
+        assert sorted(server.invalidate(IOAS)) == IOAS
+        flusher.join()
+
+        last = {}
+        for ioa, quality in sent:
+            last[ioa] = quality
+        assert last == {ioa: CONNECTION_LOST_QUALITY for ioa in IOAS}
+        sent.clear()
@@ -0,0 +1,85 @@
+from mms_index import MmsReferenceIndex, find_first_float, get_value_by_path
+
+
+def test_prefixes_stop_at_object_boundaries():
+    assert list(MmsReferenceIndex.prefixes('LD0/MMXU1.TotW.mag.f')) == [
+        'LD0/MMXU1', 'LD0/MMXU1.TotW', 'LD0/MMXU1.TotW.mag', 'LD0/MMXU1.TotW.mag.f']
+
+
+def test_prefixes_ignore_dots_in_logical_device_name():
+    assert list(MmsReferenceIndex.prefixes('IED.LD0/XCBR1.Pos')) == ['IED.LD0/XCBR1', 'IED.LD0/XCBR1.Pos']
+
+
+def test_lookup_by_reported_prefix():
+    index = MmsReferenceIndex()
+    index.add('ied1', 'LD0/MMXU1.TotW.mag.f', 100)
+    index.add('ied1', 'LD0/MMXU1.TotVAr.mag.f', 101)
+    index.add('ied1', 'LD0/XCBR1.Pos.stVal', 200, 'stVal')
+
+    assert index.lookup('ied1', 'LD0/MMXU1.TotW') == [(100, None, 'mag.f')]
+    assert sorted(index.lookup('ied1', 'LD0/MMXU1')) == [(100, None, 'TotW.mag.f'), (101, None, 'TotVAr.mag.f')]
+    assert index.lookup('ied1', 'LD0/XCBR1.Pos.stVal') == [(200, 'stVal', '')]
+    assert index.lookup('ied1', 'LD0/MMXU2') == ()
+
+
+def test_lookup_is_scoped_per_ied():
+    index = MmsReferenceIndex()
+    index.add('ied1', 'LD0/MMXU1.TotW.mag.f', 100)
+    index.add('ied2', 'LD0/MMXU1.TotW.mag.f', 300)
+
+    assert index.lookup('ied1', 'LD0/MMXU1.TotW') == [(100, None, 'mag.f')]
+    assert index.lookup('ied2', 'LD0/MMXU1.TotW') == [(300, None, 'mag.f')]
+    assert index.lookup('ied3', 'LD0/MMXU1.TotW') == ()
+    assert sorted(index.ied_ids()) == ['ied1', 'ied2']
+
+
+def test_duplicate_entries_are_not_repeated():
+    index = MmsReferenceIndex()
+    index.add('ied1', 'LD0/MMXU1.TotW.mag.f', 100)
+    index.add('ied1', 'LD0/MMXU1.TotW.mag.f', 100)
+
+    assert index.lookup('ied1', 'LD0/MMXU1') == [(100, None, 'TotW.mag.f')]
+    assert len(index) == 4
+
+
+def sibling_index():
+    # tiga fasa di bawah satu DO yang dilaporkan utuh, tanpa #value_path (default config.local.ini)
+    index = MmsReferenceIndex()
+    for ioa, phase in ((100, 'phsA'), (101, 'phsB'), (102, 'phsC')):
+        index.add('ied1', f'LD0/MMXU1.A.{phase}.cVal.mag.f', ioa)
+    return index
+
+
+def test_siblings_resolve_their_own_path_in_named_structure():
+    value = {phase: {'cVal': {'mag': {'f': float(i)}}} for i, phase in enumerate(('phsA', 'phsB', 'phsC'), 1)}
+    assert sibling_index().resolve('ied1', 'LD0/MMXU1.A', value) == [(100, None, 1.0), (101, None, 2.0), (102, None, 3.0)]
+
+
+def test_unresolvable_siblings_only_update_first_match():
+    # struktur dari printValue tidak membawa nama komponen: nilai phsA tidak boleh ditulis ke IOA phsB/phsC
+    value = [[[[1.0]], 0, 0], [[[2.0]], 0, 0], [[[3.0]], 0, 0]]
+    assert sibling_index().resolve('ied1', 'LD0/MMXU1.A', value) == [(100, None, 1.0)]
+
+
+def test_exact_and_explicit_value_paths():
+    index = MmsReferenceIndex()
+    index.add('ied1', 'LD0/MMXU1.TotW', 100)
+    index.add('ied1', 'LD0/MMXU1.TotW', 101, 'mag.f')
+    index.add('ied1', 'LD0/MMXU1.TotW', 102, 'mag.i')
+    assert index.resolve('ied1', 'LD0/MMXU1.TotW', {'mag': {'f': 4.5}}) == [(100, None, 4.5), (101, 'mag.f', 4.5), (102, 'mag.i', None)]
+
+
+def test_pre_extracted_value_only_matches_its_value_path():
+    index = MmsReferenceIndex()
+    index.add('ied1', 'LD0/XCBR1.Pos', 200, 'stVal')
+    index.add('ied1', 'LD0/XCBR1.Pos', 201, 'q')
+    assert index.resolve('ied1', 'LD0/XCBR1.Pos', 2, True, 'stVal') == [(200, 'stVal', 2)]
+    assert index.resolve('ied1', 'LD0/XCBR1.Pos', 2, True, None) == []
+
+
+def test_value_helpers():
+    assert find_first_float({'a': 'x', 'b': [None, 3]}) == 3.0
+    assert find_first_float(['x']) is None
+    assert get_value_by_path({'mag': {'f': 1}}, 'mag.f') == 1.0
+    assert get_value_by_path([1.0], 'mag.f') is None
+    assert get_value_by_path({'mag': {'f': 'x'}}, 'mag.f') is None
@@ -0,0 +1,170 @@
+import copy
+import marshal
+import threading
+import zlib
+
+import pytest
+
+import model_cache
+from model_cache import FrozenModel, ModelCacheStore, ModelRegistry
+
+
+MODEL = {
+    'LD0': {
+        'MMXU1': {
+            'TotW': {'mag': {'f': {'reftype': 'DA', 'FC': 'MX', 'value': 1.5}}},
+            'DS1': {'0': {'reftype': 'DX', 'FC': 'MX', 'value': 'LD0/MMXU1.TotW'}},
+        },
+    },
+}
+
+
+class CountingStore(ModelCacheStore):
+    def __init__(self, directory):
+        super().__init__(directory, legacy_file=None)
+        self.loads = 0
+
+    def load(self, key, fingerprint = '', kind = "model", with_verified = False):
+        self.loads += 1
+        return super().load(key, fingerprint, kind, with_verified)
+
+
+def test_store_round_trip(tmp_path):
+    store = ModelCacheStore(str(tmp_path), legacy_file=None)
+    assert store.save('10.0.0.1:102', MODEL, 'abc')
+    assert store.load('10.0.0.1:102', 'abc') == MODEL
+    assert store.load('10.0.0.1:102', 'other') is None
+    assert store.load('10.0.0.2:102') is None
+
+
+def test_store_ignores_corrupt_file(tmp_path):
+    store = ModelCacheStore(str(tmp_path), legacy_file=None)
+    with open(store.path('ied'), 'wb') as f:
+        f.write(b'IEDM')
+    assert store.load('ied') is None
+
+
+def test_fingerprint_follows_file_content(tmp_path):
+    scl = tmp_path / 'ied.iid'
+    scl.write_text('<SCL/>')
+    first = model_cache.file_fingerprint(str(scl))
+    scl.write_text('<SCL version="2"/>')
+    assert model_cache.file_fingerprint(str(scl)) != first
+    assert model_cache.file_fingerprint(None) == ''
+
+
+def test_frozen_model_is_read_only_at_every_level():
+    frozen = model_cache.freeze(MODEL)
+    assert isinstance(frozen['LD0']['MMXU1'], FrozenModel)
+    assert isinstance(frozen['LD0']['MMXU1'], dict)
+    assert frozen == MODEL
+    with pytest.raises(TypeError):
+        frozen['LD0']['MMXU1']['TotW'] = {}
+    with pytest.raises(TypeError):
+        frozen['LD0'].setdefault('MMXU2', {})
+    with pytest.raises(TypeError):
+        frozen['LD0']['MMXU1'].pop('DS1')
+
+
+def test_deepcopy_of_frozen_model_is_mutable():
+    copied = copy.deepcopy(dict(model_cache.freeze(MODEL)))
+    copied['LD0']['MMXU2'] = {}
+    assert type(copied['LD0']) is dict
+    assert 'MMXU2' not in MODEL['LD0']
+
+
+def test_registry_loads_each_model_once(tmp_path):
+    store = CountingStore(str(tmp_path))
+    store.save('ied', MODEL)
+    registry = ModelRegistry(store)
+
+    first = registry.get('ied')
+    second = registry.get('ied')
+    assert first is second
+    assert first == MODEL
+    assert store.loads == 1
+    assert registry.get('missing') is None
+
+
+def test_update_swaps_snapshot_without_touching_the_old_one(tmp_path):
+    registry = ModelRegistry(ModelCacheStore(str(tmp_path), legacy_file=None))
+    old = registry.update('ied', MODEL)
+    new_model = copy.deepcopy(MODEL)
+    new_model['LD0']['MMXU2'] = {'TotW': {}}
+
+    new = registry.update('ied', new_model)
+
+    assert old == MODEL
+    assert 'MMXU2' in new['LD0']
+    assert registry.get('ied') is new
+    # perubahan pada dict milik pemanggil tidak bocor ke snapshot
+    new_model['LD0'].clear()
+    assert 'MMXU1' in new['LD0']
+    assert ModelCacheStore(str(tmp_path), legacy_file=None).load('ied') == new
+
+
+def test_readers_never_see_a_partial_model_during_updates(tmp_path):
+    registry = ModelRegistry(ModelCacheStore(str(tmp_path), legacy_file=None))
+    models = []
+    for size in (50, 5):
+        model = {'LD0': {f'LN{i}': {'DO': {'reftype': 'DO'}} for i in range(size)}}
+        models.append(model)
+    registry.update('ied', models[0])
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        while not stop.is_set():
+            snapshot = registry.get('ied')
+            try:
+                count = sum(1 for _ in snapshot['LD0'].items())
+            except RuntimeError as e:
+                errors.append(e)
+                return
+            if count not in (5, 50):
+                errors.append(count)
+                return
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(40):
+        registry.update('ied', models[i % 2])
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_unverified_scl_model_survives_reconnect_and_restart(tmp_path):
+    registry = ModelRegistry(ModelCacheStore(str(tmp_path), legacy_file=None))
+    # bootstrap dari SCL, lalu discovery online gagal: model tetap belum terverifikasi
+    registry.update('ied', MODEL, 'fp', verified=False)
+    registry.update('ied', registry.get('ied', 'fp'), 'fp', verified=False)
+    assert not registry.is_verified('ied')
+
+    restarted = ModelRegistry(ModelCacheStore(str(tmp_path), legacy_file=None))
+    assert restarted.get('ied', 'fp') == MODEL
+    assert not restarted.is_verified('ied')
+
+    # verifikasi berhasil: flag dihapus dari cache
+    restarted.update('ied', restarted.get('ied', 'fp'), 'fp')
+    assert restarted.is_verified('ied')
+    again = ModelRegistry(ModelCacheStore(str(tmp_path), legacy_file=None))
+    assert again.get('ied', 'fp') == MODEL and again.is_verified('ied')
+
+
+def test_store_reports_verified_flag(tmp_path):
+    store = ModelCacheStore(str(tmp_path), legacy_file=None)
+    store.save('ied', MODEL, 'fp', verified=False)
+    assert store.load('ied', 'fp', with_verified=True) == (MODEL, False)
+    assert store.load('ied', 'fp') == MODEL
+    assert store.load('missing', with_verified=True) == (None, True)
+
+
+def test_schema_1_cache_is_still_read_as_verified(tmp_path):
+    store = ModelCacheStore(str(tmp_path), legacy_file=None)
+    header = model_cache.HEADERS[1].pack(model_cache.MAGIC, 1, marshal.version, b'fp')
+    with open(store.path('ied'), 'wb') as f:
+        f.write(header + zlib.compress(marshal.dumps(MODEL)))
+    assert store.load('ied', 'fp', with_verified=True) == (MODEL, True)
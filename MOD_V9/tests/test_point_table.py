@@ -0,0 +1,151 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from point_table import FLAG_EVENT, FLAG_INVERT, NO_TIMESTAMP, PointTable
+
+MEASURED, STATUS, COMMAND = "MeasuredValueShort", "SinglePointInformation", "SingleCommand"
+
+INVALID = 0x80
+ROWS = 8
+
+
+def build():
+    table = PointTable()
+    table.add(100, MEASURED, 1.5, FLAG_EVENT, groups=(1, 2))
+    table.add(200, STATUS, 0, FLAG_EVENT | FLAG_INVERT)
+    table.add(300, COMMAND, 0, 0, callback=print)
+    return table
+
+
+def test_add_and_lookup():
+    table = build()
+    assert len(table) == 3 and 100 in table and 999 not in table
+    assert list(table) == [100, 200, 300]
+    assert table.add(100, MEASURED) == -1
+    assert table.type_of(200) == STATUS and table.type_of(999) is None
+    assert table.types == [MEASURED, STATUS, COMMAND]
+    assert table.has_flag(200, FLAG_INVERT) and not table.has_flag(100, FLAG_INVERT)
+    assert not table.has_flag(999, FLAG_EVENT)
+    assert table.callbacks == {300: print} and table.groups == {100: (1, 2)}
+
+
+def test_find_type_code_does_not_register():
+    table = build()
+    assert table.find_type_code(STATUS) == table.type_code_of(STATUS) == 1
+    assert table.find_type_code("DoublePointInformation") is None
+    assert table.types == [MEASURED, STATUS, COMMAND]
+
+
+def test_get_and_point_views():
+    table = build()
+    assert table.get(100) == (MEASURED, 1.5, 0, NO_TIMESTAMP, FLAG_EVENT)
+    assert table.get(999) is None and table.point(999) is None
+    table.set(100, 2.5, 0, 1234)
+    assert table.point(100) == {'type': MEASURED, 'data': 2.5, 'quality': 0, 'timestamp': 1234, 'event': True}
+    assert table.point(300)['timestamp'] is None and table.point(300)['event'] is False
+    assert table.read(table.rows[100]) == (100, MEASURED, 2.5, 0, 1234, FLAG_EVENT)
+
+
+def test_set_reports_changes():
+    table = build()
+    assert table.set(100, 1.5, 0, 10) == (False, False)
+    assert table.get(100)[3] == NO_TIMESTAMP # nilai sama: timestamp tidak ditulis
+    assert table.set(100, 2.0, 0, 20) == (True, False)
+    assert table.set(100, 2.0, 64, 30) == (False, True)
+    assert table.get(100)[1:4] == (2.0, 64, 30)
+
+
+def test_update_many_and_set_quality():
+    table = build()
+    assert table.update_many([100, 200, 999], [1.5, 1, 7], [0, 0, 0], [5, 6, 7]) == [200]
+    assert table.set_quality([100, 200, 999], INVALID, 99) == [100, 200]
+    assert table.set_quality([100], INVALID, 100) == []
+    assert table.snapshot([200, 999, 100]) == [(200, 1.0, INVALID, 99), (100, 1.5, INVALID, 99)]
+
+
+def test_columns_and_snapshot_copy():
+    table = build()
+    value, quality, timestamp = table.columns()
+    value[0] = 42.0
+    assert table.get(100)[1] == 1.5
+    assert table.snapshot() == [(100, 1.5, 0, 0), (200, 0.0, 0, 0), (300, 0.0, 0, 0)]
+
+
+def _consistent(value, quality, timestamp):
+    # set/update_many menulis (k, k % 128, k); set_quality menulis (nilai lama, quality | INVALID, -1)
+    if timestamp == -1:
+        return bool(quality & INVALID)
+    return quality == int(value) % 128 and timestamp == int(value)
+
+
+class YieldingColumn(list):
+    """Kolom yang melepas GIL setelah setiap penulisan, agar penulis lain dapat menyela di tengah baris."""
+
+    def __setitem__(self, index, item):
+        super().__setitem__(index, item)
+        time.sleep(0)
+
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_concurrent_writers_never_tear_rows(fast_switching):
+    table = PointTable()
+    for ioa in range(ROWS):
+        table.add(ioa, MEASURED)
+    table.value = YieldingColumn(table.value)
+    ioas = list(range(ROWS))
+    stop = threading.Event()
+    errors = []
+
+    def setter(offset):
+        k = offset
+        while not stop.is_set():
+            k += 7
+            for ioa in ioas:
+                table.set(ioa, float(k), k % 128, k)
+
+    def bulk_writer(offset):
+        k = offset
+        while not stop.is_set():
+            k += 11
+            table.update_many(ioas, [float(k)] * ROWS, [k % 128] * ROWS, [k] * ROWS)
+
+    def invalidator():
+        while not stop.is_set():
+            table.set_quality(ioas, INVALID, -1)
+
+    def reader():
+        while not stop.is_set():
+            for row in table.snapshot():
+                if not _consistent(*row[1:]):
+                    errors.append(row)
+            for row in zip(table.ioa, *table.columns()):
+                if not _consistent(*row[1:]):
+                    errors.append(row)
+            for ioa in ioas:
+                _, value, quality, timestamp, _ = table.get(ioa)
+                if not _consistent(value, quality, timestamp):
+                    errors.append((ioa, value, quality, timestamp))
+
+    threads = [threading.Thread(target=setter, args=(1,)), threading.Thread(target=setter, args=(3,)),
+               threading.Thread(target=bulk_writer, args=(5,)), threading.Thread(target=invalidator)]
+    threads += [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    stop.wait(1.5)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    for ioa in ioas:
+        assert table.seq[table.rows[ioa]] % 2 == 0
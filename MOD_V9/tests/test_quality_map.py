@@ -0,0 +1,40 @@
+import pytest
+
+from quality_map import (CONNECTION_LOST_QUALITY, QDS_BLOCKED, QDS_GOOD, QDS_INVALID, QDS_NON_TOPICAL, QDS_OVERFLOW,
+                         QDS_SUBSTITUTED, STATUS_QUALITY_MASK, Q_DETAIL_OLD_DATA, Q_DETAIL_OUT_OF_RANGE,
+                         Q_DETAIL_OVERFLOW, Q_OPERATOR_BLOCKED, Q_SOURCE_SUBSTITUTED, Q_TEST, Q_VALIDITY_INVALID,
+                         Q_VALIDITY_QUESTIONABLE, iec104_quality)
+
+
+@pytest.mark.parametrize("q", [None, 0])
+def test_missing_or_good_quality(q):
+    assert iec104_quality(q) == QDS_GOOD
+
+
+@pytest.mark.parametrize("q, expected", [
+    (Q_VALIDITY_INVALID, QDS_INVALID),
+    (Q_VALIDITY_QUESTIONABLE, QDS_NON_TOPICAL),
+    (Q_DETAIL_OVERFLOW, QDS_OVERFLOW),
+    (Q_DETAIL_OUT_OF_RANGE, QDS_OVERFLOW),
+    (Q_DETAIL_OLD_DATA, QDS_NON_TOPICAL),
+    (Q_SOURCE_SUBSTITUTED, QDS_SUBSTITUTED),
+    (Q_OPERATOR_BLOCKED, QDS_BLOCKED),
+    (Q_TEST, QDS_INVALID),
+])
+def test_single_flags(q, expected):
+    assert iec104_quality(q) == expected
+
+
+def test_reserved_validity_is_good():
+    # validity 01 (reserved) tidak dipetakan ke flag apa pun
+    assert iec104_quality(1) == QDS_GOOD
+
+
+def test_combined_flags():
+    q = Q_VALIDITY_QUESTIONABLE | Q_DETAIL_OVERFLOW | Q_SOURCE_SUBSTITUTED | Q_OPERATOR_BLOCKED
+    assert iec104_quality(q) == QDS_NON_TOPICAL | QDS_OVERFLOW | QDS_SUBSTITUTED | QDS_BLOCKED
+
+
+def test_status_mask_drops_overflow():
+    assert iec104_quality(Q_DETAIL_OVERFLOW | Q_VALIDITY_INVALID) & STATUS_QUALITY_MASK == QDS_INVALID
+    assert CONNECTION_LOST_QUALITY & STATUS_QUALITY_MASK == CONNECTION_LOST_QUALITY
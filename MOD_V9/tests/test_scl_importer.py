@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+import scl_importer
+
+SCL_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "TRAFO5_2.iid")
+
+pytestmark = pytest.mark.skipif(not os.path.exists(SCL_FILE), reason="TRAFO5_2.iid not available")
+
+
+@pytest.fixture(scope="module")
+def importer():
+    return scl_importer.SclModelImporter(SCL_FILE)
+
+
+@pytest.fixture(scope="module")
+def model(importer):
+    return importer.load_model()
+
+
+def test_ied_lookup(importer):
+    assert importer.ied_names() == ["TRAFO5_2"]
+    assert importer.ied_addresses() == {"TRAFO5_2": "192.168.5.83"}
+    assert importer.find_ied("192.168.5.83") == "TRAFO5_2"
+
+
+def test_logical_devices_and_nodes(model):
+    assert set(model) == {"TRAFO5_2Ctrl", "TRAFO5_2Meas", "TRAFO5_2System"}
+    assert {"LLN0", "LPHD1", "MMXU1", "MMXU2"} <= set(model["TRAFO5_2Meas"])
+
+
+def test_data_attributes(model):
+    totw = model["TRAFO5_2Meas"]["MMXU1"]["TotW"]
+    assert totw["mag"]["f"] == {'reftype': "DA", 'FC': "MX", 'value': "UNKNOWN", 'type': "float"}
+    assert totw["q"]["type"] == "bit-string"
+    assert totw["t"]["type"] == "utc-time"
+    assert totw["units"]["SIUnit"]["FC"] == "CF"
+
+
+def test_dataset_references(model):
+    dataset = model["TRAFO5_2Meas"]["MMXU1"]["dsMMXU"]
+    assert dataset["0"] == {'reftype': "DX", 'type': "reference", 'value': "TRAFO5_2Meas/MMXU1.Health", 'FC': "ST"}
+    assert [dataset[str(i)]["value"].split("/")[0] for i in range(len(dataset))] == ["TRAFO5_2Meas"] * len(dataset)
+
+
+def test_report_control_blocks(model):
+    lnmodel = model["TRAFO5_2Meas"]["MMXU1"]
+    assert [k for k in lnmodel if k.startswith("urcbMX")] == [f"urcbMX{i:02d}" for i in range(1, 6)]
+    rcb = lnmodel["urcbMX01"]
+    assert rcb["DatSet"]["value"] == "TRAFO5_2Meas/MMXU1$dsMMXU"
+    assert rcb["RptEna"]["value"] is False
+    assert rcb["DatSet"]["FC"] == "RP"
+
+
+def test_ld_name_overrides_instance(tmp_path):
+    with open(SCL_FILE, encoding="utf-8") as f:
+        scl = f.read()
+    assert '<LDevice inst="Meas"' in scl
+    path = tmp_path / "renamed.iid"
+    path.write_text(scl.replace('<LDevice inst="Meas"', '<LDevice inst="Meas" ldName="BAY5_MEAS"', 1), encoding="utf-8")
+    model = scl_importer.load_model(str(path))
+    assert "BAY5_MEAS" in model and "TRAFO5_2Meas" not in model
+    assert model["BAY5_MEAS"]["MMXU1"]["dsMMXU"]["0"]["value"] == "BAY5_MEAS/MMXU1.Health"
+    assert model["BAY5_MEAS"]["MMXU1"]["urcbMX01"]["DatSet"]["value"] == "BAY5_MEAS/MMXU1$dsMMXU"
+
+
+def test_unreadable_file_gives_empty_model(tmp_path):
+    path = tmp_path / "broken.iid"
+    path.write_text("<SCL", encoding="utf-8")
+    assert scl_importer.load_model(str(path)) == {}
@@ -0,0 +1,72 @@
+import math
+
+import pytest
+
+from ui_protocol import (BinaryFrameEncoder, ENTRY, FRAME_BATCH, FRAME_SNAPSHOT, HEADER, decode_frame, entry_value)
+
+NOW = 1_700_000_000_000
+
+
+def test_round_trip():
+    frame = BinaryFrameEncoder().encode(FRAME_BATCH, [(100, 1.5, 0, NOW - 250), (200, 2.0, 128, 0)], NOW)
+    assert len(frame) == HEADER.size + 2 * ENTRY.size
+    frame_type, base, entries = decode_frame(frame)
+    assert (frame_type, base) == (FRAME_BATCH, NOW)
+    # timestamp 0 (tidak diketahui) dikirim sebagai waktu dasar frame
+    assert entries == [(100, 1.5, 0, NOW - 250), (200, 2.0, 128, NOW)]
+
+
+def test_timestamp_offset_is_clamped():
+    frame = BinaryFrameEncoder().encode(FRAME_BATCH, [(1, 0.0, 0, NOW + 2 ** 40)], NOW)
+    assert decode_frame(frame)[2][0][3] == NOW + 2 ** 31 - 1
+
+
+def test_unsupported_version():
+    frame = bytearray(BinaryFrameEncoder().snapshot([(1, 1.0, 0, NOW)], NOW))
+    frame[0] = 99
+    with pytest.raises(ValueError):
+        decode_frame(bytes(frame))
+
+
+def test_batch_sends_only_changes():
+    encoder = BinaryFrameEncoder()
+    assert encoder.encode(FRAME_BATCH, [(1, 1.0, 0, NOW), (2, 2.0, 0, NOW)], NOW)
+    assert encoder.encode(FRAME_BATCH, [(1, 1.0, 0, NOW), (2, 2.0, 0, NOW)], NOW) is None
+    frame = encoder.encode(FRAME_BATCH, [(1, 1.0, 64, NOW), (2, 2.0, 0, NOW), (3, 3.0, 0, NOW)], NOW)
+    assert [entry[0] for entry in decode_frame(frame)[2]] == [1, 3]
+
+
+def test_invalidated_nan_is_deduplicated():
+    encoder = BinaryFrameEncoder()
+    assert encoder.encode(FRAME_BATCH, [(1, math.nan, 192, NOW)], NOW)
+    assert encoder.encode(FRAME_BATCH, [(1, math.nan, 192, NOW)], NOW) is None
+
+
+def test_snapshot_is_full_and_seeds_delta_state():
+    encoder = BinaryFrameEncoder()
+    encoder.encode(FRAME_BATCH, [(1, 1.0, 0, NOW)], NOW)
+    frame = encoder.snapshot([(1, 1.0, 0, NOW), (2, 5.0, 0, NOW)], NOW)
+    frame_type, _, entries = decode_frame(frame)
+    assert frame_type == FRAME_SNAPSHOT and [entry[0] for entry in entries] == [1, 2]
+    assert encoder.encode(FRAME_BATCH, [(2, 5.0, 0, NOW)], NOW) is None
+    assert encoder.encode(FRAME_BATCH, [(2, 6.0, 0, NOW)], NOW)
+
+
+def test_delta_state_is_per_client():
+    # klien lama sudah menerima nilai 5; klien baru menerima snapshot dengan nilai 6 yang lebih baru
+    old_client, new_client = BinaryFrameEncoder(), BinaryFrameEncoder()
+    old_client.encode(FRAME_BATCH, [(1, 5.0, 0, NOW)], NOW)
+    new_client.snapshot([(1, 6.0, 0, NOW)], NOW)
+    # update berikutnya kembali ke 5: tidak berubah bagi klien lama, tetapi wajib dikirim ke klien baru
+    batch = [(1, 5.0, 0, NOW)]
+    assert old_client.encode(FRAME_BATCH, batch, NOW) is None
+    assert decode_frame(new_client.encode(FRAME_BATCH, batch, NOW))[2] == [(1, 5.0, 0, NOW)]
+
+
+@pytest.mark.parametrize("value, expected", [(1, 1.0), (2.5, 2.5), (True, 1.0)])
+def test_entry_value(value, expected):
+    assert entry_value(value) == expected
+
+
+def test_entry_value_text_is_nan():
+    assert math.isnan(entry_value('INVALID'))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# ui_protocol.py - Protokol biner ringkas untuk monitor realtime WebSocket.
+# Klien memilih protokol ini dengan ws://host:port/?protocol=binary; tanpa parameter, JSON tetap dipakai.
+#
+# Satu frame (little-endian):
+#   header  : versi (u8), tipe frame (u8), jumlah entri (u32), waktu dasar epoch-ms (i64)  -> 14 byte
+#   entri   : IOA (u32), nilai (f32), quality IEC 104 (u8), offset timestamp ms terhadap waktu dasar (i32) -> 13 byte
+# Nilai NaN menandakan titik diinvalidasi (koneksi IED terputus).
+#
+# Frame batch dikodekan delta terhadap frame sebelumnya: entri yang nilai dan quality-nya sama dengan
+# yang terakhir dikirim tidak dikirim ulang. State delta adalah apa yang sudah diterima satu klien, jadi
+# setiap klien memiliki encoder sendiri; snapshot selalu lengkap dan menjadi dasar delta berikutnya.
+
+import math
+import struct
+
+FRAME_VERSION = 1
+FRAME_SNAPSHOT = 1
+FRAME_BATCH = 2
+
+HEADER = struct.Struct('<BBIq')
+ENTRY = struct.Struct('<IfBi')
+
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+class BinaryFrameEncoder:
+    """Encoder frame biner untuk satu klien, dengan state delta (nilai dan quality terakhir yang dikirim per IOA)."""
+
+    def __init__(self):
+        self.last = {}
+
+    def encode(self, frame_type, entries, now_ms, delta = True):
+        """Mengodekan entri (ioa, nilai, quality, timestamp_ms) menjadi satu frame; None jika delta kosong.
+
+        delta=False mengirim semua entri; state delta selalu diperbarui dengan entri yang dikirim.
+        """
+        last = self.last
+        selected = []
+        for ioa, value, quality, timestamp in entries:
+            if delta:
+                previous = last.get(ioa)
+                # NaN != NaN, jadi invalidasi dibandingkan lewat quality
+                if previous is not None and previous[1] == quality and (previous[0] == value or
+                                                                       (value != value and previous[0] != previous[0])):
+                    continue
+            last[ioa] = (value, quality)
+            selected.append((ioa, value, quality, timestamp))
+        if delta and not selected:
+            return None
+
+        frame = bytearray(HEADER.size + ENTRY.size * len(selected))
+        HEADER.pack_into(frame, 0, FRAME_VERSION, frame_type, len(selected), now_ms)
+        offset = HEADER.size
+        pack_into = ENTRY.pack_into
+        for ioa, value, quality, timestamp in selected:
+            delta_ms = timestamp - now_ms if timestamp else 0
+            pack_into(frame, offset, ioa, value, quality, min(max(delta_ms, INT32_MIN), INT32_MAX))
+            offset += ENTRY.size
+        return bytes(frame)
+
+    def snapshot(self, entries, now_ms):
+        return self.encode(FRAME_SNAPSHOT, entries, now_ms, delta = False)
+
+
+def decode_frame(frame):
+    """Kebalikan encode() (untuk pengujian dan klien Python): (tipe, waktu_dasar, [(ioa, nilai, quality, timestamp_ms)])."""
+    version, frame_type, count, base_ms = HEADER.unpack_from(frame, 0)
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported frame version {version}")
+    entries = []
+    for i in range(count):
+        ioa, value, quality, delta_ms = ENTRY.unpack_from(frame, HEADER.size + i * ENTRY.size)
+        entries.append((ioa, value, quality, base_ms + delta_ms))
+    return frame_type, base_ms, entries
+
+
+def entry_value(value):
+    """Nilai payload UI sebagai float (teks seperti 'INVALID' menjadi NaN)."""
+    return float(value) if isinstance(value, (int, float)) else math.nan
@@ -1,109 +1,378 @@
 #!/usr/bin/env python3
+# libiec60870client.py - Master IEC 60870-5-104 untuk pengujian dan pengukuran gateway.
+# - Mendekode semua tipe yang dikirim gateway (M_SP_NA_1, M_DP_NA_1, M_ME_NB_1, M_ME_NC_1, varian bertimestamp
+#   CP56Time2a M_SP_TB_1, M_DP_TB_1, M_ME_TE_1, M_ME_TF_1) serta konfirmasi perintah C_SC_NA_1/C_DC_NA_1.
+# - Statistik per IOA (nilai/quality terakhir, jumlah, waktu kedatangan, jeda maksimum, latensi CP56Time2a)
+#   disimpan dalam array (PointStats), bukan objek per titik.
+# - GI dan perintah terjadwal: interrogate() mengukur ACT_CON dan penyelesaian (ACT_TERM), command()
+#   mengukur waktu sampai konfirmasi.
+# - Hasil ditulis ke CSV (per IOA) dan JSON (ringkasan, GI, perintah, per IOA).
+# Print per elemen hanya aktif dengan verbose=True.
+#
+# Pemakaian: python3 libiec60870client.py [host] [port] [durasi_detik] [prefix_output] [ioa_double_command]
 from lib60870 import *
+from array import array
+import csv
+import json
+import sys
+import threading
 import time
 
+# Dekoder per tipe monitoring: (kelas dasar, getValue, getQuality, kelas bertimestamp, getTimestamp)
+MONITOR_TYPES = {
+  M_SP_NA_1: (SinglePointInformation, SinglePointInformation_getValue, SinglePointInformation_getQuality, None, None),
+  M_DP_NA_1: (DoublePointInformation, DoublePointInformation_getValue, DoublePointInformation_getQuality, None, None),
+  M_ME_NB_1: (MeasuredValueScaled, MeasuredValueScaled_getValue, MeasuredValueScaled_getQuality, None, None),
+  M_ME_NC_1: (MeasuredValueShort, MeasuredValueShort_getValue, MeasuredValueShort_getQuality, None, None),
+  M_SP_TB_1: (SinglePointInformation, SinglePointInformation_getValue, SinglePointInformation_getQuality,
+              SinglePointWithCP56Time2a, SinglePointWithCP56Time2a_getTimestamp),
+  M_DP_TB_1: (DoublePointInformation, DoublePointInformation_getValue, DoublePointInformation_getQuality,
+              DoublePointWithCP56Time2a, DoublePointWithCP56Time2a_getTimestamp),
+  M_ME_TE_1: (MeasuredValueScaled, MeasuredValueScaled_getValue, MeasuredValueScaled_getQuality,
+              MeasuredValueScaledWithCP56Time2a, MeasuredValueScaledWithCP56Time2a_getTimestamp),
+  M_ME_TF_1: (MeasuredValueShort, MeasuredValueShort_getValue, MeasuredValueShort_getQuality,
+              MeasuredValueShortWithCP56Time2a, MeasuredValueShortWithCP56Time2a_getTimestamp),
+}
+# Konfirmasi perintah: (kelas objek, getState)
+COMMAND_TYPES = {
+  C_SC_NA_1: (SingleCommand, SingleCommand_getState),
+  C_DC_NA_1: (DoubleCommand, DoubleCommand_getState),
+}
+TYPE_NAMES = {
+  M_SP_NA_1: 'M_SP_NA_1', M_DP_NA_1: 'M_DP_NA_1', M_ME_NB_1: 'M_ME_NB_1', M_ME_NC_1: 'M_ME_NC_1',
+  M_SP_TB_1: 'M_SP_TB_1', M_DP_TB_1: 'M_DP_TB_1', M_ME_TE_1: 'M_ME_TE_1', M_ME_TF_1: 'M_ME_TF_1',
+  C_SC_NA_1: 'C_SC_NA_1', C_DC_NA_1: 'C_DC_NA_1', C_IC_NA_1: 'C_IC_NA_1',
+}
+CSV_FIELDS = ['ioa', 'type', 'count', 'value', 'quality', 'first_arrival_ms', 'last_arrival_ms', 'rate_per_s',
+              'max_gap_ms', 'last_timestamp_ms', 'latency_mean_ms', 'latency_max_ms']
+
+
+def percentile(sorted_values, p):
+  if not sorted_values:
+    return None
+  return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100.0))]
+
+
+class PointStats:
+  """Statistik per IOA dalam kolom array; satu baris per IOA, ditambahkan saat IOA pertama kali diterima.
+
+  Hanya ditulis oleh thread penerima lib60870 (satu thread per koneksi), jadi tidak memakai lock.
+  """
+
+  def __init__(self):
+    self.index = {} # ioa -> baris
+    self.ioa = array('L')
+    self.type = array('B')
+    self.value = array('d')
+    self.quality = array('B')
+    self.count = array('Q')
+    self.first_arrival = array('d') # epoch ms
+    self.last_arrival = array('d')
+    self.max_gap = array('d') # ms
+    self.last_timestamp = array('q') # CP56Time2a epoch ms, 0 jika tipe tanpa timestamp
+    self.latency_sum = array('d') # ms, hanya objek bertimestamp
+    self.latency_max = array('d')
+    self.latency_count = array('Q')
+
+  def __len__(self):
+    return len(self.ioa)
+
+  def _add(self, ioa, type_id):
+    row = self.index[ioa] = len(self.ioa)
+    self.ioa.append(ioa)
+    self.type.append(type_id)
+    for column in (self.value, self.first_arrival, self.last_arrival, self.max_gap, self.latency_sum, self.latency_max):
+      column.append(0.0)
+    for column in (self.quality, self.count, self.last_timestamp, self.latency_count):
+      column.append(0)
+    return row
+
+  def update(self, ioa, type_id, value, quality, arrival, timestamp):
+    row = self.index.get(ioa)
+    if row is None:
+      row = self._add(ioa, type_id)
+    count = self.count[row]
+    if count:
+      gap = arrival - self.last_arrival[row]
+      if gap > self.max_gap[row]:
+        self.max_gap[row] = gap
+    else:
+      self.first_arrival[row] = arrival
+    self.count[row] = count + 1
+    self.last_arrival[row] = arrival
+    self.type[row] = type_id
+    self.value[row] = value
+    self.quality[row] = quality
+    if timestamp:
+      latency = arrival - timestamp
+      self.last_timestamp[row] = timestamp
+      if latency > self.latency_max[row] or not self.latency_count[row]:
+        self.latency_max[row] = latency
+      self.latency_sum[row] += latency
+      self.latency_count[row] += 1
+
+  def rows(self):
+    """Satu dict per IOA (urut IOA) dengan kolom CSV_FIELDS."""
+    result = []
+    for ioa in sorted(self.index):
+      row = self.index[ioa]
+      count = self.count[row]
+      span = (self.last_arrival[row] - self.first_arrival[row]) / 1000.0
+      latency_count = self.latency_count[row]
+      result.append({
+        'ioa': ioa,
+        'type': TYPE_NAMES.get(self.type[row], self.type[row]),
+        'count': count,
+        'value': self.value[row],
+        'quality': self.quality[row],
+        'first_arrival_ms': round(self.first_arrival[row], 3),
+        'last_arrival_ms': round(self.last_arrival[row], 3),
+        'rate_per_s': round((count - 1) / span, 3) if span > 0 else None,
+        'max_gap_ms': round(self.max_gap[row], 3),
+        'last_timestamp_ms': self.last_timestamp[row] or None,
+        'latency_mean_ms': round(self.latency_sum[row] / latency_count, 3) if latency_count else None,
+        'latency_max_ms': round(self.latency_max[row], 3) if latency_count else None,
+      })
+    return result
+
+
 class IEC60870_5_104_client:
-  # Connection event handler 
+  # Connection event handler
   def connectionHandler (self, parameter, connection, event):
     if event == CS104_CONNECTION_OPENED:
-          print("Connection established")
+      self.log("Connection established")
     elif event == CS104_CONNECTION_CLOSED:
-          print("Connection closed")
+      self.active.clear()
+      self.log("Connection closed")
     elif event == CS104_CONNECTION_STARTDT_CON_RECEIVED:
-          print("Received STARTDT_CON")
+      self.active.set()
+      self.log("Received STARTDT_CON")
     elif event == CS104_CONNECTION_STOPDT_CON_RECEIVED:
-          print("Received STOPDT_CON")
+      self.active.clear()
+      self.log("Received STOPDT_CON")
 
 
   #CS101_ASDUReceivedHandler implementation
   #For CS104 the address parameter has to be ignored
   def asduReceivedHandler (self, parameter, address, asdu):
-    print("RECVD ASDU type: %s(%i) elements: %i" % (
-            TypeID_toString(CS101_ASDU_getTypeID(asdu)),
-            CS101_ASDU_getTypeID(asdu),
-            CS101_ASDU_getNumberOfElements(asdu)))
-
-    if (CS101_ASDU_getTypeID(asdu) == M_ME_TE_1):
-
-        print("  measured scaled values with CP56Time2a timestamp:")
-
-        for i in range(CS101_ASDU_getNumberOfElements(asdu)):
-
-            io = cast(CS101_ASDU_getElement(asdu, i), MeasuredValueScaledWithCP56Time2a) 
-            print("    IOA: %i value: %i" % (
-                    InformationObject_getObjectAddress(cast(io, InformationObject) ),
-                    MeasuredValueScaled_getValue(cast(io, MeasuredValueScaled) )
-            ))
-            MeasuredValueScaledWithCP56Time2a_destroy(io)
-
-    elif (CS101_ASDU_getTypeID(asdu) == M_SP_NA_1):
-        print("  single point information:")
-
-        for i in range(CS101_ASDU_getNumberOfElements(asdu)):
-
-            io = cast(CS101_ASDU_getElement(asdu, i), SinglePointInformation) 
-            print("    IOA: %i value: %i" % (
-                    InformationObject_getObjectAddress(cast(io,InformationObject) ),
-                    SinglePointInformation_getValue(cast(io,SinglePointInformation) )
-            ))
-            SinglePointInformation_destroy(io)
-    elif (CS101_ASDU_getTypeID(asdu) == M_DP_NA_1):
-        print("  double point information:")
-
-        for i in range(CS101_ASDU_getNumberOfElements(asdu)):
-
-            io = cast(CS101_ASDU_getElement(asdu, i), DoublePointInformation) 
-            print("    IOA: %i value: %i" % (
-                    InformationObject_getObjectAddress(cast(io,InformationObject) ),
-                    DoublePointInformation_getValue(cast(io,DoublePointInformation) )
-            ))
-            DoublePointInformation_destroy(io)
-    elif (CS101_ASDU_getTypeID(asdu) == M_ME_NB_1):
-        print("  measured value scaled:")
-
-        for i in range(CS101_ASDU_getNumberOfElements(asdu)):
-
-            io = cast(CS101_ASDU_getElement(asdu, i), MeasuredValueScaled) 
-            print("    IOA: %i value: %i" % (
-                    InformationObject_getObjectAddress(cast(io,InformationObject) ),
-                    MeasuredValueScaled_getValue(cast(io,MeasuredValueScaled) )
-            ))
-            MeasuredValueScaled_destroy(io)     
-    elif (CS101_ASDU_getTypeID(asdu) == C_SC_NA_1):
-        print("received single command response")
-        for i in range(CS101_ASDU_getNumberOfElements(asdu)):
-
-            io = cast(CS101_ASDU_getElement(asdu, i), SinglePointInformation) 
-            print("    IOA: %i value: %i" % (
-                    InformationObject_getObjectAddress(cast(io,InformationObject) ),
-                    SinglePointInformation_getValue(cast(io,SinglePointInformation) )
-            ))
-            SinglePointInformation_destroy(io)
-
-    elif (CS101_ASDU_getTypeID(asdu) == C_DC_NA_1):
-        print("received double command response")
-        for i in range(CS101_ASDU_getNumberOfElements(asdu)):
-
-            io = cast(CS101_ASDU_getElement(asdu, i), DoublePointInformation) 
-            print("    IOA: %i value: %i" % (
-                    InformationObject_getObjectAddress(cast(io,InformationObject) ),
-                    DoublePointInformation_getValue(cast(io,DoublePointInformation) )
-            ))
-            DoublePointInformation_destroy(io)
-
+    started = time.perf_counter()
+    arrival = time.time() * 1000.0
+    type_id = CS101_ASDU_getTypeID(asdu)
+    cot = CS101_ASDU_getCOT(asdu)
+    count = CS101_ASDU_getNumberOfElements(asdu)
+    if self.verbose:
+      print("RECVD ASDU type: %s(%i) COT: %i elements: %i" % (TypeID_toString(type_id), type_id, cot, count))
+
+    if type_id == C_IC_NA_1:
+      self._interrogation_response(asdu, cot)
+    elif type_id in COMMAND_TYPES:
+      self._command_response(asdu, type_id, cot)
+    else:
+      gi = self._gi
+      if gi is not None and CS101_COT_INTERROGATED_BY_STATION <= cot <= CS101_COT_INTERROGATED_BY_GROUP_16:
+        gi['objects'] += count
+      decoder = MONITOR_TYPES.get(type_id)
+      if decoder is None:
+        self.unknown_asdus += 1
+      elif self.recording:
+        self._decode(asdu, type_id, cot, count, arrival, decoder)
+
+    self.handler_seconds += time.perf_counter() - started
     return True
 
-
-  def __init__(self, ip = "localhost", port = IEC_60870_5_104_DEFAULT_PORT):
-    print("Connecting to: %s:%i" % ( ip, port))
+  def _decode(self, asdu, type_id, cot, count, arrival, decoder):
+    base_type, get_value, get_quality, timed_type, get_timestamp = decoder
+    spontaneous = cot == CS101_COT_SPONTANEOUS
+    update = self.points.update
+    for i in range(count):
+      io = CS101_ASDU_getElement(asdu, i)
+      ioa = InformationObject_getObjectAddress(io)
+      base = cast(io, base_type)
+      value = get_value(base)
+      quality = get_quality(base)
+      timestamp = CP56Time2a_toMsTimestamp(get_timestamp(cast(io, timed_type))) if timed_type else 0
+      InformationObject_destroy(io)
+      update(ioa, type_id, value, quality, arrival, timestamp)
+      if spontaneous and timestamp:
+        self.latencies_ms.append(arrival - timestamp)
+      if self.verbose:
+        print("    IOA: %i value: %s quality: %i%s" % (ioa, value, quality, " t: %i" % timestamp if timestamp else ""))
+
+    counters = self.type_counts.get(type_id)
+    if counters is None:
+      counters = self.type_counts[type_id] = [0, 0]
+    counters[0] += 1
+    counters[1] += count
+    self.asdus += 1
+    self.objects += count
+    if spontaneous:
+      self.spontaneous_asdus += 1
+      self.spontaneous_objects += count
+
+  def _interrogation_response(self, asdu, cot):
+    gi = self._gi
+    if gi is None:
+      return
+    elapsed = (time.perf_counter() - self._gi_started) * 1000.0
+    if CS101_ASDU_isNegative(asdu):
+      gi['negative'] = True
+      self._gi_done.set()
+    elif cot == CS101_COT_ACTIVATION_CON:
+      gi['act_con_ms'] = round(elapsed, 3)
+    elif cot == CS101_COT_ACTIVATION_TERMINATION:
+      gi['duration_ms'] = round(elapsed, 3)
+      self._gi_done.set()
+
+  def _command_response(self, asdu, type_id, cot):
+    io_type, get_state = COMMAND_TYPES[type_id]
+    io = CS101_ASDU_getElement(asdu, 0)
+    ioa = InformationObject_getObjectAddress(io)
+    state = get_state(cast(io, io_type))
+    InformationObject_destroy(io)
+    if self.verbose:
+      print("    command response IOA: %i state: %i COT: %i" % (ioa, state, cot))
+    pending = self._command
+    # konfirmasi pertama untuk perintah yang sedang ditunggu; ACT_TERM berikutnya diabaikan
+    if pending is None or pending['type'] != TYPE_NAMES[type_id] or pending['ioa'] != ioa or pending['cot'] is not None:
+      return
+    pending['latency_ms'] = round((time.perf_counter() - self._command_started) * 1000.0, 3)
+    pending['cot'] = cot
+    pending['positive'] = cot == CS101_COT_ACTIVATION_CON and not CS101_ASDU_isNegative(asdu)
+    self._command_done.set()
+
+
+  def __init__(self, ip = "localhost", port = IEC_60870_5_104_DEFAULT_PORT, ca = 1, verbose = True):
+    self.verbose = verbose
+    self.ca = ca
+    self.log("Connecting to: %s:%i" % ( ip, port))
     self.con = CS104_Connection_create(ip, port)
 
+    self.active = threading.Event() # STARTDT_CON diterima
+    self.recording = True # False: ASDU monitoring tidak dihitung (mis. selama warmup)
+    self.gi_results = []
+    self.command_results = []
+    self._gi = None
+    self._gi_started = 0.0
+    self._gi_done = threading.Event()
+    self._command = None
+    self._command_started = 0.0
+    self._command_done = threading.Event()
+    self.reset_stats()
+
     self.p_connectionHandler = CS104_ConnectionHandler(self.connectionHandler)
     self.p_asduReceivedHandler = CS101_ASDUReceivedHandler(self.asduReceivedHandler)
 
     CS104_Connection_setConnectionHandler(self.con, self.p_connectionHandler, None)
     CS104_Connection_setASDUReceivedHandler(self.con, self.p_asduReceivedHandler, None)
 
+  def log(self, message):
+    if self.verbose:
+      print(message)
+
+  def reset_stats(self):
+    """Memulai periode pengukuran baru (hasil GI dan perintah tidak dihapus)."""
+    self.points = PointStats()
+    self.latencies_ms = array('d') # waktu terima - timestamp CP56Time2a, objek spontan bertimestamp
+    self.type_counts = {} # type id -> [asdu, objek]
+    self.asdus = 0
+    self.objects = 0
+    self.spontaneous_asdus = 0
+    self.spontaneous_objects = 0
+    self.unknown_asdus = 0
+    self.handler_seconds = 0.0 # waktu di asduReceivedHandler (dekode + statistik)
+    self.stats_started = time.time()
+
+  def connect(self, timeout = 10.0):
+    """Membuka koneksi, mengirim STARTDT dan menunggu STARTDT_CON."""
+    if not CS104_Connection_connect(self.con):
+      self.log("Connect failed!")
+      return False
+    CS104_Connection_sendStartDT(self.con)
+    return self.active.wait(timeout)
+
+  def close(self):
+    CS104_Connection_destroy(self.con)
+
+  def interrogate(self, qoi = IEC60870_QOI_STATION, timeout = 60.0):
+    """GI terjadwal: kirim C_IC_NA_1, tunggu ACT_TERM.
+
+    Mengembalikan dict: qoi, act_con_ms, duration_ms (None jika timeout), objects (jumlah objek dengan COT
+    interrogated selama GI), negative.
+    """
+    gi = {'qoi': qoi, 'sent': round(time.time() * 1000.0, 3), 'act_con_ms': None, 'duration_ms': None,
+          'objects': 0, 'negative': False}
+    self._gi_done.clear()
+    self._gi_started = time.perf_counter()
+    self._gi = gi
+    CS104_Connection_sendInterrogationCommand(self.con, CS101_COT_ACTIVATION, self.ca, qoi)
+    self._gi_done.wait(timeout)
+    self._gi = None
+    self.gi_results.append(gi)
+    self.log("GI %i: ACT_CON %s ms, ACT_TERM %s ms, %i objects" % (qoi, gi['act_con_ms'], gi['duration_ms'], gi['objects']))
+    return gi
+
+  def command(self, ioa, value, double = False, select = False, timeout = 10.0):
+    """Perintah terjadwal C_SC_NA_1 (atau C_DC_NA_1 jika double), tunggu konfirmasi pertama dari server.
+
+    Mengembalikan dict: ioa, type, value, select, latency_ms (None jika timeout), cot, positive.
+    """
+    if double:
+      io = cast(DoubleCommand_create(None, ioa, int(value), select, 0), InformationObject)
+      type_name = 'C_DC_NA_1'
+    else:
+      io = cast(SingleCommand_create(None, ioa, bool(value), select, 0), InformationObject)
+      type_name = 'C_SC_NA_1'
+    pending = {'ioa': ioa, 'type': type_name, 'value': int(value), 'select': bool(select), 'latency_ms': None,
+               'cot': None, 'positive': False}
+    self._command_done.clear()
+    self._command_started = time.perf_counter()
+    self._command = pending
+    self.log("Send control command %s" % type_name)
+    CS104_Connection_sendProcessCommandEx(self.con, CS101_COT_ACTIVATION, self.ca, io)
+    InformationObject_destroy(io)
+    self._command_done.wait(timeout)
+    self._command = None
+    self.command_results.append(pending)
+    return pending
+
+  def summary(self):
+    """Ringkasan periode pengukuran: throughput ASDU/objek, biaya dekode, latensi spontan, GI dan perintah."""
+    elapsed = max(time.time() - self.stats_started, 1e-9)
+    latencies = sorted(self.latencies_ms)
+    return {
+      'elapsed_s': round(elapsed, 3),
+      'asdus': self.asdus,
+      'objects': self.objects,
+      'asdus_per_s': round(self.asdus / elapsed, 1),
+      'objects_per_s': round(self.objects / elapsed, 1),
+      'spontaneous_asdus': self.spontaneous_asdus,
+      'spontaneous_objects': self.spontaneous_objects,
+      'unknown_asdus': self.unknown_asdus,
+      'points': len(self.points),
+      'types': {TYPE_NAMES.get(type_id, str(type_id)): {'asdus': asdus, 'objects': objects}
+                for type_id, (asdus, objects) in self.type_counts.items()},
+      'handler_seconds': round(self.handler_seconds, 6),
+      'handler_us_per_object': round(self.handler_seconds / self.objects * 1e6, 3) if self.objects else None,
+      'latency_ms': {
+        'samples': len(latencies),
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'max': latencies[-1] if latencies else None,
+      },
+      'gi': self.gi_results,
+      'commands': self.command_results,
+    }
+
+  def write_csv(self, path):
+    with open(path, 'w', newline='') as f:
+      writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+      writer.writeheader()
+      writer.writerows(self.points.rows())
+
+  def write_json(self, path):
+    with open(path, 'w') as f:
+      json.dump({'summary': self.summary(), 'points': self.points.rows()}, f, indent=2)
+
   def start(self):
     if (CS104_Connection_connect(self.con)):
         print("Connected!")
@@ -134,8 +403,8 @@ class IEC60870_5_104_client:
 
         InformationObject_destroy(dc)
         time.sleep( 5 )
-        # Send clock synchronization command 
-        #newTime = sCP56Time2a() 
+        # Send clock synchronization command
+        #newTime = sCP56Time2a()
         #CP56Time2a_createFromMsTimestamp(CP56Time2a(newTime), Hal_getTimeInMs())
 
         #print("Send time sync command")
@@ -149,10 +418,42 @@ class IEC60870_5_104_client:
     CS104_Connection_destroy(self.con)
     print("exit")
 
-#test the class
-if __name__== "__main__":
-  client = IEC60870_5_104_client()
-  client.start()
-
 
+def main():
+  host = sys.argv[1] if len(sys.argv) > 1 else "localhost"
+  port = int(sys.argv[2]) if len(sys.argv) > 2 else IEC_60870_5_104_DEFAULT_PORT
+  duration = float(sys.argv[3]) if len(sys.argv) > 3 else 30.0
+  prefix = sys.argv[4] if len(sys.argv) > 4 else "iec104_stats"
+  command_ioa = int(sys.argv[5]) if len(sys.argv) > 5 else None
+
+  client = IEC60870_5_104_client(host, port, verbose=False)
+  if not client.connect():
+    print("Connect failed!")
+    return 1
+  try:
+    client.interrogate()
+    time.sleep(duration)
+    # GI dan perintah kedua diukur saat event spontan masih mengalir
+    client.interrogate()
+    if command_ioa is not None:
+      client.command(command_ioa, IEC60870_DOUBLE_POINT_ON, double=True, select=True)
+      client.command(command_ioa, IEC60870_DOUBLE_POINT_ON, double=True)
+    summary = client.summary()
+  finally:
+    client.close()
+
+  client.write_csv(prefix + ".csv")
+  client.write_json(prefix + ".json")
+  print("%i ASDUs (%.0f/s), %i objects (%.0f/s), %i IOAs, %.1f us/object in handler" % (
+    summary['asdus'], summary['asdus_per_s'], summary['objects'], summary['objects_per_s'], summary['points'],
+    summary['handler_us_per_object'] or 0.0))
+  for gi in summary['gi']:
+    print("GI %i: ACT_CON %s ms, complete %s ms, %i objects" % (gi['qoi'], gi['act_con_ms'], gi['duration_ms'], gi['objects']))
+  for result in summary['commands']:
+    print("%s IOA %i: %s ms, COT %s, positive %s" % (result['type'], result['ioa'], result['latency_ms'], result['cot'], result['positive']))
+  print("Results written to %s.csv and %s.json" % (prefix, prefix))
+  return 0
 
+#test the class
+if __name__== "__main__":
+  sys.exit(main())